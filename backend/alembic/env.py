@@ -15,17 +15,31 @@ if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
 # add your model's MetaData object here
-# for 'autogenerate' support
-# from myapp import mymodel
-# target_metadata = mymodel.Base.metadata
-from database import Base
-from backend.students.models import Student
-from backend.subjects.models import Subject
-from attendance.models import AttendanceSession, AttendanceRecord
-from medical.models import MedicalRequest
-from backend.auth.models import User  # if exists
-
-target_metadata = Base.metadata
+# for 'autogenerate' support. Every table module must be imported so that
+# SQLModel.metadata knows about it (same list as main.py).
+from sqlmodel import SQLModel
+from config import DB_URL
+from auth.models import User
+from students.models import Student
+from subjects.models import Subject
+from attendance.models import (
+    ClassSchedule, AttendanceSession, AttendanceRecord, AttendanceAuditLog, AttendanceSummary,
+    ShortageSnapshot, AttendanceRoster, AttendanceBitmap, AttendanceBitmapException,
+)
+from medical.models import MedicalRequest, MedicalProcessingJob, OcrCacheEntry
+from announcements.models import (
+    AnnounceGroup, AnnounceMember, GroupTag,
+    Announcement, PollOption, PollVote, Reaction
+)
+from classroom.models import (
+    Classroom, ClassroomMember, Note, Assignment,
+    AssignmentSubmission, Test, TestQuestion, TestSubmission
+)
+
+target_metadata = SQLModel.metadata
+
+# The app's DATABASE_URL wins over the placeholder in alembic.ini
+config.set_main_option("sqlalchemy.url", DB_URL.replace("%", "%%"))
 
 
 # other values from the config, defined by the needs of env.py,
@@ -52,6 +66,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        compare_type=True,
     )
 
     with context.begin_transaction():
@@ -73,7 +88,11 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            compare_type=True,
+            # SQLite can't ALTER most things; batch mode recreates the table
+            render_as_batch=connection.dialect.name == "sqlite",
         )
 
         with context.begin_transaction():
@@ -0,0 +1,63 @@
+"""attendance summary
+
+Adds the attendance_summary counters table and backfills it from
+attendance_records. If create_all already made the table, it is kept, and
+backfilled when it is still empty (the app also rebuilds an empty summary
+on startup, see attendance.summary.ensure_summary).
+
+Revision ID: 115b41db550e
+Revises: 765e42bb4aa9
+Create Date: 2026-10-18 07:21:38.604117
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '115b41db550e'
+down_revision: Union[str, Sequence[str], None] = '765e42bb4aa9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if context.is_offline_mode() or not sa.inspect(op.get_bind()).has_table('attendance_summary'):
+        _create_table()
+
+    # Only into an empty table: rows there were maintained by the app already
+    op.execute("""
+        INSERT INTO attendance_summary (student_roll_no, subject_id, present, absent, medical_leave, total)
+        SELECT r.student_roll_no, s.subject_id,
+               SUM(CASE WHEN r.status = 'PRESENT' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN r.status = 'ABSENT' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN r.status = 'MEDICAL_LEAVE' THEN 1 ELSE 0 END),
+               COUNT(r.id)
+        FROM attendance_records r
+        JOIN attendance_sessions s ON s.id = r.session_id
+        WHERE NOT EXISTS (SELECT 1 FROM attendance_summary)
+        GROUP BY r.student_roll_no, s.subject_id
+    """)
+
+
+def _create_table() -> None:
+    op.create_table('attendance_summary',
+    sa.Column('student_roll_no', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('subject_id', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('present', sa.Integer(), nullable=False),
+    sa.Column('absent', sa.Integer(), nullable=False),
+    sa.Column('medical_leave', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('student_roll_no', 'subject_id')
+    )
+    op.create_index(op.f('ix_attendance_summary_subject_id'), 'attendance_summary', ['subject_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_attendance_summary_subject_id'), table_name='attendance_summary')
+    op.drop_table('attendance_summary')
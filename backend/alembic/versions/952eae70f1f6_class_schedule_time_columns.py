@@ -0,0 +1,43 @@
+"""class schedule time columns
+
+class_schedules.start_time / end_time go from "HH:MM" strings to TIME.
+
+Revision ID: 952eae70f1f6
+Revises: 115b41db550e
+Create Date: 2026-10-18 07:21:49.277350
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '952eae70f1f6'
+down_revision: Union[str, Sequence[str], None] = '115b41db550e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('class_schedules', schema=None) as batch_op:
+        for column in ('start_time', 'end_time'):
+            batch_op.alter_column(column,
+                   existing_type=sa.VARCHAR(),
+                   type_=sa.Time(),
+                   existing_nullable=False,
+                   postgresql_using=f'{column}::time')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('class_schedules', schema=None) as batch_op:
+        for column in ('start_time', 'end_time'):
+            batch_op.alter_column(column,
+                   existing_type=sa.Time(),
+                   type_=sqlmodel.sql.sqltypes.AutoString(),
+                   existing_nullable=False,
+                   postgresql_using=f"to_char({column}, 'HH24:MI')")
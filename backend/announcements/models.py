@@ -2,7 +2,7 @@ from sqlmodel import SQLModel, Field, Relationship
 from typing import Optional, List
 from datetime import datetime
 import uuid as uuid_pkg
-from sqlalchemy import JSON, Column
+from sqlalchemy import JSON, Column, Index
 from auth.models import User
 
 
@@ -17,6 +17,8 @@ class AnnounceGroup(SQLModel, table=True):
 
 class AnnounceMember(SQLModel, table=True):
     __tablename__ = "announce_members"
+    # "my groups" and membership checks look up by user first
+    __table_args__ = (Index("ix_announce_members_user_group", "user_id", "group_id"),)
     id: Optional[int] = Field(default=None, primary_key=True)
     group_id: int = Field(foreign_key="announce_groups.id")
     user_id: uuid_pkg.UUID = Field(foreign_key="users.id")
@@ -34,6 +36,8 @@ class GroupTag(SQLModel, table=True):
 
 class Announcement(SQLModel, table=True):
     __tablename__ = "announcements"
+    # Group feed: live messages of one group in time order
+    __table_args__ = (Index("ix_announcements_group_deleted_created", "group_id", "is_deleted", "created_at"),)
     id: Optional[int] = Field(default=None, primary_key=True)
     group_id: int = Field(foreign_key="announce_groups.id")
     admin_id: uuid_pkg.UUID = Field(foreign_key="users.id")
@@ -57,7 +61,7 @@ class PollOption(SQLModel, table=True):
 class PollVote(SQLModel, table=True):
     __tablename__ = "announce_poll_votes"
     id: Optional[int] = Field(default=None, primary_key=True)
-    option_id: int = Field(foreign_key="announce_poll_options.id")
+    option_id: int = Field(foreign_key="announce_poll_options.id", index=True)
     announcement_id: int = Field(foreign_key="announcements.id")  # denormalized for fast lookup
     user_id: uuid_pkg.UUID = Field(foreign_key="users.id")
 
@@ -65,6 +69,6 @@ class PollVote(SQLModel, table=True):
 class Reaction(SQLModel, table=True):
     __tablename__ = "announce_reactions"
     id: Optional[int] = Field(default=None, primary_key=True)
-    announcement_id: int = Field(foreign_key="announcements.id")
+    announcement_id: int = Field(foreign_key="announcements.id", index=True)
     user_id: uuid_pkg.UUID = Field(foreign_key="users.id")
     emoji: str
\ No newline at end of file
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
 from sqlmodel import Session, select
 from database import get_db
 from auth.models import User
-from core.dependencies import get_current_user
+from core.dependencies import get_current_user, get_token_principal, Principal
 from .models import (
     AnnounceGroup, AnnounceMember, GroupTag,
     Announcement, PollOption, PollVote, Reaction
@@ -118,7 +118,7 @@ def join_group(
 
 @router.get("/groups/my")
 def get_my_groups(
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_token_principal),
     db: Session = Depends(get_db)
 ):
     memberships = db.exec(
@@ -149,7 +149,7 @@ def get_my_groups(
 @router.get("/groups/{group_id}/members")
 def get_members(
     group_id: int,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_token_principal),
     db: Session = Depends(get_db)
 ):
     member = _get_member(db, group_id, user.id)
@@ -308,7 +308,7 @@ def create_announcement(
 @router.get("/groups/{group_id}/messages")
 def get_announcements(
     group_id: int,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_token_principal),
     db: Session = Depends(get_db)
 ):
     if not _get_member(db, group_id, user.id):
@@ -525,7 +525,7 @@ def vote_poll(
 @router.get("/groups/{group_id}/tags")
 def get_tags(
     group_id: int,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_token_principal),
     db: Session = Depends(get_db)
 ):
     if not _get_member(db, group_id, user.id):
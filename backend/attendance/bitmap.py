@@ -0,0 +1,231 @@
+"""
+Compact attendance storage, used for new sessions when ATTENDANCE_STORAGE="bitmap".
+
+Instead of one attendance_records row per student, a session keeps:
+
+  attendance_rosters            the ordered roll numbers it was marked against,
+                                frozen when the session is stored and shared by
+                                every session of the subject with the same list
+  attendance_bitmaps            one bit per roster position, 1 = PRESENT
+  attendance_bitmap_exceptions  positions that are neither PRESENT nor ABSENT
+                                (medical leave)
+
+A class of 60 costs 8 bytes per session instead of 60 rows. attendance_summary
+is kept up to date exactly as for row sessions, so stats, analytics and the
+shortage roster read it unchanged; the helpers below are for readers that need
+individual marks (export, summary rebuild/check, medical leave, sync replays).
+Both layouts can live side by side: a session is a bitmap session when it has
+an attendance_bitmaps row.
+"""
+import hashlib
+import uuid as uuid_pkg
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import delete, insert, or_
+from sqlmodel import Session, select
+from attendance.models import (
+    AttendanceBitmap, AttendanceBitmapException, AttendanceRoster, AttendanceSession, AttendanceStatus,
+)
+from database import upsert_insert
+
+PRESENT = AttendanceStatus.PRESENT.value
+ABSENT = AttendanceStatus.ABSENT.value
+MEDICAL_LEAVE = AttendanceStatus.MEDICAL_LEAVE.value
+
+# Bitmap sessions decoded per round trip
+CHUNK_SIZE = 1000
+
+def _status_value(status) -> str:
+    return status.value if isinstance(status, AttendanceStatus) else status
+
+# --- Encoding ---
+def roster_digest(subject_code: str, roll_numbers: list) -> str:
+    return hashlib.sha256("\n".join([subject_code, *roll_numbers]).encode("utf-8")).hexdigest()
+
+def encode(roll_numbers: list, marks: dict):
+    """
+    marks: {roll_no: status} for exactly the roll numbers of the roster.
+    Returns (bitmap bytes, {position: status} for the exceptions).
+    """
+    bits, exceptions = 0, {}
+    for position, roll_no in enumerate(roll_numbers):
+        status = _status_value(marks[roll_no])
+        if status == PRESENT:
+            bits |= 1 << position
+        elif status != ABSENT:
+            exceptions[position] = status
+    return bits.to_bytes((len(roll_numbers) + 7) // 8, "little"), exceptions
+
+class DecodedSession:
+    """One bitmap session, readable by position or roll number without expanding it."""
+    __slots__ = ("session_id", "subject_id", "session_date", "slot", "roster_id", "roll_numbers", "index", "bits", "exceptions")
+
+    def __init__(self, session_id, subject_id, session_date, slot, roster, present: bytes, exceptions: dict):
+        self.session_id = session_id
+        self.subject_id = subject_id
+        self.session_date = session_date
+        self.slot = slot
+        self.roster_id, self.roll_numbers, self.index = roster
+        self.bits = int.from_bytes(present, "little")
+        self.exceptions = exceptions
+
+    def status_at(self, position: int) -> str:
+        if position in self.exceptions:
+            return self.exceptions[position]
+        return PRESENT if self.bits >> position & 1 else ABSENT
+
+    def status_of(self, roll_no: str):
+        """None when the student was not on this session's roster."""
+        position = self.index.get(roll_no)
+        return None if position is None else self.status_at(position)
+
+    def marks(self):
+        """(roll_no, status) pairs in roster (roll number) order."""
+        for position, roll_no in enumerate(self.roll_numbers):
+            yield roll_no, self.status_at(position)
+
+    def present_positions(self):
+        bits = self.bits
+        while bits:
+            lowest = bits & -bits
+            yield lowest.bit_length() - 1
+            bits ^= lowest
+
+# --- Writes (never commit; callers own the transaction) ---
+def _roster_id(db: Session, subject_code: str, roll_numbers: list):
+    digest = roster_digest(subject_code, roll_numbers)
+    lookup = select(AttendanceRoster.id).where(AttendanceRoster.digest == digest)
+    roster_id = db.exec(lookup).first()
+    if roster_id is None:
+        statement = upsert_insert(db, AttendanceRoster.__table__).on_conflict_do_nothing(index_elements=["digest"])
+        db.execute(statement, {
+            "id": uuid_pkg.uuid4(),
+            "subject_id": subject_code,
+            "digest": digest,
+            "roll_numbers": roll_numbers,
+            "created_at": datetime.utcnow(),
+        })
+        roster_id = db.exec(lookup).one()
+    return roster_id
+
+def store_marks(db: Session, session_id, subject_code: str, marks: dict):
+    """Writes (or rewrites) the whole bitmap of one session from {roll_no: status}."""
+    roll_numbers = sorted(marks)
+    present, exceptions = encode(roll_numbers, marks)
+    table = AttendanceBitmap.__table__
+    statement = upsert_insert(db, table)
+    statement = statement.on_conflict_do_update(
+        index_elements=["session_id"],
+        set_={"roster_id": statement.excluded.roster_id, "present": statement.excluded.present},
+    )
+    db.execute(statement, {"session_id": session_id, "roster_id": _roster_id(db, subject_code, roll_numbers), "present": present})
+    db.execute(delete(AttendanceBitmapException).where(AttendanceBitmapException.session_id == session_id))
+    if exceptions:
+        db.execute(insert(AttendanceBitmapException), [
+            {"session_id": session_id, "position": position, "status": status}
+            for position, status in exceptions.items()
+        ])
+
+# --- Reads ---
+def iter_sessions(db: Session, *criteria):
+    """
+    Decoded bitmap sessions matching criteria on AttendanceSession, ordered like
+    the register (date, subject, slot). Rosters and exceptions are fetched
+    once per chunk of CHUNK_SIZE sessions; rosters are shared across chunks.
+    """
+    statement = (
+        select(
+            AttendanceBitmap.session_id, AttendanceBitmap.roster_id, AttendanceBitmap.present,
+            AttendanceSession.subject_id, AttendanceSession.session_date, AttendanceSession.slot,
+        )
+        .join(AttendanceSession, AttendanceSession.id == AttendanceBitmap.session_id)
+        .where(*criteria)
+        .order_by(AttendanceSession.session_date, AttendanceSession.subject_id, AttendanceSession.slot)
+    )
+    rosters = {}
+    result = db.execute(statement.execution_options(stream_results=True, yield_per=CHUNK_SIZE))
+    for partition in result.partitions():
+        missing = list({roster_id for _, roster_id, *_ in partition} - rosters.keys())
+        if missing:
+            for roster_id, roll_numbers in db.exec(
+                select(AttendanceRoster.id, AttendanceRoster.roll_numbers).where(AttendanceRoster.id.in_(missing))
+            ).all():
+                rosters[roster_id] = (roster_id, roll_numbers, {roll_no: i for i, roll_no in enumerate(roll_numbers)})
+
+        exceptions = defaultdict(dict)
+        for session_id, position, status in db.exec(
+            select(AttendanceBitmapException.session_id, AttendanceBitmapException.position, AttendanceBitmapException.status)
+            .where(AttendanceBitmapException.session_id.in_([row[0] for row in partition]))
+        ).all():
+            exceptions[session_id][position] = _status_value(status)
+
+        for session_id, roster_id, present, subject_id, session_date, slot in partition:
+            yield DecodedSession(session_id, subject_id, session_date, slot, rosters[roster_id], present, exceptions.get(session_id, {}))
+
+def load_sessions(db: Session, session_ids: list) -> dict:
+    """{session_id: DecodedSession} for those of session_ids stored as bitmaps."""
+    found = {}
+    for i in range(0, len(session_ids), CHUNK_SIZE):
+        for decoded in iter_sessions(db, AttendanceSession.id.in_(session_ids[i:i + CHUNK_SIZE])):
+            found[decoded.session_id] = decoded
+    return found
+
+def aggregate_counts(db: Session, *criteria) -> dict:
+    """
+    {(roll_no, subject_code): {"present", "absent", "medical_leave", "total"}}
+    over bitmap sessions, the counterpart of GROUP BY over attendance_records.
+    Sessions are summed per roster first (a popcount walk per session), then
+    expanded to students once per roster.
+    """
+    per_roster = {}
+    for decoded in iter_sessions(db, *criteria):
+        key = (decoded.roster_id, decoded.subject_id)
+        if key not in per_roster:
+            size = len(decoded.roll_numbers)
+            per_roster[key] = [decoded.roll_numbers, 0, [0] * size, [0] * size]
+        counts = per_roster[key]
+        counts[1] += 1
+        present, medical_leave = counts[2], counts[3]
+        for position in decoded.present_positions():
+            present[position] += 1
+        for position, status in decoded.exceptions.items():
+            if status == MEDICAL_LEAVE:
+                medical_leave[position] += 1
+
+    totals = defaultdict(lambda: dict.fromkeys(("present", "absent", "medical_leave", "total"), 0))
+    for (_, subject_id), (roll_numbers, sessions, present, medical_leave) in per_roster.items():
+        for position, roll_no in enumerate(roll_numbers):
+            row = totals[(roll_no, subject_id)]
+            row["present"] += present[position]
+            row["medical_leave"] += medical_leave[position]
+            row["absent"] += sessions - present[position] - medical_leave[position]
+            row["total"] += sessions
+    return dict(totals)
+
+def mark_medical_leave(db: Session, ranges: list) -> list:
+    """
+    Bitmap counterpart of the attendance_records UPDATE in attendance.service:
+    every ABSENT position inside the ranges gets a MEDICAL_LEAVE exception.
+    Returns (roll_no, session_date, subject_code) per mark changed.
+    """
+    if not ranges:
+        return []
+    by_roll = defaultdict(list)
+    for roll_no, from_date, to_date in ranges:
+        by_roll[roll_no].append((from_date, to_date))
+    in_ranges = or_(*(
+        AttendanceSession.session_date.between(from_date, to_date) for _, from_date, to_date in ranges
+    ))
+
+    changed, exceptions = [], []
+    for decoded in iter_sessions(db, in_ranges):
+        for roll_no, spans in by_roll.items():
+            position = decoded.index.get(roll_no)
+            if position is None or decoded.status_at(position) != ABSENT:
+                continue
+            if any(from_date <= decoded.session_date <= to_date for from_date, to_date in spans):
+                exceptions.append({"session_id": decoded.session_id, "position": position, "status": MEDICAL_LEAVE})
+                changed.append((roll_no, decoded.session_date, decoded.subject_id))
+    if exceptions:
+        db.execute(insert(AttendanceBitmapException), exceptions)
+    return changed
@@ -1,36 +1,38 @@
-import uuid as uuid_pkg
-from datetime import date
-from sqlmodel import Session, select, func
-from attendance.models import AttendanceSession, AttendanceRecord
+from sqlmodel import Session, select
+from attendance.models import AttendanceStatus
 from students.models import Student
-from subjects.models import Subject
 
-def create_attendance_session(db: Session, subject_code: str, session_date: date, faculty_id: uuid_pkg.UUID, records: list):
-    # 1. Get Subject
-    subject = db.exec(select(Subject).where(Subject.code == subject_code)).first()
-    if not subject: raise ValueError("Subject not found")
+VALID_STATUSES = {s.value for s in AttendanceStatus}
 
-    # 2. Create Session
-    session = AttendanceSession(subject_id=subject.id, faculty_id=faculty_id, session_date=session_date)
-    db.add(session)
-    db.flush()
+def known_roll_numbers(db: Session, roll_numbers) -> set:
+    roll_numbers = list(roll_numbers)
+    if not roll_numbers:
+        return set()
+    return set(db.exec(select(Student.roll_no).where(Student.roll_no.in_(roll_numbers))).all())
 
-    # 3. Bulk Fetch Students to avoid N+1 queries
-    roll_numbers = [r.roll_no for r in records]
-    students = db.exec(select(Student).where(Student.roll_no.in_(roll_numbers))).all()
-    student_map = {s.roll_no: s.id for s in students}
-
-    # 4. Create Records
-    attendance_objs = []
+def split_valid_records(db: Session, records: list, known: set = None):
+    """
+    Checks a submitted class list in one pass: statuses must be known, each roll
+    number may appear once, and all roll numbers are matched against `students`
+    with a single IN query (or against `known`, when the caller already looked
+    them up). Returns (accepted {roll_no: status}, rejected rows).
+    """
+    accepted, rejected = {}, []
+    candidates = {}
     for r in records:
-        if r.roll_no in student_map:
-            attendance_objs.append(AttendanceRecord(
-                session_id=session.id, 
-                student_id=student_map[r.roll_no], 
-                status=r.status
-            ))
-    
-    db.add_all(attendance_objs)
-    db.commit()
-    db.refresh(session)
-    return session
\ No newline at end of file
+        roll_no = (r.roll_no or "").strip()
+        if r.status not in VALID_STATUSES:
+            rejected.append({"roll_no": roll_no, "reason": f"Invalid status '{r.status}'"})
+        elif roll_no in candidates:
+            rejected.append({"roll_no": roll_no, "reason": "Duplicate roll number"})
+        else:
+            candidates[roll_no] = r.status
+
+    if known is None:
+        known = known_roll_numbers(db, candidates)
+    for roll_no, status in candidates.items():
+        if roll_no in known:
+            accepted[roll_no] = status
+        else:
+            rejected.append({"roll_no": roll_no, "reason": "Unknown roll number"})
+    return accepted, rejected
@@ -0,0 +1,225 @@
+"""
+Streaming attendance register export for one department + semester.
+
+Rows are read with server-side cursors (stream_results + yield_per) and written
+out chunk by chunk, so memory stays flat however many attendance_records
+match. Two layouts:
+
+  long  one line per record: date, subject, slot, roll_no, name, status
+  wide  one line per student, one column per session (the paper register)
+
+Sessions stored as bitmaps (attendance.bitmap) are decoded on the fly and
+merged into the same order. CSV needs nothing extra; Parquet needs pyarrow
+(in requirements.txt). A server installed without it answers 501 for Parquet.
+"""
+import csv
+import heapq
+import io
+from datetime import date
+from sqlmodel import Session, select
+from attendance.models import AttendanceRecord, AttendanceSession
+from students.models import Student
+from subjects.models import Subject
+from database import engine
+from attendance import bitmap
+
+CHUNK_SIZE = 5000
+
+class ExportScope:
+    def __init__(self, department_id: str, semester: int, from_date: date, to_date: date):
+        self.department_id = department_id
+        self.semester = semester
+        self.from_date = from_date
+        self.to_date = to_date
+
+    def sessions(self):
+        """Sessions of this department-semester's subjects inside the date range."""
+        return (
+            select(AttendanceSession.id, AttendanceSession.session_date, AttendanceSession.subject_id, AttendanceSession.slot)
+            .join(Subject, Subject.code == AttendanceSession.subject_id)
+            .where(Subject.department_id == self.department_id)
+            .where(Subject.semester == self.semester)
+            .where(AttendanceSession.session_date.between(self.from_date, self.to_date))
+        )
+
+def _stream(db: Session, statement):
+    # Server-side cursor on Postgres; rows arrive CHUNK_SIZE at a time
+    result = db.execute(statement.execution_options(stream_results=True, yield_per=CHUNK_SIZE))
+    for partition in result.partitions():
+        yield partition
+
+# --- Row sources ---
+# slot tells apart two sessions of one subject on the same day
+LONG_HEADER = ["session_date", "subject_code", "slot", "roll_no", "name", "status"]
+
+def _chunked(rows):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _long_record_rows(db: Session, scope: ExportScope):
+    sessions = scope.sessions().subquery()
+    statement = (
+        select(sessions.c.session_date, sessions.c.subject_id, sessions.c.slot, Student.roll_no, Student.name, AttendanceRecord.status)
+        .join(sessions, sessions.c.id == AttendanceRecord.session_id)
+        .join(Student, Student.roll_no == AttendanceRecord.student_roll_no)
+        .where(Student.department_id == scope.department_id)
+        .where(Student.semester == scope.semester)
+        .order_by(sessions.c.session_date, sessions.c.subject_id, sessions.c.slot, Student.roll_no)
+    )
+    for partition in _stream(db, statement):
+        for session_date, subject_code, slot, roll_no, name, status in partition:
+            yield [session_date.isoformat(), subject_code, slot, roll_no, name, getattr(status, "value", status)]
+
+def _long_bitmap_rows(db: Session, scope: ExportScope):
+    # Only this department-semester's students, like the join on the record side
+    names = dict(db.exec(
+        select(Student.roll_no, Student.name)
+        .where(Student.department_id == scope.department_id)
+        .where(Student.semester == scope.semester)
+    ).all())
+    in_scope = AttendanceSession.id.in_(scope.sessions().with_only_columns(AttendanceSession.id))
+    for decoded in bitmap.iter_sessions(db, in_scope):
+        for roll_no, status in decoded.marks():
+            if roll_no in names:
+                yield [decoded.session_date.isoformat(), decoded.subject_id, decoded.slot, roll_no, names[roll_no], status]
+
+def long_rows(db: Session, scope: ExportScope):
+    # Both sources come ordered by (date, subject, slot, roll_no); merge them into one register
+    rows = heapq.merge(_long_record_rows(db, scope), _long_bitmap_rows(db, scope), key=lambda row: row[:4])
+    yield from _chunked(rows)
+
+def wide_columns(db: Session, scope: ExportScope):
+    """Ordered (session_id, column name) pairs; a subject's extra sessions on one day get a #slot suffix."""
+    sessions = db.exec(
+        scope.sessions().order_by(AttendanceSession.session_date, AttendanceSession.subject_id, AttendanceSession.slot)
+    ).all()
+    columns = []
+    for session_id, session_date, subject_code, slot in sessions:
+        name = f"{session_date.isoformat()} {subject_code}"
+        columns.append((session_id, name if slot == 1 else f"{name} #{slot}"))
+    return columns
+
+def wide_rows(db: Session, scope: ExportScope, columns: list):
+    # Students LEFT JOIN their in-scope records, ordered by student, so each
+    # register line is complete as soon as the roll number changes
+    position = {session_id: i for i, (session_id, _) in enumerate(columns)}
+    decoded = bitmap.load_sessions(db, list(position))
+    bitmap_columns = [(2 + position[session_id], session) for session_id, session in decoded.items()]
+    sessions = scope.sessions().subquery()
+    records = (
+        select(AttendanceRecord.student_roll_no, AttendanceRecord.session_id, AttendanceRecord.status)
+        .join(sessions, sessions.c.id == AttendanceRecord.session_id)
+        .subquery()
+    )
+    statement = (
+        select(Student.roll_no, Student.name, records.c.session_id, records.c.status)
+        .outerjoin(records, records.c.student_roll_no == Student.roll_no)
+        .where(Student.department_id == scope.department_id)
+        .where(Student.semester == scope.semester)
+        .order_by(Student.roll_no)
+    )
+
+    current = None
+    for partition in _stream(db, statement):
+        finished = []
+        for roll_no, name, session_id, status in partition:
+            if current is None or current[0] != roll_no:
+                if current is not None:
+                    finished.append(current)
+                current = [roll_no, name] + [None] * len(columns)
+                for column, session in bitmap_columns:
+                    current[column] = session.status_of(roll_no)
+            if session_id in position:
+                current[2 + position[session_id]] = getattr(status, "value", status)
+        yield finished
+    if current is not None:
+        yield [current]
+
+# --- Writers ---
+def csv_chunks(header: list, row_chunks):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for rows in row_chunks:
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+class _StreamSink(io.RawIOBase):
+    """
+    Write-only file object for pyarrow: keeps only the bytes written since the
+    last drain(), and tracks the absolute position pyarrow asks for via tell().
+    """
+
+    def __init__(self):
+        self._pending = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self._pending.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data, self._pending = b"".join(self._pending), []
+        return data
+
+def parquet_chunks(header: list, row_chunks):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([pa.field(name, pa.string()) for name in header])
+    sink = _StreamSink()
+    writer = pq.ParquetWriter(sink, schema, compression="snappy")
+    try:
+        for rows in row_chunks:
+            if rows:
+                # One row group per chunk: columns are built from this chunk only
+                columns = [[None if v is None else str(v) for v in column] for column in zip(*rows)]
+                writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def export_register(scope: ExportScope, layout: str = "long", file_format: str = "csv"):
+    """Generator of encoded file chunks; opens its own session for the lifetime of the stream."""
+    with Session(engine) as db:
+        if layout == "wide":
+            columns = wide_columns(db, scope)
+            header = ["roll_no", "name"] + [name for _, name in columns]
+            rows = wide_rows(db, scope, columns)
+        else:
+            header = LONG_HEADER
+            rows = long_rows(db, scope)
+
+        if file_format == "parquet":
+            yield from parquet_chunks(header, rows)
+        else:
+            for text in csv_chunks(header, rows):
+                yield text.encode("utf-8")
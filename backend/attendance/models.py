@@ -1,6 +1,7 @@
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import JSON, Column, Index, LargeBinary, UniqueConstraint
 from typing import Optional, List
-from datetime import date, datetime
+from datetime import date, datetime, time
 import uuid as uuid_pkg
 from enum import Enum
 
@@ -26,8 +27,8 @@ class ClassSchedule(SQLModel, table=True):
     subject_id: uuid_pkg.UUID = Field(foreign_key="subjects.id", index=True)
     faculty_id: uuid_pkg.UUID = Field(foreign_key="users.id", index=True)
     day_of_week: DayOfWeek
-    start_time: str # Format "HH:MM" (e.g., "10:30")
-    end_time: str   # Format "HH:MM"
+    start_time: time # e.g. time(10, 30)
+    end_time: time
     room_number: str = Field(default="LAB-1")
 
     # We don't need extensive relationships for this demo, keeping it lightweight
@@ -36,18 +37,34 @@ class ClassSchedule(SQLModel, table=True):
 # --- EXISTING MODELS (Unchanged) ---
 class AttendanceSession(SQLModel, table=True):
     __tablename__ = "attendance_sessions"
+    __table_args__ = (
+        # One session per subject, date and slot (resubmits update it in place);
+        # also serves per-subject date lookups and plain subject_id filters
+        UniqueConstraint("subject_id", "session_date", "slot", name="uq_attendance_sessions_slot"),
+        # A client id names one offline capture; NULL (online submits) never collides
+        UniqueConstraint("subject_id", "session_date", "client_session_id", name="uq_attendance_sessions_client"),
+    )
     id: uuid_pkg.UUID = Field(default_factory=uuid_pkg.uuid4, primary_key=True)
-    subject_id: str = Field(index=True) 
+    subject_id: str
     faculty_id: uuid_pkg.UUID = Field(foreign_key="users.id")
     session_date: date = Field(index=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    client_session_id: Optional[str] = Field(default=None) # Set by the app for offline-captured sessions
+    slot: int = Field(default=1) # 2, 3, ... for a subject's extra classes on the same day
     records: List["AttendanceRecord"] = Relationship(back_populates="session")
 
 class AttendanceRecord(SQLModel, table=True):
     __tablename__ = "attendance_records"
+    # A student's records joined to their sessions; also covers roll_no alone
+    __table_args__ = (
+        Index("ix_attendance_records_student_session", "student_roll_no", "session_id"),
+        # Postgres doesn't index foreign keys; sync, register, export and the
+        # medical-leave UPDATE ... FROM all look records up by session
+        Index("ix_attendance_records_session_student", "session_id", "student_roll_no"),
+    )
     id: uuid_pkg.UUID = Field(default_factory=uuid_pkg.uuid4, primary_key=True)
     session_id: uuid_pkg.UUID = Field(foreign_key="attendance_sessions.id")
-    student_roll_no: str = Field(index=True) 
+    student_roll_no: str
     status: AttendanceStatus = Field(default=AttendanceStatus.ABSENT)
     session: AttendanceSession = Relationship(back_populates="records")
 
@@ -61,4 +78,61 @@ class AttendanceAuditLog(SQLModel, table=True):
     new_status: str
     updated_by: str = "SYSTEM"
     source: str = "MEDICAL_APPROVAL"
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
\ No newline at end of file
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
+
+# --- Materialized per-student, per-subject counters ---
+# Kept in step with attendance_records by attendance.summary in the same
+# transaction as every write, so reads are O(subjects) instead of O(records).
+class AttendanceSummary(SQLModel, table=True):
+    __tablename__ = "attendance_summary"
+    student_roll_no: str = Field(primary_key=True)
+    subject_id: str = Field(primary_key=True, index=True) # Subject code, as on AttendanceSession
+    present: int = Field(default=0)
+    absent: int = Field(default=0)
+    medical_leave: int = Field(default=0)
+    total: int = Field(default=0)
+
+# --- Nightly shortage roster ---
+# Rebuilt in one pass from attendance_summary by attendance.shortage, so HOD
+# and teacher screens read a ready-made, indexed list.
+class ShortageSnapshot(SQLModel, table=True):
+    __tablename__ = "shortage_snapshot"
+    __table_args__ = (
+        Index("ix_shortage_snapshot_dept_shortage_pct", "department_id", "is_shortage", "percentage"),
+        Index("ix_shortage_snapshot_subject_shortage_pct", "subject_id", "is_shortage", "percentage"),
+    )
+    student_roll_no: str = Field(primary_key=True)
+    subject_id: str = Field(primary_key=True) # Subject code
+    student_name: str
+    department_id: str
+    semester: int
+    present: int
+    total: int
+    percentage: float
+    is_shortage: bool
+    classes_needed: int # Consecutive classes to attend to reach the threshold
+    computed_at: datetime
+
+# --- Compact storage mode (ATTENDANCE_STORAGE="bitmap") ---
+# A session stored this way has no attendance_records: presence is one bit per
+# position of a frozen, ordered roster snapshot, and anything that is not
+# PRESENT/ABSENT (medical leave) is an exception row. See attendance.bitmap.
+class AttendanceRoster(SQLModel, table=True):
+    __tablename__ = "attendance_rosters"
+    id: uuid_pkg.UUID = Field(default_factory=uuid_pkg.uuid4, primary_key=True)
+    subject_id: str = Field(index=True) # Subject code
+    digest: str = Field(unique=True) # sha256 of the ordered roll numbers; identical rosters are shared
+    roll_numbers: List[str] = Field(sa_column=Column(JSON, nullable=False))
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class AttendanceBitmap(SQLModel, table=True):
+    __tablename__ = "attendance_bitmaps"
+    session_id: uuid_pkg.UUID = Field(foreign_key="attendance_sessions.id", primary_key=True)
+    roster_id: uuid_pkg.UUID = Field(foreign_key="attendance_rosters.id", index=True)
+    present: bytes = Field(sa_column=Column(LargeBinary, nullable=False)) # bit i = roll_numbers[i], little-endian
+
+class AttendanceBitmapException(SQLModel, table=True):
+    __tablename__ = "attendance_bitmap_exceptions"
+    session_id: uuid_pkg.UUID = Field(foreign_key="attendance_sessions.id", primary_key=True)
+    position: int = Field(primary_key=True)
+    status: AttendanceStatus
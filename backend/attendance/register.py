@@ -0,0 +1,97 @@
+"""
+Register matrix of one subject: students x sessions in a date range, the
+classic paper register, encoded compactly instead of as nested objects:
+
+  roster    ["2301105201", ...]     row order shared by every session
+  names     ["Asha", ...]           parallel to roster
+  sessions  [{"id", "date", "marks"}, ...] in date order
+
+marks has one character per roster position: P present, A absent,
+M medical leave, - not marked. With encoding="rle" runs are collapsed
+("P12A1P7"), which is smaller still for mostly-present classes. A 120 x 60
+grid is a few KB either way.
+"""
+from collections import defaultdict
+from datetime import date
+from sqlmodel import Session, select
+from attendance.models import AttendanceRecord, AttendanceSession, AttendanceStatus
+from students.models import Student
+from subjects.models import Subject
+from attendance import bitmap
+
+CODES = {
+    AttendanceStatus.PRESENT.value: "P",
+    AttendanceStatus.ABSENT.value: "A",
+    AttendanceStatus.MEDICAL_LEAVE.value: "M",
+}
+NOT_MARKED = "-"
+
+def run_length(marks: str) -> str:
+    """'PPPA' -> 'P3A1'"""
+    runs, previous, count = [], None, 0
+    for code in marks:
+        if code == previous:
+            count += 1
+            continue
+        if previous is not None:
+            runs.append(f"{previous}{count}")
+        previous, count = code, 1
+    if previous is not None:
+        runs.append(f"{previous}{count}")
+    return "".join(runs)
+
+def register_matrix(db: Session, subject_code: str, from_date: date, to_date: date, encoding: str = "chars") -> dict:
+    in_range = (
+        (AttendanceSession.subject_id == subject_code),
+        AttendanceSession.session_date.between(from_date, to_date),
+    )
+    sessions = db.exec(
+        select(AttendanceSession.id, AttendanceSession.session_date)
+        .where(*in_range)
+        .order_by(AttendanceSession.session_date, AttendanceSession.created_at)
+    ).all()
+
+    # 1. Every row-stored mark of the range in one query; bitmap sessions decode in place
+    marks = defaultdict(dict)
+    for session_id, roll_no, status in db.exec(
+        select(AttendanceRecord.session_id, AttendanceRecord.student_roll_no, AttendanceRecord.status)
+        .join(AttendanceSession, AttendanceSession.id == AttendanceRecord.session_id)
+        .where(*in_range)
+    ).all():
+        marks[session_id][roll_no] = getattr(status, "value", status)
+    for decoded in bitmap.iter_sessions(db, *in_range):
+        marks[decoded.session_id] = dict(decoded.marks())
+
+    # 2. Rows: the subject's class (its department and semester), plus anyone
+    #    marked who has since left it. Not roll_lists: its demo fallback would
+    #    put the whole college on the register of a class with no students
+    roster = set(db.exec(
+        select(Student.roll_no)
+        .join(Subject, (Subject.department_id == Student.department_id) & (Subject.semester == Student.semester))
+        .where(Subject.code == subject_code)
+    ).all())
+    for session_marks in marks.values():
+        roster.update(session_marks)
+    roster = sorted(roster)
+    names = dict(db.exec(select(Student.roll_no, Student.name).where(Student.roll_no.in_(roster))).all()) if roster else {}
+
+    encoded = []
+    for session_id, session_date in sessions:
+        session_marks = marks.get(session_id, {})
+        line = "".join(CODES.get(session_marks.get(roll_no), NOT_MARKED) for roll_no in roster)
+        encoded.append({
+            "id": str(session_id),
+            "date": session_date.isoformat(),
+            "marks": run_length(line) if encoding == "rle" else line,
+        })
+
+    return {
+        "subject_id": subject_code,
+        "from_date": from_date.isoformat(),
+        "to_date": to_date.isoformat(),
+        "encoding": encoding,
+        "legend": {code: status for status, code in CODES.items()} | {NOT_MARKED: None},
+        "roster": roster,
+        "names": [names.get(roll_no) for roll_no in roster],
+        "sessions": encoded,
+    }
@@ -0,0 +1,165 @@
+"""
+Per-subject roll-list cache for POST /api/attendance/roll-list.
+
+Entries are keyed by subject code and remember which roster "scopes" they were
+built from: a (department_id, semester) pair, "*" when the all-students demo
+fallback was used, or "users" for the users-table fallback. Student, Subject
+and student-User writes drop the matching entries at flush and again after
+commit, so readers never keep a list that predates a committed change.
+Bulk writes that bypass the ORM unit of work call mark_roster_changed().
+
+The cache is per process; ROLL_LIST_CACHE_TTL_SECONDS bounds how long another
+worker can serve a list after a roster change.
+"""
+import hashlib
+import threading
+from dataclasses import dataclass
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session as OrmSession, object_session
+from sqlmodel import Session, select
+from core.cache import TTLCache
+from config import ROLL_LIST_CACHE_TTL_SECONDS, ROLL_LIST_CACHE_MAX_ENTRIES
+from auth.models import User
+from students.models import Student
+from subjects.models import Subject
+
+ALL_STUDENTS = "*"
+ALL_STUDENT_USERS = "users"
+
+@dataclass(frozen=True)
+class RollList:
+    roll_numbers: tuple
+    digest: str
+    scopes: frozenset
+
+    def etag(self, on_date) -> str:
+        # The response body also carries today's date, so it is part of the tag
+        return f'"{self.digest}-{on_date.isoformat()}"'
+
+roll_list_cache = TTLCache(maxsize=ROLL_LIST_CACHE_MAX_ENTRIES, ttl=ROLL_LIST_CACHE_TTL_SECONDS)
+
+# Bumped on every invalidation; a reader only stores what it built if no
+# invalidation happened while it was querying.
+_generation = 0
+_generation_lock = threading.Lock()
+
+def _bump_generation():
+    global _generation
+    with _generation_lock:
+        _generation += 1
+
+def invalidate_scopes(scopes) -> int:
+    scopes = set(scopes)
+    student_scopes = scopes - {ALL_STUDENT_USERS}
+    _bump_generation()
+
+    def affected(code, entry):
+        # The all-students fallback depends on every (department, semester)
+        return bool(entry.scopes & scopes) or (ALL_STUDENTS in entry.scopes and bool(student_scopes))
+    return roll_list_cache.discard_where(affected)
+
+def invalidate_subjects(codes) -> int:
+    codes = set(codes)
+    _bump_generation()
+    return roll_list_cache.discard_where(lambda code, entry: code in codes)
+
+def _build(db: Session, subject_code: str) -> RollList:
+    # 1. Try to find the Subject to know its Semester
+    subject = db.exec(select(Subject).where(Subject.code == subject_code)).first()
+
+    roll_numbers = []
+    scopes = set()
+    if subject:
+        # 2. Attempt: Smart Filter (Students in that Semester)
+        scopes.add((subject.department_id, subject.semester))
+        roll_numbers = db.exec(
+            select(Student.roll_no)
+            .where(Student.department_id == subject.department_id)
+            .where(Student.semester == subject.semester)
+            .order_by(Student.roll_no)
+        ).all()
+
+    # 3. Fallback: If Smart Filter returned 0 (or subject not found), fetch ALL students
+    if not roll_numbers:
+        print(f"⚠️ Smart Filter empty for {subject_code}. Falling back to ALL students.")
+        scopes.add(ALL_STUDENTS)
+        roll_numbers = db.exec(select(Student.roll_no).order_by(Student.roll_no)).all()
+
+    # 4. Final Safety: If Student table is empty, look at Users table
+    if not roll_numbers:
+        print("⚠️ Student table empty. Falling back to User table.")
+        scopes.add(ALL_STUDENT_USERS)
+        roll_numbers = db.exec(select(User.username).where(User.role == "STUDENT").order_by(User.username)).all()
+
+    roll_numbers = tuple(roll_numbers)
+    digest = hashlib.sha256("\n".join(roll_numbers).encode()).hexdigest()[:20]
+    return RollList(roll_numbers=roll_numbers, digest=digest, scopes=frozenset(scopes))
+
+def get_roll_list(db: Session, subject_code: str) -> RollList:
+    entry = roll_list_cache.get(subject_code)
+    if entry is None:
+        generation = _generation
+        entry = _build(db, subject_code)
+        if generation == _generation:
+            roll_list_cache.set(subject_code, entry)
+    return entry
+
+def mark_roster_changed(db: Session, scopes=(), subject_codes=()):
+    """Queues an invalidation for after the current transaction commits."""
+    db.info.setdefault("roll_list_scopes", set()).update(scopes)
+    db.info.setdefault("roll_list_subjects", set()).update(subject_codes)
+    invalidate_scopes(scopes)
+    invalidate_subjects(subject_codes)
+
+# --- ORM hooks ---
+def _old_and_new(target, *attrs):
+    state = inspect(target)
+    old, new, changed = [], [], False
+    for attr in attrs:
+        history = state.attrs[attr].history
+        value = getattr(target, attr)
+        new.append(value)
+        old.append(history.deleted[0] if history.deleted else value)
+        changed = changed or history.has_changes()
+    return tuple(old), tuple(new), changed
+
+def _listen(model, attrs, on_change):
+    # Inserts and deletes always count; updates only when a roster field moved
+    def handler(is_update):
+        def hook(mapper, connection, target):
+            old, new, changed = _old_and_new(target, *attrs)
+            session = object_session(target)
+            if session is not None and (changed or not is_update):
+                on_change(session, old, new)
+        return hook
+
+    event.listen(model, "after_insert", handler(False))
+    event.listen(model, "after_update", handler(True))
+    event.listen(model, "after_delete", handler(False))
+
+_listen(
+    Student, ("department_id", "semester", "roll_no"),
+    lambda db, old, new: mark_roster_changed(db, scopes={old[:2], new[:2]}),
+)
+_listen(
+    Subject, ("code", "department_id", "semester"),
+    lambda db, old, new: mark_roster_changed(db, subject_codes={old[0], new[0]}),
+)
+_listen(
+    User, ("role", "username"),
+    lambda db, old, new: "STUDENT" in (old[0], new[0]) and mark_roster_changed(db, scopes={ALL_STUDENT_USERS}),
+)
+
+@event.listens_for(OrmSession, "after_commit")
+def _invalidate_after_commit(session):
+    scopes = session.info.pop("roll_list_scopes", None)
+    codes = session.info.pop("roll_list_subjects", None)
+    if scopes:
+        invalidate_scopes(scopes)
+    if codes:
+        invalidate_subjects(codes)
+
+@event.listens_for(OrmSession, "after_rollback")
+def _forget_after_rollback(session):
+    session.info.pop("roll_list_scopes", None)
+    session.info.pop("roll_list_subjects", None)
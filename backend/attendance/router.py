@@ -1,15 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Header, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlmodel import Session, select, func
-from typing import List
-from datetime import date
-from pydantic import BaseModel
+from sqlalchemy.exc import IntegrityError
+from typing import List, Literal, Optional
+from datetime import date, datetime, time
+from pydantic import BaseModel, Field
 import uuid
 
 from database import get_db
-from attendance.models import AttendanceSession, AttendanceRecord, AttendanceStatus, ClassSchedule
+from config import SHORTAGE_THRESHOLD_PERCENT, SYNC_MAX_SESSIONS
+from core.dependencies import require_role
+from attendance.models import AttendanceSession, AttendanceRecord, AttendanceStatus, AttendanceSummary, DayOfWeek, ShortageSnapshot
 from auth.models import User
 from students.models import Student
 from subjects.models import Subject
+from attendance import crud, roll_lists, timetable, export, sync, register
 
 # --- Schemas ---
 class AttendanceItem(BaseModel):
@@ -19,8 +24,19 @@ class AttendanceItem(BaseModel):
 class AttendanceSubmitRequest(BaseModel):
     subject_id: str
     date: date
+    slot: int = Field(default=1, ge=1) # 2, 3, ... for extra classes of the subject that day
     records: List[AttendanceItem]
 
+class SyncSessionItem(BaseModel):
+    client_session_id: str = Field(min_length=1, max_length=64)
+    subject_id: str
+    date: date
+    slot: int = Field(default=1, ge=1)
+    records: List[AttendanceItem]
+
+class SyncRequest(BaseModel):
+    sessions: List[SyncSessionItem] = Field(max_length=SYNC_MAX_SESSIONS)
+
 class RollListRequest(BaseModel):
     class_id: str
     subject_id: str
@@ -31,84 +47,93 @@ class ScheduleItem(BaseModel):
     time_slot: str
     room: str
     class_identifier: str 
+    day_of_week: DayOfWeek
+    start_time: time
+    end_time: time
+
+    @classmethod
+    def from_slot(cls, slot: timetable.Slot) -> "ScheduleItem":
+        return cls(
+            subject_name=slot.subject_name,
+            subject_code=slot.subject_code,
+            time_slot=slot.time_slot,
+            room=slot.room,
+            class_identifier=slot.class_identifier,
+            day_of_week=slot.day,
+            start_time=slot.start,
+            end_time=slot.end,
+        )
+
+class NowResponse(BaseModel):
+    current: Optional[ScheduleItem] = None
+    next: Optional[ScheduleItem] = None
+
+class RoomOccupancy(NowResponse):
+    room: str
+    occupied: bool
 
 # --- Router ---
 router = APIRouter(tags=["Attendance"])
 
+def _as_item(slot) -> Optional[ScheduleItem]:
+    return ScheduleItem.from_slot(slot) if slot else None
+
 @router.get("/teacher/schedule/{faculty_id}", response_model=List[ScheduleItem])
-def get_teacher_schedule(faculty_id: str, db: Session = Depends(get_db)):
+def get_teacher_schedule(faculty_id: str):
     """
-    Fetches the weekly schedule for a specific teacher.
+    Fetches the weekly schedule for a specific teacher, ordered by day and time.
     """
     try:
-        # Convert string ID to UUID if necessary, or assume string if that's how DB is set
-        # For our seed data, IDs are UUIDs.
-        
-        # Join Schedule -> Subject
-        statement = (
-            select(ClassSchedule, Subject)
-            .join(Subject, ClassSchedule.subject_id == Subject.id)
-            .where(ClassSchedule.faculty_id == uuid.UUID(faculty_id))
-        )
-        results = db.exec(statement).all()
-        
-        schedule_list = []
-        for sched, subj in results:
-            schedule_list.append(ScheduleItem(
-                subject_name=subj.name,
-                subject_code=subj.code,
-                time_slot=f"{sched.start_time} - {sched.end_time}",
-                room=sched.room_number,
-                class_identifier=f"{subj.department_id} - {subj.semester}th Sem"
-            ))
-        
-        return schedule_list
-    except Exception as e:
-        print(f"Error fetching schedule: {e}")
+        faculty_uuid = uuid.UUID(faculty_id)
+    except ValueError:
         return []
+    return [ScheduleItem.from_slot(slot) for slot in timetable.get_timetable().week(faculty_uuid)]
+
+@router.get("/teacher/now/{faculty_id}", response_model=NowResponse)
+def get_teacher_now(faculty_id: uuid.UUID, at: Optional[datetime] = None):
+    """The class a teacher is taking right now (if any) and their next one."""
+    current, upcoming = timetable.get_timetable().faculty_at(faculty_id, at or datetime.now())
+    return NowResponse(current=_as_item(current), next=_as_item(upcoming))
+
+@router.get("/room/{room}/occupancy", response_model=RoomOccupancy)
+def get_room_occupancy(room: str, at: Optional[datetime] = None):
+    """Whether a room is in use at `at` (default now), and its next booking."""
+    current, upcoming = timetable.get_timetable().room_at(room, at or datetime.now())
+    return RoomOccupancy(room=room, occupied=current is not None, current=_as_item(current), next=_as_item(upcoming))
 
 @router.post("/roll-list")
-def fetch_roll_list(payload: RollListRequest, db: Session = Depends(get_db)):
+def fetch_roll_list(
+    payload: RollListRequest,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+):
     """
     Fetches the list of students for a given subject.
     Includes a fallback mechanism to ensure the list is never empty for demos.
+    Served from the roll-list cache; clients revalidate with If-None-Match.
     """
-    print(f"Fetching rolls for Subject: {payload.subject_id}")
-    
-    # 1. Try to find the Subject to know its Semester
-    subject = db.exec(select(Subject).where(Subject.code == payload.subject_id)).first()
-    
-    students = []
-    
-    if subject:
-        # 2. Attempt: Smart Filter (Students in that Semester)
-        students = db.exec(
-            select(Student)
-            .where(Student.department_id == subject.department_id)
-            .where(Student.semester == subject.semester)
-            .order_by(Student.roll_no)
-        ).all()
-        print(f"Smart Filter found {len(students)} students for Sem {subject.semester}")
-
-    # 3. Fallback: If Smart Filter returned 0 (or subject not found), fetch ALL students
-    if not students:
-        print("⚠️ Smart Filter empty. Falling back to ALL students.")
-        students = db.exec(select(Student).order_by(Student.roll_no)).all()
-        
-    # 4. Final Safety: If Student table is empty, look at Users table
-    if not students:
-        print("⚠️ Student table empty. Falling back to User table.")
-        users = db.exec(select(User).where(User.role == "STUDENT")).all()
-        # Mock student objects from users
-        roll_numbers = [u.username for u in users]
-    else:
-        roll_numbers = [s.roll_no for s in students]
+    today = date.today()
+    roll_list = roll_lists.get_roll_list(db, payload.subject_id)
+    etag = roll_list.etag(today)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
 
-    return {
-        "date": date.today(), 
-        "roll_numbers": roll_numbers,
-        "count": len(roll_numbers)
-    }
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    return JSONResponse(
+        content={
+            "date": today.isoformat(),
+            "roll_numbers": list(roll_list.roll_numbers),
+            "count": len(roll_list.roll_numbers)
+        },
+        headers=headers,
+    )
+
+SUBMIT_MESSAGES = {
+    "created": "Attendance Saved",
+    "updated": "Attendance Updated",
+    "unchanged": "Attendance already up to date",
+}
 
 @router.post("/submit")
 def submit_attendance(
@@ -123,70 +148,80 @@ def submit_attendance(
         # For resilience, we might create a dummy session or raise error.
         raise HTTPException(status_code=404, detail="Subject not found")
 
-    # 2. Create Session
-    session = AttendanceSession(
-        subject_id=payload.subject_id, # Storing the Code (e.g. CS601) for display
-        session_date=payload.date,
-        faculty_id=subject.faculty_id 
-    )
-    db.add(session)
-    db.commit()
-    db.refresh(session)
-
-    # 3. Add Records
-    for rec in payload.records:
-        record = AttendanceRecord(
-            session_id=session.id,
-            student_roll_no=rec.roll_no,
-            status=rec.status
+    # 2. Upsert on (subject, date, slot): a double tap or retry updates the
+    #    same session, writing only the statuses that changed
+    try:
+        result = sync.sync_sessions(db, [payload], source="ATTENDANCE_RESUBMIT")[0]
+    except IntegrityError:
+        # A concurrent submit created the session first; this pass updates it
+        result = sync.sync_sessions(db, [payload], source="ATTENDANCE_RESUBMIT")[0]
+    if result["status"] == "failed" or not result["accepted"]:
+        raise HTTPException(
+            status_code=400,
+            detail={"message": "No valid attendance records", "rejected": result["rejected_records"]}
         )
-        db.add(record)
-    
-    db.commit()
-    return {"success": True, "message": "Attendance Saved"}
+
+    return {
+        "success": True,
+        "message": SUBMIT_MESSAGES[result["status"]],
+        "status": result["status"],
+        "session_id": result["session_id"],
+        "accepted": result["accepted"],
+        "changed": result["changed"],
+        "rejected": len(result["rejected_records"]),
+        "rejected_records": result["rejected_records"],
+        "skipped_records": result["skipped_records"]
+    }
+
+@router.post("/sync")
+def sync_offline_sessions(
+    payload: SyncRequest,
+    db: Session = Depends(get_db),
+    user=Depends(require_role(["TEACHER", "HOD", "ADMIN"])),
+):
+    """
+    Replays sessions captured offline in one request and one transaction.
+    Safe to retry: sessions are matched on (subject, date, client_session_id).
+    Changes are audited as made by the caller.
+    """
+    try:
+        results = sync.sync_sessions(db, payload.sessions, updated_by=str(user.id))
+    except IntegrityError:
+        # Another device synced the same session concurrently; a retry will match it
+        raise HTTPException(status_code=409, detail="Concurrent sync of the same session, please retry")
+
+    counts = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    return {"success": True, "summary": counts, "results": results}
 
 @router.get("/student/stats/{student_id}")
 def get_student_stats(student_id: str, db: Session = Depends(get_db)):
-    # Total classes
-    total = db.exec(
-        select(func.count(AttendanceRecord.id))
-        .where(AttendanceRecord.student_roll_no == student_id)
-    ).one()
-
-    # Present count
-    present = db.exec(
-        select(func.count(AttendanceRecord.id))
-        .where(AttendanceRecord.student_roll_no == student_id)
-        .where(AttendanceRecord.status == AttendanceStatus.PRESENT)
-    ).one()
+    # Per-subject counters come straight from attendance_summary (one row per
+    # subject), with the real subject name joined in
+    statement = (
+        select(AttendanceSummary.subject_id, Subject.name, AttendanceSummary.total, AttendanceSummary.present)
+        .outerjoin(Subject, Subject.code == AttendanceSummary.subject_id)
+        .where(AttendanceSummary.student_roll_no == student_id)
+        .where(AttendanceSummary.total > 0)
+        .order_by(AttendanceSummary.subject_id)
+    )
+    rows = db.exec(statement).all()
 
+    total = sum(row[2] for row in rows)
+    present = sum(row[3] or 0 for row in rows)
     percentage = round((present / total * 100), 1) if total > 0 else 0.0
 
-    # Subject-wise attendance calculation
-    statement = (
-        select(AttendanceSession.subject_id, AttendanceRecord.status)
-        .join(AttendanceRecord, AttendanceSession.id == AttendanceRecord.session_id)
-        .where(AttendanceRecord.student_roll_no == student_id)
-    )
-    records = db.exec(statement).all()
-    
-    subject_stats = {}
-    for subj_code, status in records:
-        if subj_code not in subject_stats:
-            subject_stats[subj_code] = {"total": 0, "present": 0}
-        subject_stats[subj_code]["total"] += 1
-        if status == AttendanceStatus.PRESENT:
-            subject_stats[subj_code]["present"] += 1
-            
     subjects_list = []
-    for code, data in subject_stats.items():
-        pct = (data["present"] / data["total"]) * 100 if data["total"] > 0 else 0
+    for code, name, subj_total, subj_present in rows:
+        subj_present = subj_present or 0
+        pct = (subj_present / subj_total) * 100 if subj_total > 0 else 0
         subjects_list.append({
             "code": code,
-            "name": f"Subject {code}", # Fallback name, can be joined with Subjects table later
+            "name": name or f"Subject {code}", # Sessions whose code no longer matches a subject
             "percentage": round(pct, 1),
-            "attended": data["present"],
-            "total": data["total"]
+            "attended": subj_present,
+            "total": subj_total
         })
 
     return {
@@ -194,6 +229,93 @@ def get_student_stats(student_id: str, db: Session = Depends(get_db)):
         "total_classes": total,
         "present_count": present,
         "absent_count": total - present,
-        "is_shortage": percentage < 75.0,
+        "is_shortage": percentage < SHORTAGE_THRESHOLD_PERCENT,
         "subjects": subjects_list
-    }
\ No newline at end of file
+    }
+
+def _shortage_rows(rows):
+    return [
+        {
+            "roll_no": r.student_roll_no,
+            "name": r.student_name,
+            "subject_code": r.subject_id,
+            "semester": r.semester,
+            "attended": r.present,
+            "total": r.total,
+            "percentage": round(r.percentage, 1),
+            "is_shortage": r.is_shortage,
+            "classes_needed": r.classes_needed,
+            "computed_at": r.computed_at,
+        }
+        for r in rows
+    ]
+
+@router.get("/shortage/department/{department_id}")
+def get_department_shortage(
+    department_id: str,
+    semester: Optional[int] = None,
+    only_shortage: bool = True,
+    db: Session = Depends(get_db),
+):
+    """Precomputed shortage roster for a department (see attendance.shortage), lowest first."""
+    statement = select(ShortageSnapshot).where(ShortageSnapshot.department_id == department_id)
+    if only_shortage:
+        statement = statement.where(ShortageSnapshot.is_shortage == True)
+    if semester is not None:
+        statement = statement.where(ShortageSnapshot.semester == semester)
+    return _shortage_rows(db.exec(statement.order_by(ShortageSnapshot.percentage)).all())
+
+@router.get("/shortage/subject/{subject_code}")
+def get_subject_shortage(subject_code: str, only_shortage: bool = True, db: Session = Depends(get_db)):
+    """Precomputed shortage roster for one subject, for the teacher's screen."""
+    statement = select(ShortageSnapshot).where(ShortageSnapshot.subject_id == subject_code)
+    if only_shortage:
+        statement = statement.where(ShortageSnapshot.is_shortage == True)
+    return _shortage_rows(db.exec(statement.order_by(ShortageSnapshot.percentage)).all())
+
+@router.get("/export")
+def export_attendance(
+    department_id: str,
+    semester: int,
+    from_date: date,
+    to_date: date,
+    format: Literal["csv", "parquet"] = "csv",
+    layout: Literal["long", "wide"] = "long",
+    user=Depends(require_role(["HOD", "ADMIN"])),
+):
+    """
+    Streams the attendance register of a department-semester for a date range.
+    layout=long gives one line per record; layout=wide one line per student
+    with a column per session.
+    """
+    if from_date > to_date:
+        raise HTTPException(status_code=400, detail="from_date must not be after to_date")
+    if format == "parquet" and not export.parquet_available():
+        raise HTTPException(status_code=501, detail="Parquet export needs pyarrow installed on the server")
+
+    scope = export.ExportScope(department_id, semester, from_date, to_date)
+    filename = f"attendance_{department_id}_sem{semester}_{from_date}_{to_date}_{layout}.{format}"
+    return StreamingResponse(
+        export.export_register(scope, layout, format),
+        media_type="text/csv" if format == "csv" else "application/vnd.apache.parquet",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@router.get("/register/{subject_code}")
+def get_register_matrix(
+    subject_code: str,
+    from_date: date,
+    to_date: date,
+    encoding: Literal["chars", "rle"] = "chars",
+    db: Session = Depends(get_db),
+    user=Depends(require_role(["TEACHER", "HOD", "ADMIN"])),
+):
+    """
+    The whole register of a subject for a date range in one response: a roster
+    array plus one status string per session (see attendance.register).
+    """
+    if from_date > to_date:
+        raise HTTPException(status_code=400, detail="from_date must not be after to_date")
+    if not db.exec(select(Subject.id).where(Subject.code == subject_code)).first():
+        raise HTTPException(status_code=404, detail="Subject not found")
+    return register.register_matrix(db, subject_code, from_date, to_date, encoding)
@@ -1,44 +1,97 @@
-from datetime import timedelta
+import uuid as uuid_pkg
+from datetime import datetime
+from sqlalchemy import and_, insert, or_, update
+from sqlalchemy.orm import aliased
 from sqlmodel import Session, select
 from attendance.models import AttendanceStatus, AttendanceAuditLog, AttendanceRecord, AttendanceSession
-from students.models import Student
+from attendance import summary, bitmap
 
-def apply_medical_leave(db: Session, student_roll_no: str, from_date, to_date):
-    # 1. Get Student
-    student = db.exec(select(Student).where(Student.roll_no == student_roll_no)).first()
-    if not student:
-        return
+# Leave ranges per UPDATE in batch mode, to keep the OR list a sane size
+LEAVE_BATCH_SIZE = 200
 
-    # 2. Iterate dates
-    delta = (to_date - from_date).days + 1
-    
-    for i in range(delta):
-        current_date = from_date + timedelta(days=i)
-        
-        # 3. Find records for this student on this date
-        # Joins AttendanceRecord to AttendanceSession to filter by date
+def _mark_medical_leave(db: Session, ranges: list) -> list:
+    """
+    ranges: [(student_roll_no, from_date, to_date)]. One UPDATE ... FROM
+    attendance_sessions flips every ABSENT record inside the ranges to
+    MEDICAL_LEAVE and returns (roll_no, session_date, subject_code) per row changed.
+    Bitmap sessions get their exceptions from attendance.bitmap in the same pass.
+    """
+    # SQLite's RETURNING can't see the FROM table, so the session columns are
+    # read back through correlated lookups on its primary key.
+    returned_session = aliased(AttendanceSession)
+    def session_column(column):
+        return (
+            select(column)
+            .where(returned_session.id == AttendanceRecord.session_id)
+            .scalar_subquery()
+        )
+
+    changed = []
+    for i in range(0, len(ranges), LEAVE_BATCH_SIZE):
+        chunk = ranges[i:i + LEAVE_BATCH_SIZE]
         statement = (
-            select(AttendanceRecord)
-            .join(AttendanceSession)
-            .where(AttendanceRecord.student_id == student.id)
-            .where(AttendanceSession.session_date == current_date)
+            update(AttendanceRecord)
+            .where(AttendanceRecord.session_id == AttendanceSession.id)
+            .where(AttendanceRecord.status == AttendanceStatus.ABSENT)
+            .where(or_(*(
+                and_(
+                    AttendanceRecord.student_roll_no == roll_no,
+                    AttendanceSession.session_date.between(from_date, to_date),
+                )
+                for roll_no, from_date, to_date in chunk
+            )))
+            .values(status=AttendanceStatus.MEDICAL_LEAVE)
+            .returning(
+                AttendanceRecord.student_roll_no,
+                session_column(returned_session.session_date),
+                session_column(returned_session.subject_id),
+            )
+            .execution_options(synchronize_session=False)
         )
-        records = db.exec(statement).all()
-        
-        for record in records:
-            # SAFETY CHECK: Only change ABSENT to MEDICAL_LEAVE
-            if record.status == AttendanceStatus.ABSENT:
-                old_status = record.status
-                record.status = AttendanceStatus.MEDICAL_LEAVE
-                
-                # Audit Log
-                db.add(AttendanceAuditLog(
-                    student_roll_no=student_roll_no,
-                    date=current_date,
-                    subject_id=str(record.session.subject_id),
-                    old_status=old_status,
-                    new_status=AttendanceStatus.MEDICAL_LEAVE,
-                    updated_by="SYSTEM_MEDICAL_OCR"
-                ))
+        changed.extend(db.execute(statement).all())
+        changed.extend(bitmap.mark_medical_leave(db, chunk))
+    return changed
+
+def _record_leave_changes(db: Session, changed: list, updated_by: str):
+    # One bulk insert for the audit trail, one upsert for attendance_summary
+    now = datetime.utcnow()
+    if changed:
+        db.execute(insert(AttendanceAuditLog), [
+            {
+                "id": uuid_pkg.uuid4(),
+                "student_roll_no": roll_no,
+                "date": session_date,
+                "subject_id": str(subject_code),
+                "old_status": AttendanceStatus.ABSENT.value,
+                "new_status": AttendanceStatus.MEDICAL_LEAVE.value,
+                "updated_by": updated_by,
+                "source": "MEDICAL_APPROVAL",
+                "timestamp": now,
+            }
+            for roll_no, session_date, subject_code in changed
+        ])
+    summary.record_status_changes(db, [
+        (roll_no, subject_code, AttendanceStatus.ABSENT, AttendanceStatus.MEDICAL_LEAVE)
+        for roll_no, _, subject_code in changed
+    ])
+
+def apply_medical_leave(db: Session, student_roll_no: str, from_date, to_date) -> int:
+    # SAFETY CHECK: Only ABSENT records are changed to MEDICAL_LEAVE
+    changed = _mark_medical_leave(db, [(student_roll_no, from_date, to_date)])
+    _record_leave_changes(db, changed, updated_by="SYSTEM_MEDICAL_OCR")
+    db.commit()
+    return len(changed)
 
-    db.commit()
\ No newline at end of file
+def apply_medical_leaves(db: Session, ranges: list, updated_by: str = "SYSTEM_MEDICAL_BATCH") -> int:
+    """
+    Batch mode for semester close: applies many approved leave ranges in one
+    transaction. Re-running is harmless, since only ABSENT records change.
+    """
+    try:
+        changed = _mark_medical_leave(db, ranges)
+        _record_leave_changes(db, changed, updated_by=updated_by)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return len(changed)
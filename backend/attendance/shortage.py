@@ -0,0 +1,73 @@
+"""
+Nightly attendance shortage roster.
+
+One INSERT ... SELECT over attendance_summary JOIN students recomputes, for
+every student and subject, the percentage, the shortage flag and how many
+consecutive classes the student must attend to get back to the threshold.
+Run it from cron after the day's attendance is in:
+
+    python -m attendance.shortage
+
+e.g. `15 23 * * * cd /srv/backend && python -m attendance.shortage`
+"""
+from datetime import datetime
+from sqlalchemy import Float, case, cast, delete, literal
+from sqlmodel import Session, select, func
+from attendance.models import AttendanceSummary, ShortageSnapshot
+from students.models import Student
+from database import engine
+from config import SHORTAGE_THRESHOLD_PERCENT
+
+COLUMNS = [
+    "student_roll_no", "subject_id", "student_name", "department_id", "semester",
+    "present", "total", "percentage", "is_shortage", "classes_needed", "computed_at",
+]
+
+def classes_needed(present: int, total: int, threshold: int = SHORTAGE_THRESHOLD_PERCENT) -> int:
+    """
+    Smallest x with (present + x) / (total + x) >= threshold / 100, i.e.
+    ceil((threshold * total - 100 * present) / (100 - threshold)); 3t - 4p at 75%.
+    """
+    deficit = threshold * total - 100 * present
+    return max(0, -(-deficit // (100 - threshold)))
+
+def _snapshot_select(computed_at: datetime, threshold: int = SHORTAGE_THRESHOLD_PERCENT):
+    present, total = AttendanceSummary.present, AttendanceSummary.total
+    deficit = threshold * total - 100 * present
+    percentage = case((total > 0, cast(present, Float) * 100 / total), else_=0.0)
+    return (
+        select(
+            AttendanceSummary.student_roll_no,
+            AttendanceSummary.subject_id,
+            Student.name,
+            Student.department_id,
+            Student.semester,
+            present,
+            total,
+            percentage,
+            percentage < threshold,
+            # Integer ceil division of a positive deficit, same as classes_needed()
+            case((deficit > 0, (deficit + (99 - threshold)) // (100 - threshold)), else_=0),
+            literal(computed_at),
+        )
+        .join(Student, Student.roll_no == AttendanceSummary.student_roll_no)
+        .where(total > 0)
+    )
+
+def compute_shortage_snapshot(db: Session) -> int:
+    """Replaces the whole snapshot in one transaction; readers never see it half-built."""
+    computed_at = datetime.utcnow()
+    try:
+        db.execute(delete(ShortageSnapshot))
+        db.execute(ShortageSnapshot.__table__.insert().from_select(COLUMNS, _snapshot_select(computed_at)))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return db.exec(select(func.count()).select_from(ShortageSnapshot)).one()
+
+if __name__ == "__main__":
+    with Session(engine) as db:
+        rows = compute_shortage_snapshot(db)
+        shortages = db.exec(select(func.count()).select_from(ShortageSnapshot).where(ShortageSnapshot.is_shortage)).one()
+        print(f"✅ shortage_snapshot rebuilt: {rows} rows, {shortages} below {SHORTAGE_THRESHOLD_PERCENT}%")
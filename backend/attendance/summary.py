@@ -0,0 +1,154 @@
+"""
+Incrementally maintained attendance_summary table.
+
+Writers call record_new_marks / record_status_changes inside their own
+transaction (they never commit), so the summary always matches
+attendance_records plus the bitmap sessions (attendance.bitmap). An empty
+summary next to existing attendance (create_all ran before the migration's
+backfill) is rebuilt on startup by ensure_summary. For backfills and audits:
+
+    python -m attendance.summary rebuild
+    python -m attendance.summary check
+"""
+import sys
+import logging
+from collections import defaultdict
+from sqlalchemy import case, delete, exists
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select, func
+from attendance.models import AttendanceSummary, AttendanceRecord, AttendanceSession, AttendanceStatus, AttendanceBitmap
+from database import engine, upsert_insert
+from attendance import bitmap
+
+COUNTERS = ("present", "absent", "medical_leave", "total")
+
+STATUS_COLUMN = {
+    AttendanceStatus.PRESENT.value: "present",
+    AttendanceStatus.ABSENT.value: "absent",
+    AttendanceStatus.MEDICAL_LEAVE.value: "medical_leave",
+}
+
+UPSERT_CHUNK_SIZE = 1000
+
+logger = logging.getLogger(__name__)
+
+def _status_value(status) -> str:
+    return status.value if isinstance(status, AttendanceStatus) else status
+
+def apply_summary_deltas(db: Session, deltas: dict):
+    """
+    deltas: {(student_roll_no, subject_code): {"present": +1, "total": +1, ...}}
+    Applied as one INSERT ... ON CONFLICT DO UPDATE that adds to the counters.
+    """
+    rows = []
+    for (roll_no, subject_id), counts in deltas.items():
+        if any(counts.get(c) for c in COUNTERS):
+            rows.append({
+                "student_roll_no": roll_no,
+                "subject_id": subject_id,
+                **{c: counts.get(c, 0) for c in COUNTERS},
+            })
+
+    table = AttendanceSummary.__table__
+    for i in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        stmt = upsert_insert(db, table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["student_roll_no", "subject_id"],
+            set_={c: table.c[c] + stmt.excluded[c] for c in COUNTERS},
+        )
+        db.execute(stmt, rows[i:i + UPSERT_CHUNK_SIZE])
+
+def record_new_marks(db: Session, subject_code: str, marks: dict):
+    """marks: {roll_no: status} for freshly inserted records of one session."""
+    deltas = {}
+    for roll_no, status in marks.items():
+        deltas[(roll_no, subject_code)] = {STATUS_COLUMN[_status_value(status)]: 1, "total": 1}
+    apply_summary_deltas(db, deltas)
+
+def record_status_changes(db: Session, changes):
+    """changes: iterable of (roll_no, subject_code, old_status, new_status)."""
+    deltas = defaultdict(lambda: defaultdict(int))
+    for roll_no, subject_code, old_status, new_status in changes:
+        deltas[(roll_no, subject_code)][STATUS_COLUMN[_status_value(old_status)]] -= 1
+        deltas[(roll_no, subject_code)][STATUS_COLUMN[_status_value(new_status)]] += 1
+    apply_summary_deltas(db, deltas)
+
+def _aggregate_from_records():
+    # The source of truth: one grouped scan over attendance_records
+    def count_status(status):
+        return func.sum(case((AttendanceRecord.status == status, 1), else_=0))
+
+    return (
+        select(
+            AttendanceRecord.student_roll_no,
+            AttendanceSession.subject_id,
+            count_status(AttendanceStatus.PRESENT),
+            count_status(AttendanceStatus.ABSENT),
+            count_status(AttendanceStatus.MEDICAL_LEAVE),
+            func.count(AttendanceRecord.id),
+        )
+        .join(AttendanceSession, AttendanceSession.id == AttendanceRecord.session_id)
+        .group_by(AttendanceRecord.student_roll_no, AttendanceSession.subject_id)
+    )
+
+def rebuild_summary(db: Session) -> int:
+    """Recomputes the whole table from attendance_records and the bitmap sessions in one transaction."""
+    db.execute(delete(AttendanceSummary))
+    db.execute(
+        AttendanceSummary.__table__.insert().from_select(
+            ["student_roll_no", "subject_id", *COUNTERS], _aggregate_from_records()
+        )
+    )
+    apply_summary_deltas(db, bitmap.aggregate_counts(db))
+    db.commit()
+    return db.exec(select(func.count()).select_from(AttendanceSummary)).one()
+
+def ensure_summary(db: Session) -> int:
+    """Rebuilds attendance_summary when it is empty but attendance exists; returns rows built (0 if nothing to do)."""
+    if db.exec(select(exists().select_from(AttendanceSummary))).one():
+        return 0
+    if not any(db.exec(select(exists().select_from(model))).one() for model in (AttendanceRecord, AttendanceBitmap)):
+        return 0
+    try:
+        rows = rebuild_summary(db)
+    except IntegrityError:
+        db.rollback()  # Another worker rebuilt it at the same time
+        return 0
+    logger.info(f"Rebuilt empty attendance_summary: {rows} rows")
+    return rows
+
+def check_summary(db: Session) -> list:
+    """Returns every (student, subject) whose stored counters differ from the records."""
+    expected = {
+        (roll_no, subject_id): dict(zip(COUNTERS, counts))
+        for roll_no, subject_id, *counts in db.exec(_aggregate_from_records()).all()
+    }
+    for key, counts in bitmap.aggregate_counts(db).items():
+        want = expected.setdefault(key, dict.fromkeys(COUNTERS, 0))
+        for c in COUNTERS:
+            want[c] += counts[c]
+    mismatches = []
+    for row in db.exec(select(AttendanceSummary)).all():
+        key = (row.student_roll_no, row.subject_id)
+        stored = {c: getattr(row, c) for c in COUNTERS}
+        want = expected.pop(key, dict.fromkeys(COUNTERS, 0))
+        if stored != want:
+            mismatches.append({"student_roll_no": key[0], "subject_id": key[1], "stored": stored, "expected": want})
+    for (roll_no, subject_id), want in expected.items():
+        mismatches.append({"student_roll_no": roll_no, "subject_id": subject_id, "stored": None, "expected": want})
+    return mismatches
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "check"
+    with Session(engine) as db:
+        if command == "rebuild":
+            print(f"✅ Rebuilt attendance_summary: {rebuild_summary(db)} rows")
+        elif command == "check":
+            problems = check_summary(db)
+            for p in problems:
+                print(f"⚠️ {p['student_roll_no']} / {p['subject_id']}: stored={p['stored']} expected={p['expected']}")
+            print("✅ attendance_summary is consistent" if not problems else f"❌ {len(problems)} mismatches")
+            sys.exit(1 if problems else 0)
+        else:
+            print("Usage: python -m attendance.summary [rebuild|check]")
+            sys.exit(2)
@@ -0,0 +1,217 @@
+"""
+Session upserts: offline batch sync (many sessions captured without
+connectivity, one request, one transaction) and online submits, which go
+through the same path as a batch of one.
+
+An offline capture is identified by (subject, date, client_session_id);
+items without a client id (online submits) by (subject, date, slot). Both
+are unique on attendance_sessions, so replaying a batch or resubmitting a
+class is idempotent. A new capture whose slot is already taken by another
+class of that subject and day gets the next free slot instead of being
+merged into it. Writing to an existing session only touches the records whose
+status changed (with an audit row each, inserted in one batch) and adds
+records for roll numbers it did not have yet. MEDICAL_LEAVE applied after
+an approval is never overwritten by a resubmit or a late replay; those
+records are reported as skipped instead.
+Bitmap sessions (attendance.bitmap) are diffed the same way and re-encoded
+when anything changed.
+"""
+import uuid as uuid_pkg
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import insert, tuple_, update
+from sqlmodel import Session, select
+from attendance.models import AttendanceSession, AttendanceRecord, AttendanceAuditLog, AttendanceStatus
+from subjects.models import Subject
+from attendance import crud, summary, bitmap
+from config import ATTENDANCE_STORAGE
+
+# Keys per (subject, date) IN lookup
+KEY_CHUNK_SIZE = 500
+
+def _match_key(item) -> tuple:
+    client_session_id = getattr(item, "client_session_id", None)
+    if client_session_id:
+        return (item.subject_id, item.date, "client", client_session_id)
+    return (item.subject_id, item.date, "slot", item.slot)
+
+def _existing_sessions(db: Session, days: list):
+    """
+    Every session on the given (subject, date) days. Returns
+    ({match key: (session_id, slot)}, {(subject, date): slots taken}).
+    """
+    found, taken = {}, defaultdict(set)
+    columns = (AttendanceSession.subject_id, AttendanceSession.session_date)
+    for i in range(0, len(days), KEY_CHUNK_SIZE):
+        rows = db.exec(
+            select(AttendanceSession.id, *columns, AttendanceSession.slot, AttendanceSession.client_session_id)
+            .where(tuple_(*columns).in_(days[i:i + KEY_CHUNK_SIZE]))
+        ).all()
+        for session_id, subject_id, session_date, slot, client_session_id in rows:
+            taken[(subject_id, session_date)].add(slot)
+            found[(subject_id, session_date, "slot", slot)] = (session_id, slot)
+            if client_session_id:
+                found[(subject_id, session_date, "client", client_session_id)] = (session_id, slot)
+    return found, taken
+
+def _existing_records(db: Session, session_ids: list) -> dict:
+    """{session_id: {roll_no: (record_id, status)}}"""
+    found = defaultdict(dict)
+    for i in range(0, len(session_ids), KEY_CHUNK_SIZE):
+        rows = db.exec(
+            select(AttendanceRecord.id, AttendanceRecord.session_id, AttendanceRecord.student_roll_no, AttendanceRecord.status)
+            .where(AttendanceRecord.session_id.in_(session_ids[i:i + KEY_CHUNK_SIZE]))
+        ).all()
+        for record_id, session_id, roll_no, status in rows:
+            found[session_id][roll_no] = (record_id, getattr(status, "value", status))
+    return found
+
+def sync_sessions(db: Session, sessions: list, source: str = "OFFLINE_SYNC", updated_by: str = None) -> list:
+    """
+    sessions: items with subject_id (code), date, slot, records and optionally
+    client_session_id. Returns one result per input item, in order. Commits
+    once; on any database error nothing is written and the error propagates
+    (IntegrityError when another request created the same session first).
+    source, updated_by: recorded on the audit rows of changed statuses
+    (updated_by defaults to the subject's faculty).
+    """
+    results = [None] * len(sessions)
+
+    # 1. Same capture twice in one batch: the later one wins
+    latest = {}
+    for i, item in enumerate(sessions):
+        key = _match_key(item)
+        if key in latest:
+            results[latest[key]] = {"status": "superseded"}
+        latest[key] = i
+
+    # 2. One lookup each for subjects, roll numbers and already-synced sessions
+    codes = list({sessions[i].subject_id for i in latest.values()})
+    subjects = {s.code: s for s in db.exec(select(Subject).where(Subject.code.in_(codes))).all()} if codes else {}
+    known = crud.known_roll_numbers(db, {
+        (r.roll_no or "").strip() for i in latest.values() for r in sessions[i].records
+    })
+    existing, taken_slots = _existing_sessions(db, list({key[:2] for key in latest}))
+    matched_ids = list({existing[key][0] for key in latest if key in existing})
+    existing_records = _existing_records(db, matched_ids)
+    existing_bitmaps = bitmap.load_sessions(db, matched_ids)
+
+    # 3. Work out every write up front
+    now = datetime.utcnow()
+    new_sessions, new_records, status_updates, audit_rows, bitmap_writes = [], [], [], [], []
+    deltas = defaultdict(lambda: defaultdict(int))
+
+    for key, i in latest.items():
+        item = sessions[i]
+        subject = subjects.get(item.subject_id)
+        if not subject:
+            results[i] = {"status": "failed", "error": "Subject not found"}
+            continue
+
+        accepted, rejected = crud.split_valid_records(db, item.records, known=known)
+        session_id, slot = existing.get(key, (None, item.slot))
+        marks = None # {roll_no: status} of a bitmap session, rewritten whole
+        if session_id is None:
+            if not accepted:
+                results[i] = {"status": "failed", "error": "No valid attendance records", "rejected_records": rejected}
+                continue
+            taken = taken_slots[(item.subject_id, item.date)]
+            if slot in taken:
+                slot = max(taken) + 1  # Another class of this subject already has it
+            taken.add(slot)
+            session_id = uuid_pkg.uuid4()
+            new_sessions.append({
+                "id": session_id,
+                "subject_id": subject.code,
+                "session_date": item.date,
+                "faculty_id": subject.faculty_id,
+                "created_at": now,
+                "client_session_id": getattr(item, "client_session_id", None),
+                "slot": slot,
+            })
+            current = {}
+            if ATTENDANCE_STORAGE == "bitmap":
+                marks = {}
+            outcome = "created"
+        elif session_id in existing_bitmaps:
+            marks = dict(existing_bitmaps[session_id].marks())
+            current = {roll_no: (None, status) for roll_no, status in marks.items()}
+            outcome = "unchanged"
+        else:
+            current = existing_records.get(session_id, {})
+            outcome = "unchanged"
+
+        changed, skipped = 0, []
+        for roll_no, status in accepted.items():
+            if roll_no not in current:
+                if marks is None:
+                    new_records.append({"id": uuid_pkg.uuid4(), "session_id": session_id, "student_roll_no": roll_no, "status": status})
+                deltas[(roll_no, subject.code)][summary.STATUS_COLUMN[status]] += 1
+                deltas[(roll_no, subject.code)]["total"] += 1
+            else:
+                record_id, old_status = current[roll_no]
+                if old_status == status:
+                    continue
+                if old_status == AttendanceStatus.MEDICAL_LEAVE.value:
+                    # Approved leave outranks whatever the class register said
+                    skipped.append({"roll_no": roll_no, "status": status, "reason": "Medical leave already applied"})
+                    continue
+                if marks is None:
+                    status_updates.append({"id": record_id, "status": status})
+                deltas[(roll_no, subject.code)][summary.STATUS_COLUMN[old_status]] -= 1
+                deltas[(roll_no, subject.code)][summary.STATUS_COLUMN[status]] += 1
+                audit_rows.append({
+                    "id": uuid_pkg.uuid4(),
+                    "student_roll_no": roll_no,
+                    "date": item.date,
+                    "subject_id": subject.code,
+                    "old_status": old_status,
+                    "new_status": status,
+                    "updated_by": updated_by or str(subject.faculty_id),
+                    "source": source,
+                    "timestamp": now,
+                })
+            if marks is not None:
+                marks[roll_no] = status
+            changed += 1
+        if marks is not None and changed:
+            bitmap_writes.append((session_id, subject.code, marks))
+        if outcome == "unchanged" and changed:
+            outcome = "updated"
+
+        results[i] = {
+            "status": outcome,
+            "session_id": str(session_id),
+            "slot": slot,
+            "accepted": len(accepted),
+            "changed": changed,
+            "rejected_records": rejected,
+            "skipped_records": skipped,
+        }
+
+    # 4. Apply it all in one transaction
+    try:
+        if new_sessions:
+            db.execute(insert(AttendanceSession), new_sessions)
+        if new_records:
+            db.execute(insert(AttendanceRecord), new_records)
+        if status_updates:
+            db.execute(update(AttendanceRecord), status_updates)
+        for session_id, subject_code, marks in bitmap_writes:
+            bitmap.store_marks(db, session_id, subject_code, marks)
+        if audit_rows:
+            db.execute(insert(AttendanceAuditLog), audit_rows)
+        summary.apply_summary_deltas(db, deltas)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    for item, result in zip(sessions, results):
+        result.setdefault("slot", item.slot)
+        result.update({
+            "client_session_id": getattr(item, "client_session_id", None),
+            "subject_id": item.subject_id,
+            "date": item.date,
+        })
+    return results
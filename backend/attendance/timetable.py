@@ -0,0 +1,169 @@
+"""
+In-memory weekly timetable, compiled from class_schedules + subjects.
+
+Slots are grouped per faculty and per room, then per day, and kept sorted by
+start time with a parallel list of start times, so "what is on at t" is one
+bisect. The index is built at startup and rebuilt lazily on the next lookup
+after any ClassSchedule or Subject change is committed in this process, or
+once it is TIMETABLE_TTL_SECONDS old (changes made by other workers, scripts
+or migrations).
+"""
+import threading
+import time as clock
+import uuid as uuid_pkg
+from bisect import bisect_right
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, time
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession, object_session
+from sqlmodel import Session, select
+from attendance.models import ClassSchedule, DayOfWeek
+from subjects.models import Subject
+from database import engine
+from config import TIMETABLE_TTL_SECONDS
+
+WEEK = list(DayOfWeek)
+
+@dataclass(frozen=True)
+class Slot:
+    schedule_id: uuid_pkg.UUID
+    faculty_id: uuid_pkg.UUID
+    subject_code: str
+    subject_name: str
+    class_identifier: str
+    day: DayOfWeek
+    start: time
+    end: time
+    room: str
+
+    @property
+    def time_slot(self) -> str:
+        return f"{self.start:%H:%M} - {self.end:%H:%M}"
+
+class DaySchedule:
+    """One day's slots for a faculty or room, sorted by start time."""
+
+    def __init__(self, slots):
+        self.slots = sorted(slots, key=lambda s: (s.start, s.end))
+        self.starts = [s.start for s in self.slots]
+        # Latest end among slots[:i + 1]: a long slot can still be running
+        # after shorter ones that started later have ended
+        self.max_ends = []
+        for slot in self.slots:
+            self.max_ends.append(max(slot.end, self.max_ends[-1]) if self.max_ends else slot.end)
+
+    def at(self, t: time):
+        """Returns (slot running at t or None, next slot starting after t or None)."""
+        i = bisect_right(self.starts, t)
+        current = None
+        if i and self.max_ends[i - 1] > t:
+            # Something is running; take the latest-starting slot that is
+            current = next(slot for slot in reversed(self.slots[:i]) if slot.end > t)
+        upcoming = self.slots[i] if i < len(self.slots) else None
+        return current, upcoming
+
+class TimetableIndex:
+    def __init__(self, slots):
+        by_faculty, by_room = defaultdict(lambda: defaultdict(list)), defaultdict(lambda: defaultdict(list))
+        for slot in slots:
+            by_faculty[slot.faculty_id][slot.day].append(slot)
+            by_room[slot.room][slot.day].append(slot)
+        self.by_faculty = {key: {day: DaySchedule(s) for day, s in days.items()} for key, days in by_faculty.items()}
+        self.by_room = {key: {day: DaySchedule(s) for day, s in days.items()} for key, days in by_room.items()}
+        self.size = len(slots)
+
+    def week(self, faculty_id) -> list:
+        days = self.by_faculty.get(faculty_id, {})
+        return [slot for day in WEEK if day in days for slot in days[day].slots]
+
+    @staticmethod
+    def _lookup(days: dict, when: datetime):
+        """Current slot at `when`, and the next slot later that day or in the coming week."""
+        weekday = when.weekday()
+        today = WEEK[weekday] if weekday < len(WEEK) else None
+        current, upcoming = days[today].at(when.time()) if today in days else (None, None)
+
+        offset = 1
+        while upcoming is None and offset <= 7:
+            weekday_ahead = (weekday + offset) % 7
+            day = WEEK[weekday_ahead] if weekday_ahead < len(WEEK) else None
+            if day in days:
+                upcoming = days[day].slots[0]
+            offset += 1
+        return current, upcoming
+
+    def faculty_at(self, faculty_id, when: datetime):
+        return self._lookup(self.by_faculty.get(faculty_id, {}), when)
+
+    def room_at(self, room: str, when: datetime):
+        return self._lookup(self.by_room.get(room, {}), when)
+
+def load_slots(db: Session) -> list:
+    rows = db.exec(
+        select(ClassSchedule, Subject).join(Subject, ClassSchedule.subject_id == Subject.id)
+    ).all()
+    return [
+        Slot(
+            schedule_id=sched.id,
+            faculty_id=sched.faculty_id,
+            subject_code=subj.code,
+            subject_name=subj.name,
+            class_identifier=f"{subj.department_id} - {subj.semester}th Sem",
+            day=DayOfWeek(sched.day_of_week),
+            start=sched.start_time,
+            end=sched.end_time,
+            room=sched.room_number,
+        )
+        for sched, subj in rows
+    ]
+
+_index: Optional[TimetableIndex] = None
+_dirty = True
+_built_at = 0.0
+_lock = threading.RLock()
+
+def _stale() -> bool:
+    return _index is None or _dirty or clock.monotonic() - _built_at >= TIMETABLE_TTL_SECONDS
+
+def rebuild_timetable() -> TimetableIndex:
+    global _index, _dirty, _built_at
+    with _lock:
+        # Cleared before loading, so a change committed mid-build marks it dirty again
+        _dirty = False
+        _built_at = clock.monotonic()
+        with Session(engine) as db:
+            index = TimetableIndex(load_slots(db))
+        _index = index
+    print(f"📅 Timetable index built: {index.size} slots")
+    return index
+
+def get_timetable() -> TimetableIndex:
+    if not _stale():
+        return _index
+    with _lock:
+        # Another request may have rebuilt it while we waited
+        return rebuild_timetable() if _stale() else _index
+
+def mark_dirty():
+    global _dirty
+    _dirty = True
+
+def _schedule_changed(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info["timetable_dirty"] = True
+
+for _model in (ClassSchedule, Subject):
+    for _event in ("after_insert", "after_update", "after_delete"):
+        event.listen(_model, _event, _schedule_changed)
+
+@event.listens_for(OrmSession, "after_commit")
+def _rebuild_after_commit(session):
+    if session.info.pop("timetable_dirty", False):
+        mark_dirty()
+
+@event.listens_for(OrmSession, "after_rollback")
+def _forget_after_rollback(session):
+    session.info.pop("timetable_dirty", None)
@@ -0,0 +1,194 @@
+import csv
+import io
+import json
+import time
+import uuid as uuid_pkg
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+from auth.models import User
+from auth.schemas import BulkUserRow
+from students.models import Student
+from core.security import hash_passwords_bulk
+from attendance import roll_lists
+from database import engine
+from config import BULK_INSERT_BATCH_SIZE, BULK_IMPORT_STATUS_TTL_SECONDS
+
+# Keeps IN (...) lists well under the bind-parameter limits of Postgres/SQLite
+LOOKUP_CHUNK_SIZE = 5000
+
+def iter_roster(stream, filename: str = ""):
+    """
+    Yields (line_no, row) from an uploaded roster without loading the whole file.
+    CSV (header row required) yields dicts; anything else is read as JSON lines
+    and yields the raw line for pydantic to parse.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if filename.lower().endswith(".csv"):
+        reader = csv.DictReader(text)
+        for row in reader:
+            # Empty CSV cells mean "not provided"
+            yield reader.line_num, {k: v for k, v in row.items() if k and v not in (None, "")}
+    else:
+        for line_no, line in enumerate(text, start=1):
+            if line.strip():
+                yield line_no, line
+
+def _existing(db: Session, column, values: list) -> set:
+    found = set()
+    for i in range(0, len(values), LOOKUP_CHUNK_SIZE):
+        chunk = values[i:i + LOOKUP_CHUNK_SIZE]
+        found.update(db.exec(select(column).where(column.in_(chunk))).all())
+    return found
+
+def validate_roster(db: Session, roster) -> tuple:
+    """
+    Returns (accepted rows, per-line errors). Cheap enough to run inside the
+    upload request; hashing and inserting the accepted rows is create_accounts.
+    """
+    errors = []
+    rows = []
+
+    # 1. Validate every line, collecting errors instead of stopping at the first
+    for line_no, raw in roster:
+        try:
+            row = BulkUserRow.model_validate_json(raw) if isinstance(raw, str) else BulkUserRow(**raw)
+        except ValidationError as e:
+            message = "; ".join(
+                f"{'.'.join(str(part) for part in err['loc']) or 'row'}: {err['msg']}" for err in e.errors()
+            )
+            errors.append({"line": line_no, "username": None, "error": message})
+            continue
+        rows.append((line_no, row))
+
+    # 2. Duplicates inside the file, then against the DB with set-based lookups
+    seen_usernames, seen_rolls = set(), set()
+    unique_rows = []
+    for line_no, row in rows:
+        roll_no = row.roll_no or row.username
+        if row.username in seen_usernames:
+            errors.append({"line": line_no, "username": row.username, "error": "Duplicate username in file"})
+        elif row.role == "STUDENT" and roll_no in seen_rolls:
+            errors.append({"line": line_no, "username": row.username, "error": "Duplicate roll number in file"})
+        else:
+            seen_usernames.add(row.username)
+            if row.role == "STUDENT":
+                seen_rolls.add(roll_no)
+            unique_rows.append((line_no, row))
+
+    taken_usernames = _existing(db, User.username, list(seen_usernames))
+    taken_rolls = _existing(db, Student.roll_no, list(seen_rolls))
+
+    accepted = []
+    for line_no, row in unique_rows:
+        if row.username in taken_usernames:
+            errors.append({"line": line_no, "username": row.username, "error": "Username already registered"})
+        elif row.role == "STUDENT" and (row.roll_no or row.username) in taken_rolls:
+            errors.append({"line": line_no, "username": row.username, "error": "Roll number already exists"})
+        else:
+            accepted.append(row)
+    return accepted, errors
+
+def create_accounts(db: Session, accepted: list, errors: list, progress=None) -> dict:
+    # 3. Hash all passwords on the shared hash pool, at the normal cost
+    hashes = hash_passwords_bulk([row.password for row in accepted], progress=progress)
+
+    # 4. Insert users and student profiles in large batches, one transaction
+    user_rows, student_rows = [], []
+    for row, password_hash in zip(accepted, hashes):
+        user_id = uuid_pkg.uuid4()
+        user_rows.append({
+            "id": user_id,
+            "username": row.username,
+            "full_name": row.full_name,
+            "email": row.email,
+            "password_hash": password_hash,
+            "role": row.role,
+            "is_active": True,
+        })
+        if row.role == "STUDENT":
+            student_rows.append({
+                "user_id": user_id,
+                "roll_no": row.roll_no or row.username,
+                "regd_no": row.regd_no,
+                "name": row.full_name,
+                "department_id": row.department_id,
+                "semester": row.semester,
+                "contact_no": row.contact_no,
+                "email": row.email,
+                "guardian_name": row.guardian_name,
+                "guardian_contact_no": row.guardian_contact_no,
+            })
+
+    try:
+        for i in range(0, len(user_rows), BULK_INSERT_BATCH_SIZE):
+            db.execute(insert(User), user_rows[i:i + BULK_INSERT_BATCH_SIZE])
+        for i in range(0, len(student_rows), BULK_INSERT_BATCH_SIZE):
+            db.execute(insert(Student), student_rows[i:i + BULK_INSERT_BATCH_SIZE])
+        # Bulk inserts skip ORM events, so the cached roll lists are told directly
+        roll_lists.mark_roster_changed(
+            db,
+            scopes={(r["department_id"], r["semester"]) for r in student_rows}
+            | ({roll_lists.ALL_STUDENT_USERS} if student_rows else set()),
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    errors = sorted(errors, key=lambda e: e["line"])
+    return {
+        "created": len(user_rows),
+        "students_created": len(student_rows),
+        "failed": len(errors),
+        "errors": errors,
+    }
+
+# --- Import jobs ---
+# Hashing a large roster takes minutes (see BULK_HASH_CONCURRENCY), so the
+# upload request only validates it and the accounts are created in the
+# background. Status lives in an ephemeral store so any worker can answer polls.
+IMPORT_KEY_PREFIX = "bulk-import:"
+PROGRESS_INTERVAL_SECONDS = 1.0
+
+def _set_import_status(store, job_id: str, status: dict):
+    store.set(IMPORT_KEY_PREFIX + job_id, json.dumps(status), ttl=BULK_IMPORT_STATUS_TTL_SECONDS)
+
+def get_import_status(store, job_id: str):
+    status = store.get(IMPORT_KEY_PREFIX + job_id)
+    return json.loads(status) if status else None
+
+def start_import(store, accepted: list, errors: list) -> dict:
+    status = {
+        "job_id": str(uuid_pkg.uuid4()),
+        "status": "RUNNING",
+        "total": len(accepted),
+        "hashed": 0,
+        "failed": len(errors),
+    }
+    _set_import_status(store, status["job_id"], status)
+    return status
+
+def run_import(store, status: dict, accepted: list, errors: list):
+    """Background half of an import started with start_import."""
+    status = dict(status)
+    last_report = time.monotonic()
+
+    def report(hashed: int):
+        nonlocal last_report
+        if time.monotonic() - last_report >= PROGRESS_INTERVAL_SECONDS:
+            last_report = time.monotonic()
+            _set_import_status(store, status["job_id"], {**status, "hashed": hashed})
+
+    try:
+        with Session(engine) as db:
+            result = create_accounts(db, accepted, errors, progress=report)
+        status.update(result, status="COMPLETED", hashed=len(accepted))
+    except IntegrityError:
+        # Someone registered one of these usernames/roll numbers while we were hashing
+        status.update(status="FAILED", error="Roster conflicts with concurrently created accounts, please retry")
+    except Exception as e:
+        print(f"⚠️ Bulk import {status['job_id']} failed: {e}")
+        status.update(status="FAILED", error="Import failed")
+    _set_import_status(store, status["job_id"], status)
@@ -38,30 +38,54 @@
 
 # scriptedspython/demoos/demoos-88c5b0a7b388c582eab72b7e23a82eab7e4cb7c4/backend/auth/router.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlmodel import Session, select
 from database import get_db
 from auth.models import User
-from auth.schemas import UserCreate, LoginRequest, TokenResponse, ForgotPasswordRequest, VerifyOTPRequest, ResetPasswordRequest, ChangePasswordRequest
+from auth.schemas import UserCreate, LoginRequest, TokenResponse, ForgotPasswordRequest, VerifyOTPRequest, ResetPasswordRequest, ChangePasswordRequest, RefreshRequest
 from students.models import Student
-from core.security import verify_password, create_access_token, get_password_hash
-from core.dependencies import get_current_user
+from core.security import create_access_token, create_refresh_token, password_fingerprint, decode_token, hash_password_async, verify_password_async, verify_and_update_password_async, get_hash_pool_stats
+from core.dependencies import get_current_user, require_role, principal_cache, Principal
+from core.cache import TTLCache
+from core.ephemeral import get_otp_store
+from config import STATS_CACHE_TTL_SECONDS, ACCESS_TOKEN_EXPIRE_MINUTES
+from auth.crud import count_users_by_role
+from auth.provisioning import iter_roster, validate_roster, start_import, run_import, get_import_status
+from students.crud import count_students_by_department
 import random
+import uuid
 router = APIRouter(tags=["Auth"])
 
-@router.post("/register", status_code=status.HTTP_201_CREATED)
-def register_user(user_in: UserCreate, db: Session = Depends(get_db)):
-    # 1. Prevent duplicate usernames
-    existing_user = db.exec(select(User).where(User.username == user_in.username)).first()
-    if existing_user:
-        raise HTTPException(status_code=400, detail="Username already registered")
+stats_cache = TTLCache(maxsize=1, ttl=STATS_CACHE_TTL_SECONDS)
+
+# The auth handlers below are async so that a request waiting on the hash pool
+# holds no threadpool thread; their DB work goes through run_in_threadpool.
+# Lookups close the session before returning, so a waiting request holds no
+# pooled connection either (the loaded row stays usable, detached).
+
+def _find_user(db: Session, username: str):
+    user = db.exec(select(User).where(User.username == username)).first()
+    db.close()
+    return user
 
+def _get_user(db: Session, user_id):
+    user = db.get(User, user_id)
+    db.close()
+    return user
+
+def _save_password_hash(db: Session, user: User, password_hash: str) -> None:
+    user.password_hash = password_hash
+    db.add(user)
+    db.commit()
+
+def _create_user(db: Session, user_in: UserCreate, password_hash: str) -> User:
     # 2. Create the base User
     new_user = User(
         username=user_in.username,
         full_name=user_in.full_name,
-        password_hash=get_password_hash(user_in.password),
+        password_hash=password_hash,
         role=user_in.role
     )
     db.add(new_user)
@@ -84,27 +108,103 @@ def register_user(user_in: UserCreate, db: Session = Depends(get_db)):
 
     db.commit()
     db.refresh(new_user)
+    return new_user
+
+@router.post("/register", status_code=status.HTTP_201_CREATED)
+async def register_user(user_in: UserCreate, db: Session = Depends(get_db)):
+    # 1. Prevent duplicate usernames
+    existing_user = await run_in_threadpool(_find_user, db, user_in.username)
+    if existing_user:
+        raise HTTPException(status_code=400, detail="Username already registered")
+
+    password_hash = await hash_password_async(user_in.password)
+    new_user = await run_in_threadpool(_create_user, db, user_in, password_hash)
     return {"status": "success", "user_id": str(new_user.id)}
 
+# Import progress is kept next to the OTPs, where every worker can read it
+import_status_store = get_otp_store()
+
+@router.post("/bulk-register", status_code=status.HTTP_202_ACCEPTED)
+def bulk_register(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    user: Principal = Depends(require_role(["HOD", "ADMIN"])),
+):
+    """
+    Creates many accounts from a CSV (with header) or JSON-lines roster using the
+    same fields as /register plus an optional department_id. The roster is
+    validated here; the valid rows are then hashed and inserted in one
+    transaction by a background job. Poll GET /bulk-register/{job_id} for its
+    progress, and for the invalid or duplicate rows reported by line.
+    """
+    try:
+        accepted, errors = validate_roster(db, iter_roster(file.file, file.filename or ""))
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Roster must be UTF-8 encoded")
+
+    job = start_import(import_status_store, accepted, errors)
+    background_tasks.add_task(run_import, import_status_store, job, accepted, errors)
+    return job
+
+@router.get("/bulk-register/{job_id}")
+def get_bulk_register_status(job_id: str, user: Principal = Depends(require_role(["HOD", "ADMIN"]))):
+    job = get_import_status(import_status_store, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Import not found or expired")
+    return job
+
 @router.post("/login")
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    statement = select(User).where(User.username == form_data.username)
-    user = db.exec(statement).first()
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    user = await run_in_threadpool(_find_user, db, form_data.username)
 
-    if not user or not verify_password(form_data.password, user.password_hash):
+    if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
+    verified, new_hash = await verify_and_update_password_async(form_data.password, user.password_hash)
+    if not verified:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+
+    if new_hash:
+        # Hashes below the current cost policy are upgraded on login
+        await run_in_threadpool(_save_password_hash, db, user, new_hash)
+
+    return _issue_tokens(user)
+
+def _issue_tokens(user: User) -> dict:
     token = create_access_token(data={"sub": str(user.id), "role": user.role, "username": user.username})
     return {
         "access_token": token, 
+        "refresh_token": create_refresh_token(str(user.id), user.password_hash),
+        "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60,
         "token_type": "bearer", 
         "role": user.role,
         "full_name": user.full_name,
         "user_id": str(user.id)
     }
-# Temporary in-memory store for OTPs. 
-# In production, use Redis with an expiration time.
-temp_otp_store = {}
+
+@router.post("/refresh")
+def refresh_access_token(payload: RefreshRequest, db: Session = Depends(get_db)):
+    """
+    Swaps a refresh token for a fresh access token. This is the one place the
+    claims are re-read from the DB, so role changes and deactivation take effect
+    here; a password change invalidates all outstanding refresh tokens.
+    """
+    claims = decode_token(payload.refresh_token)
+    if not claims or claims.get("type") != "refresh":
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
+
+    try:
+        user = db.get(User, uuid.UUID(claims.get("sub")))
+    except (TypeError, ValueError):
+        user = None
+    if not user or not user.is_active or claims.get("pwd") != password_fingerprint(user.password_hash):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
+
+    return _issue_tokens(user)
+# OTPs live in a shared store with a TTL (see core.ephemeral), so a code issued
+# by one worker can be verified by another and stale codes expire on their own.
+otp_store = get_otp_store()
 
 @router.post("/forgot-password")
 def request_password_reset(
@@ -119,7 +219,7 @@ def request_password_reset(
 
     # 2. Generate a 6-digit OTP
     otp = str(random.randint(1000, 9999))
-    temp_otp_store[payload.username] = otp
+    otp_store.set(f"otp:{payload.username}", otp)
 
     # 3. In a real app, you would send an email here using smtplib or a service like SendGrid
     print(f"📧 [MOCK EMAIL] To: {user.email or payload.username} | Subject: Password Reset | Body: Your OTP is {otp}")
@@ -128,7 +228,7 @@ def request_password_reset(
 
 @router.post("/verify-otp")
 def verify_otp(payload: VerifyOTPRequest):
-    stored_otp = temp_otp_store.get(payload.username)
+    stored_otp = otp_store.get(f"otp:{payload.username}")
     
     if stored_otp and stored_otp == payload.otp:
         return {"success": True, "message": "OTP verified"}
@@ -139,12 +239,13 @@ def verify_otp(payload: VerifyOTPRequest):
     )
 
 @router.post("/reset-password")
-def reset_password(
+async def reset_password(
     payload: ResetPasswordRequest,
     db: Session = Depends(get_db)
 ):
-    # 1. Double-check the OTP before allowing the reset
-    stored_otp = temp_otp_store.get(payload.username)
+    # 1. Consume the OTP up front: of two concurrent resets only one gets it,
+    #    and a wrong guess burns the code
+    stored_otp = await run_in_threadpool(otp_store.pop, f"otp:{payload.username}")
     if not stored_otp or stored_otp != payload.otp:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -152,46 +253,63 @@ def reset_password(
         )
 
     # 2. Fetch the user
-    user = db.exec(select(User).where(User.username == payload.username)).first()
+    user = await run_in_threadpool(_find_user, db, payload.username)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     # 3. Update the password
-    user.password_hash = get_password_hash(payload.new_password)
-    db.add(user)
-    db.commit()
-
-    # 4. Clear the OTP so it can't be reused
-    del temp_otp_store[payload.username]
+    password_hash = await hash_password_async(payload.new_password)
+    await run_in_threadpool(_save_password_hash, db, user, password_hash)
 
     return {"success": True, "message": "Password reset successfully"}
 
 @router.get("/stats")
 def get_department_stats(db: Session = Depends(get_db)):
-    # Fetching total students and faculty from the User table based on their role
-    students = db.exec(select(User).where(User.role == "STUDENT")).all()
-    faculty = db.exec(select(User).where(User.role == "TEACHER")).all()
-    
-    return {
-        "students": len(students),
-        "faculty": len(faculty)
+    # The HOD dashboard polls this, so serve a recent result when we have one
+    stats = stats_cache.get("department_stats")
+    if stats is not None:
+        return stats
+
+    by_role = count_users_by_role(db)
+    stats = {
+        "students": by_role.get("STUDENT", 0),
+        "faculty": by_role.get("TEACHER", 0),
+        "by_role": by_role,
+        "departments": count_students_by_department(db),
     }
+    stats_cache.set("department_stats", stats)
+    return stats
+
 @router.post("/change-password")
-def change_password(
+async def change_password(
     payload: ChangePasswordRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
+    # The principal is a cached snapshot without the hash, so load the row itself
+    user = await run_in_threadpool(_get_user, db, current_user.id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
     # 1. Verify the user typed their current password correctly
-    if not verify_password(payload.current_password, current_user.password_hash):
+    if not await verify_password_async(payload.current_password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Incorrect current password"
         )
     
-    # 2. Hash and save the new password
-    current_user.password_hash = get_password_hash(payload.new_password)
-    db.add(current_user)
-    db.commit()
+    # 2. Hash and save the new password (cached sessions are dropped on commit)
+    password_hash = await hash_password_async(payload.new_password)
+    await run_in_threadpool(_save_password_hash, db, user, password_hash)
     
-    return {"success": True, "message": "Password changed successfully"}
\ No newline at end of file
+    return {"success": True, "message": "Password changed successfully"}
+
+@router.get("/hash-pool/stats")
+def get_hash_pool_metrics(user: Principal = Depends(require_role(["ADMIN"]))):
+    # Queue depth and wait times of the bcrypt worker pool
+    return get_hash_pool_stats()
+
+@router.get("/principal-cache/stats")
+def get_principal_cache_metrics(user: Principal = Depends(require_role(["ADMIN"]))):
+    # Hit/miss counters of the token -> user snapshot cache
+    return principal_cache.stats()
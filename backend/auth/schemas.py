@@ -16,7 +16,7 @@
 
 # scriptedspython/demoos/demoos-88c5b0a7b388c582eab72b7e23a82eab7e4cb7c4/backend/auth/schemas.py
 
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 from typing import Optional
 
 class UserCreate(BaseModel):
@@ -35,6 +35,18 @@ class UserCreate(BaseModel):
     guardian_name: Optional[str] = None
     guardian_contact_no: Optional[str] = None
 
+class BulkUserRow(UserCreate):
+    # One line of a bulk roster (CSV or JSONL)
+    department_id: Optional[str] = None
+
+    @model_validator(mode="after")
+    def student_placement(self):
+        # No demo defaults here: a wrong department/semester files the student
+        # into someone else's roll lists
+        if self.role == "STUDENT" and (not self.department_id or self.semester is None):
+            raise ValueError("department_id and semester are required for students")
+        return self
+
 class LoginRequest(BaseModel):
     username: str
     password: str
@@ -58,4 +70,7 @@ class ResetPasswordRequest(BaseModel):
 
 class ChangePasswordRequest(BaseModel):
     current_password: str
-    new_password: str
\ No newline at end of file
+    new_password: str
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
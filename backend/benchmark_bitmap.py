@@ -0,0 +1,138 @@
+"""
+Compares the two attendance storage layouts (ATTENDANCE_STORAGE) on the same
+synthetic register: on-disk size and the time to aggregate per-student counters
+(what attendance.summary rebuild/check do):
+
+    python benchmark_bitmap.py                      # 60 students x 2000 sessions
+    python benchmark_bitmap.py --students 120 --sessions 5000
+
+Each layout is written to its own throwaway SQLite file, so the numbers compare
+the layouts, not the server. Rows are aggregated with the GROUP BY from
+attendance.summary, bitmaps with attendance.bitmap.aggregate_counts; both must
+agree or the run fails.
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+import uuid
+from datetime import date, timedelta
+from sqlalchemy import create_engine, insert
+from sqlmodel import Session, SQLModel
+from auth.models import User  # noqa: F401  (attendance_sessions.faculty_id FK target)
+from attendance.models import (
+    AttendanceBitmap, AttendanceBitmapException, AttendanceRecord, AttendanceRoster, AttendanceSession,
+)
+from attendance import bitmap, summary
+
+TABLES = {
+    "rows": [AttendanceRecord],
+    "bitmap": [AttendanceRoster, AttendanceBitmap, AttendanceBitmapException],
+}
+
+def synthetic_register(students: int, sessions: int, seed: int = 7):
+    """[(session row, {roll_no: status})]: ~80% present, ~2% medical leave."""
+    rng = random.Random(seed)
+    roll_numbers = [f"23011{i:05d}" for i in range(students)]
+    faculty_id = uuid.UUID(int=1)
+    register = []
+    for n in range(sessions):
+        session = {
+            "id": uuid.uuid4(),
+            "subject_id": f"CS60{n % 6 + 1}",
+            "faculty_id": faculty_id,
+            "session_date": date(2026, 1, 5) + timedelta(days=n // 6),
+        }
+        marks = {}
+        for roll_no in roll_numbers:
+            draw = rng.random()
+            marks[roll_no] = "MEDICAL_LEAVE" if draw < 0.02 else "ABSENT" if draw < 0.2 else "PRESENT"
+        register.append((session, marks))
+    return register
+
+def build(path: str, layout: str, register: list):
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(engine, tables=[AttendanceSession.__table__] + [m.__table__ for m in TABLES[layout]])
+    with Session(engine) as db:
+        db.execute(insert(AttendanceSession), [session for session, _ in register])
+        for session, marks in register:
+            if layout == "bitmap":
+                bitmap.store_marks(db, session["id"], session["subject_id"], marks)
+            else:
+                db.execute(insert(AttendanceRecord), [
+                    {"id": uuid.uuid4(), "session_id": session["id"], "student_roll_no": roll_no, "status": status}
+                    for roll_no, status in marks.items()
+                ])
+        db.commit()
+    with engine.connect() as conn:
+        conn.exec_driver_sql("VACUUM")
+    return engine
+
+def layout_bytes(path: str, layout: str) -> int:
+    """Bytes of the layout's own tables and indexes (whole file if dbstat is unavailable)."""
+    names = [m.__tablename__ for m in TABLES[layout]]
+    conn = sqlite3.connect(path)
+    try:
+        placeholders = ",".join("?" * len(names))
+        return conn.execute(
+            f"SELECT SUM(d.pgsize) FROM dbstat d JOIN sqlite_master m ON m.name = d.name "
+            f"WHERE COALESCE(m.tbl_name, m.name) IN ({placeholders})", names
+        ).fetchone()[0]
+    except sqlite3.OperationalError:
+        return os.path.getsize(path)
+    finally:
+        conn.close()
+
+def aggregate(engine, layout: str) -> dict:
+    with Session(engine) as db:
+        if layout == "bitmap":
+            return bitmap.aggregate_counts(db)
+        return {
+            (roll_no, subject_id): dict(zip(summary.COUNTERS, counts))
+            for roll_no, subject_id, *counts in db.exec(summary._aggregate_from_records()).all()
+        }
+
+def timed(fn, repeat: int):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--students", type=int, default=60)
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    register = synthetic_register(args.students, args.sessions)
+    marks = args.students * args.sessions
+    print(f"📊 {args.students} students x {args.sessions} sessions = {marks} marks\n")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for layout in ("rows", "bitmap"):
+            path = os.path.join(workdir, f"{layout}.db")
+            started = time.perf_counter()
+            engine = build(path, layout, register)
+            write_seconds = time.perf_counter() - started
+            size = layout_bytes(path, layout)
+            counts, aggregate_seconds = timed(lambda: aggregate(engine, layout), args.repeat)
+            engine.dispose()
+            results[layout] = counts
+            print(
+                f"{layout:>6}: {size / 1024:9.1f} KiB ({size / marks:6.2f} B/mark)  "
+                f"write {write_seconds:6.2f}s  aggregate {aggregate_seconds * 1000:8.1f} ms"
+            )
+
+    if results["rows"] != results["bitmap"]:
+        raise SystemExit("❌ Layouts disagree on the aggregated counters")
+    print("\n✅ Both layouts aggregate to the same counters")
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, s
 from sqlmodel import Session, select
 from database import get_db
 from auth.models import User
-from core.dependencies import get_current_user
+from core.dependencies import get_current_user, get_token_principal, Principal
 from .models import *
 from .schemas import *
 import random, string, shutil, os
@@ -63,7 +63,7 @@ def join_classroom(
     return {"message": f"Successfully joined {classroom.name}"}
 
 @router.get("/my-classes", response_model=List[ClassroomRead])
-def get_my_classes(user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_my_classes(user: Principal = Depends(get_token_principal), db: Session = Depends(get_db)):
     if user.role in ["TEACHER", "HOD"]:
         classes = db.exec(select(Classroom).where(Classroom.teacher_id == user.id)).all()
         return [ClassroomRead(**c.dict(), is_teacher=True) for c in classes]
@@ -116,7 +116,7 @@ def create_assignment(
     return assign
 
 @router.get("/{class_id}/assignments", response_model=List[AssignmentRead])
-def list_assignments(class_id: int, user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def list_assignments(class_id: int, user: Principal = Depends(get_token_principal), db: Session = Depends(get_db)):
     assignments = db.exec(select(Assignment).where(Assignment.classroom_id == class_id)).all()
     result = []
     for a in assignments:
@@ -190,12 +190,12 @@ def create_test(
     return {"message": "Test created"}
 
 @router.get("/{class_id}/tests", response_model=List[TestRead])
-def list_tests(class_id: int, user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def list_tests(class_id: int, user: Principal = Depends(get_token_principal), db: Session = Depends(get_db)):
     tests = db.exec(select(Test).where(Test.classroom_id == class_id)).all()
     return tests
 
 @router.get("/tests/{test_id}/questions", response_model=List[TestQuestionRead])
-def get_test_questions(test_id: int, user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_test_questions(test_id: int, user: Principal = Depends(get_token_principal), db: Session = Depends(get_db)):
     test = db.get(Test, test_id)
     if not test: raise HTTPException(404, "Test not found")
     
@@ -249,7 +249,7 @@ def submit_test(
 @router.get("/assignments/{assign_id}/submissions")
 def get_assignment_submissions(
     assign_id: int, 
-    user: User = Depends(get_current_user), 
+    user: Principal = Depends(get_token_principal), 
     db: Session = Depends(get_db)
 ):
     if user.role not in ["TEACHER", "HOD"]: raise HTTPException(403, "Unauthorized")
@@ -272,7 +272,7 @@ def get_assignment_submissions(
 @router.get("/tests/{test_id}/results")
 def get_test_results(
     test_id: int, 
-    user: User = Depends(get_current_user), 
+    user: Principal = Depends(get_token_principal), 
     db: Session = Depends(get_db)
 ):
     if user.role not in ["TEACHER", "HOD"]: raise HTTPException(403, "Unauthorized")
@@ -9,9 +9,88 @@ DB_URL = os.getenv(
 # Auth Configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "super-secret-merged-key-2026")
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 1440 # 24 Hours
+# Keep the old 24 h default until the app renews tokens through /api/auth/refresh
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 1440)) # 24 Hours
+# Read-only routes trust access-token claims without a DB lookup only while the
+# token is this young; older tokens are checked against the user row (cached),
+# so a deactivated or demoted account is seen within this many minutes
+TOKEN_CLAIMS_MAX_AGE_MINUTES = int(os.getenv("TOKEN_CLAIMS_MAX_AGE_MINUTES", 15))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 7))
 
 # File Storage
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 UPLOAD_DIR = os.path.join(BASE_DIR, "uploads", "medical")
-os.makedirs(UPLOAD_DIR, exist_ok=True)
\ No newline at end of file
+os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+# Password Hashing Pool
+# bcrypt is CPU-bound (~250 ms per hash), so it runs in its own process pool
+# instead of Starlette's shared thread pool.
+HASH_POOL_WORKERS = int(os.getenv("HASH_POOL_WORKERS", os.cpu_count() or 2))
+HASH_POOL_MAX_QUEUE = int(os.getenv("HASH_POOL_MAX_QUEUE", 64))
+
+# Authenticated-principal cache (core.dependencies.get_current_user)
+PRINCIPAL_CACHE_TTL_SECONDS = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", 60))
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", 10000))
+
+# Dashboard aggregates (GET /api/auth/stats) are served from cache for this long
+STATS_CACHE_TTL_SECONDS = int(os.getenv("STATS_CACHE_TTL_SECONDS", 30))
+
+# OTP / ephemeral key store. "sqlite" shares codes between all workers on the
+# host through OTP_STORE_PATH; "memory" is per-process (single worker only).
+OTP_STORE_BACKEND = os.getenv("OTP_STORE_BACKEND", "sqlite")
+OTP_STORE_PATH = os.getenv("OTP_STORE_PATH", os.path.join(BASE_DIR, "otp_store.sqlite3"))
+OTP_STORE_MAX_ENTRIES = int(os.getenv("OTP_STORE_MAX_ENTRIES", 10000))
+OTP_TTL_SECONDS = int(os.getenv("OTP_TTL_SECONDS", 300))
+
+# Bulk provisioning (POST /api/auth/bulk-register). Initial passwords are hashed
+# at the normal cost on the shared hash pool, using at most this many of its
+# workers at a time so logins keep the rest. At ~250 ms per hash that is about
+# 4 rows/s per unit of concurrency: 10k rows take ~10 min at 4 (an 8-core box),
+# so imports run as a background job whose progress is polled by job id.
+# Raise it for imports outside teaching hours.
+BULK_HASH_CONCURRENCY = int(os.getenv("BULK_HASH_CONCURRENCY", max(1, HASH_POOL_WORKERS // 2)))
+# How long an import's status (and per-line errors) stays available
+BULK_IMPORT_STATUS_TTL_SECONDS = int(os.getenv("BULK_IMPORT_STATUS_TTL_SECONDS", 24 * 3600))
+BULK_INSERT_BATCH_SIZE = int(os.getenv("BULK_INSERT_BATCH_SIZE", 1000))
+
+# Attendance roll lists (POST /api/attendance/roll-list), per subject code.
+# Roster writes invalidate entries; the TTL bounds staleness across workers.
+ROLL_LIST_CACHE_TTL_SECONDS = int(os.getenv("ROLL_LIST_CACHE_TTL_SECONDS", 300))
+ROLL_LIST_CACHE_MAX_ENTRIES = int(os.getenv("ROLL_LIST_CACHE_MAX_ENTRIES", 2000))
+
+# In-memory timetable index (attendance.timetable). Local writes rebuild it at
+# once; the TTL bounds staleness for changes made by other workers or scripts.
+TIMETABLE_TTL_SECONDS = int(os.getenv("TIMETABLE_TTL_SECONDS", 60))
+
+# Attendance below this percentage is a shortage (student stats, shortage roster)
+SHORTAGE_THRESHOLD_PERCENT = int(os.getenv("SHORTAGE_THRESHOLD_PERCENT", 75))
+# classes_needed divides by (100 - threshold); at 100 no number of classes recovers a shortage
+if not 0 < SHORTAGE_THRESHOLD_PERCENT < 100:
+    raise ValueError(f"SHORTAGE_THRESHOLD_PERCENT must be between 1 and 99, got {SHORTAGE_THRESHOLD_PERCENT}")
+
+# Offline attendance sync (POST /api/attendance/sync): sessions per request
+SYNC_MAX_SESSIONS = int(os.getenv("SYNC_MAX_SESSIONS", 500))
+
+# How new attendance sessions are stored: "rows" (one attendance_records row
+# per student) or "bitmap" (compact roster bitmap, see attendance.bitmap)
+ATTENDANCE_STORAGE = os.getenv("ATTENDANCE_STORAGE", "rows")
+
+# Medical certificate OCR queue (medical.worker). Jobs are leased for
+# OCR_LEASE_SECONDS and the lease is renewed every OCR_HEARTBEAT_SECONDS; a
+# job whose worker died is picked up again once its lease runs out.
+OCR_WORKER_CONCURRENCY = int(os.getenv("OCR_WORKER_CONCURRENCY", os.cpu_count() or 2))
+OCR_MAX_ATTEMPTS = int(os.getenv("OCR_MAX_ATTEMPTS", 3))
+OCR_LEASE_SECONDS = int(os.getenv("OCR_LEASE_SECONDS", 300))
+OCR_HEARTBEAT_SECONDS = int(os.getenv("OCR_HEARTBEAT_SECONDS", 30))
+OCR_RETRY_BACKOFF_SECONDS = int(os.getenv("OCR_RETRY_BACKOFF_SECONDS", 60))
+OCR_POLL_SECONDS = float(os.getenv("OCR_POLL_SECONDS", 2))
+# Pages of one certificate OCR'd at once (per worker process), and their resolution
+OCR_PAGE_THREADS = int(os.getenv("OCR_PAGE_THREADS", 4))
+OCR_DPI = int(os.getenv("OCR_DPI", 200))
+# A page's embedded text layer is used instead of OCR when it has at least
+# this many letters/digits (digitally generated certificates)
+OCR_MIN_TEXT_CHARS = int(os.getenv("OCR_MIN_TEXT_CHARS", 25))
+# OCR result cache (medical.ocr_cache): raw text kept for at most this many bytes
+OCR_CACHE_MAX_TEXT_BYTES = int(os.getenv("OCR_CACHE_MAX_TEXT_BYTES", 64 * 1024 * 1024))
+# Largest medical certificate upload accepted (bytes); larger ones get 413
+MEDICAL_UPLOAD_MAX_BYTES = int(os.getenv("MEDICAL_UPLOAD_MAX_BYTES", 10 * 1024 * 1024))
@@ -1,29 +1,135 @@
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import event, inspect
+from core.cache import TTLCache
 from core.security import decode_token
+from config import PRINCIPAL_CACHE_TTL_SECONDS, PRINCIPAL_CACHE_MAX_ENTRIES, TOKEN_CLAIMS_MAX_AGE_MINUTES
 from database import get_db
 from sqlmodel import Session, select
 from auth.models import User # Fixed: Removed backend. prefix
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+@dataclass(frozen=True)
+class Principal:
+    """Read-only snapshot of the authenticated user, safe to share between requests."""
+    id: uuid.UUID
+    username: str
+    full_name: Optional[str]
+    email: Optional[str]
+    role: str
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            username=user.username,
+            full_name=user.full_name,
+            email=user.email,
+            role=user.role,
+            is_active=user.is_active,
+        )
+
+# token -> Principal. Entries never outlive the token's own expiry.
+principal_cache = TTLCache(maxsize=PRINCIPAL_CACHE_MAX_ENTRIES, ttl=PRINCIPAL_CACHE_TTL_SECONDS)
+
+def invalidate_principal(user_id) -> int:
+    """Drops every cached token belonging to this user."""
+    return principal_cache.discard_where(lambda token, principal: principal.id == user_id)
+
+@event.listens_for(User, "after_update")
+def _invalidate_on_user_change(mapper, connection, target):
+    state = inspect(target)
+    for attr in ("password_hash", "role", "is_active"):
+        if state.attrs[attr].history.has_changes():
+            invalidate_principal(target.id)
+            return
+
+@event.listens_for(User, "after_delete")
+def _invalidate_on_user_delete(mapper, connection, target):
+    invalidate_principal(target.id)
+
+def _decode_access_token(token: str) -> dict:
     payload = decode_token(token)
-    if not payload:
+    # Refresh tokens are only good for /api/auth/refresh
+    if not payload or payload.get("type", "access") != "access":
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    
-    user_id = payload.get("sub")
-    user = db.get(User, user_id)
-    if not user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    return user
+    return payload
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Principal:
+    return _load_principal(token, _decode_access_token(token), db)
+
+def _load_principal(token: str, payload: dict, db: Session) -> Principal:
+    principal = principal_cache.get(token)
+    if principal is None:
+        try:
+            user_id = uuid.UUID(payload.get("sub"))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+
+        user = db.get(User, user_id)
+        if not user:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+        principal = Principal.from_user(user)
+
+        ttl = min(PRINCIPAL_CACHE_TTL_SECONDS, payload.get("exp", 0) - time.time())
+        if ttl > 0:
+            principal_cache.set(token, principal, ttl=ttl)
+
+    if not principal.is_active:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User is inactive")
+    return principal
 
 def require_role(roles: list):
-    def role_checker(current_user: User = Depends(get_current_user)):
+    def role_checker(current_user: Principal = Depends(get_current_user)):
+        if current_user.role not in roles:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You don't have permission to perform this action"
+            )
+        return current_user
+    return role_checker
+
+def get_token_principal(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Principal:
+    """
+    Stateless variant of get_current_user for read-only routes: the identity and
+    role come straight from the verified token claims, with no DB round trip.
+    Tokens older than TOKEN_CLAIMS_MAX_AGE_MINUTES go through get_current_user's
+    cached lookup instead, which bounds staleness. Anything that writes or needs
+    the live account state should use get_current_user directly.
+    """
+    payload = _decode_access_token(token)
+    issued_at = payload.get("iat")
+    if not isinstance(issued_at, (int, float)) or time.time() - issued_at > TOKEN_CLAIMS_MAX_AGE_MINUTES * 60:
+        return _load_principal(token, payload, db)
+    try:
+        user_id = uuid.UUID(payload.get("sub"))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    if not payload.get("role"):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+
+    return Principal(
+        id=user_id,
+        username=payload.get("username"),
+        full_name=None,
+        email=None,
+        role=payload["role"],
+        is_active=True,
+    )
+
+def require_token_role(roles: list):
+    """require_role for read-only routes, checked against token claims only."""
+    def role_checker(current_user: Principal = Depends(get_token_principal)):
         if current_user.role not in roles:
             raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN, 
+                status_code=status.HTTP_403_FORBIDDEN,
                 detail="You don't have permission to perform this action"
             )
         return current_user
-    return role_checker
\ No newline at end of file
+    return role_checker
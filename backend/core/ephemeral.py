@@ -0,0 +1,112 @@
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from contextlib import closing
+from core.cache import TTLCache
+from config import OTP_STORE_BACKEND, OTP_STORE_PATH, OTP_STORE_MAX_ENTRIES, OTP_TTL_SECONDS
+
+class EphemeralStore(ABC):
+    """Short-lived key/value store (OTPs, reset tokens). Values are strings."""
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl: float = None):
+        ...
+
+    @abstractmethod
+    def get(self, key: str):
+        ...
+
+    @abstractmethod
+    def pop(self, key: str):
+        """Returns the value and removes it atomically, so a code can only be consumed once."""
+
+    def delete(self, key: str):
+        self.pop(key)
+
+
+class MemoryEphemeralStore(EphemeralStore):
+    """Per-process store. Fine for a single uvicorn worker."""
+
+    def __init__(self, max_entries: int, default_ttl: float):
+        self._cache = TTLCache(maxsize=max_entries, ttl=default_ttl)
+
+    def set(self, key, value, ttl=None):
+        self._cache.set(key, value, ttl=ttl)
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def pop(self, key):
+        return self._cache.pop(key)
+
+
+class SQLiteEphemeralStore(EphemeralStore):
+    """
+    Store backed by a SQLite file, shared by every worker process on the host.
+    Expired rows are purged on write and the table is capped at max_entries
+    (the entries closest to expiry are dropped first).
+    """
+
+    def __init__(self, path: str, max_entries: int, default_ttl: float):
+        self.path = path
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS ephemeral_keys ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_ephemeral_keys_expires_at ON ephemeral_keys (expires_at)"
+            )
+
+    def _connect(self):
+        # A fresh connection per call keeps this safe across threads and processes
+        return sqlite3.connect(self.path, timeout=5, isolation_level=None)
+
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        expires_at = now + (self.default_ttl if ttl is None else ttl)
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM ephemeral_keys WHERE expires_at <= ?", (now,))
+            conn.execute(
+                "INSERT OR REPLACE INTO ephemeral_keys (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at),
+            )
+            conn.execute(
+                "DELETE FROM ephemeral_keys WHERE key IN ("
+                " SELECT key FROM ephemeral_keys ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            conn.execute("COMMIT")
+
+    def get(self, key):
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT value FROM ephemeral_keys WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+        return row[0] if row else None
+
+    def pop(self, key):
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT value FROM ephemeral_keys WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+            conn.execute("DELETE FROM ephemeral_keys WHERE key = ?", (key,))
+            conn.execute("COMMIT")
+        return row[0] if row else None
+
+
+def get_otp_store() -> EphemeralStore:
+    if OTP_STORE_BACKEND == "sqlite":
+        return SQLiteEphemeralStore(OTP_STORE_PATH, OTP_STORE_MAX_ENTRIES, OTP_TTL_SECONDS)
+    if OTP_STORE_BACKEND == "memory":
+        return MemoryEphemeralStore(OTP_STORE_MAX_ENTRIES, OTP_TTL_SECONDS)
+    raise ValueError(f"Unknown OTP_STORE_BACKEND: {OTP_STORE_BACKEND}")
@@ -1,9 +1,21 @@
+import asyncio
+import hashlib
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from jose import jwt, JWTError
-from config import SECRET_KEY, ALGORITHM
+from config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS, HASH_POOL_WORKERS, HASH_POOL_MAX_QUEUE, BULK_HASH_CONCURRENCY
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min_rounds makes hashes below policy (e.g. from older bulk imports) report
+# needs_update, so they are re-hashed at full cost on the user's next login.
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__min_rounds=12)
+
+# Passwords per bulk task: about a second of work, so logins queued behind a
+# roster import wait at most that long for a worker
+BULK_HASH_CHUNK_SIZE = 4
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
@@ -11,18 +23,163 @@ def get_password_hash(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str):
+    # Returns (verified, new_hash); new_hash is set when the stored hash is below policy
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+def _hash_many(passwords: list) -> list:
+    return [get_password_hash(password) for password in passwords]
+
+# --- Hashing Pool ---
+# Every bcrypt call from a request handler goes through this pool. At most
+# HASH_POOL_WORKERS hashes run at once and HASH_POOL_MAX_QUEUE more may wait;
+# anything beyond that is rejected with a 503 straight away instead of piling
+# up behind the login rush. The *_async helpers await the pool's future on the
+# event loop, so a queued hash holds no threadpool thread and a login burst
+# cannot starve the sync endpoints of Starlette's 40 worker threads.
+_hash_pool = None
+_hash_lock = threading.Lock()
+_hash_stats = {
+    "in_flight": 0,
+    "completed": 0,
+    "rejected": 0,
+    "total_wait_ms": 0.0,
+    "max_wait_ms": 0.0,
+}
+
+def _get_hash_pool() -> ProcessPoolExecutor:
+    global _hash_pool
+    with _hash_lock:
+        if _hash_pool is None:
+            _hash_pool = ProcessPoolExecutor(max_workers=HASH_POOL_WORKERS)
+        return _hash_pool
+
+def _timed_call(fn, submitted_at: float, *args):
+    # Runs inside the worker process; reports how long the job sat in the queue
+    started_at = time.time()
+    return fn(*args), (started_at - submitted_at) * 1000
+
+async def _run_in_hash_pool(fn, *args):
+    with _hash_lock:
+        if _hash_stats["in_flight"] >= HASH_POOL_WORKERS + HASH_POOL_MAX_QUEUE:
+            _hash_stats["rejected"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please try again",
+                headers={"Retry-After": "1"},
+            )
+        _hash_stats["in_flight"] += 1
+
+    try:
+        future = _get_hash_pool().submit(_timed_call, fn, time.time(), *args)
+        result, wait_ms = await asyncio.wrap_future(future)
+    finally:
+        with _hash_lock:
+            _hash_stats["in_flight"] -= 1
+
+    with _hash_lock:
+        _hash_stats["completed"] += 1
+        _hash_stats["total_wait_ms"] += wait_ms
+        _hash_stats["max_wait_ms"] = max(_hash_stats["max_wait_ms"], wait_ms)
+    return result
+
+async def hash_password_async(password: str) -> str:
+    return await _run_in_hash_pool(get_password_hash, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_in_hash_pool(verify_password, plain_password, hashed_password)
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str):
+    return await _run_in_hash_pool(verify_and_update_password, plain_password, hashed_password)
+
+def hash_passwords_bulk(passwords: list, progress=None) -> list:
+    """
+    Hashes a whole roster at the normal cost on the shared hash pool, with at
+    most BULK_HASH_CONCURRENCY small tasks queued at once so interactive
+    logins are never stuck behind it. Blocking, and slow for large rosters
+    (see BULK_HASH_CONCURRENCY), so run it in a background job. progress, if
+    given, is called with the number of passwords hashed so far.
+    """
+    chunks = [passwords[i:i + BULK_HASH_CHUNK_SIZE] for i in range(0, len(passwords), BULK_HASH_CHUNK_SIZE)]
+    hashed = [None] * len(chunks)
+    pending = {}  # future -> chunk position
+    submitted = 0
+    hashed_count = 0
+    try:
+        while submitted < len(chunks) or pending:
+            while submitted < len(chunks) and len(pending) < BULK_HASH_CONCURRENCY:
+                future = _get_hash_pool().submit(_hash_many, chunks[submitted])
+                # Counted only once submitted, so a failed submit cannot leak it
+                with _hash_lock:
+                    _hash_stats["in_flight"] += 1
+                pending[future] = submitted
+                submitted += 1
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                position = pending.pop(future)
+                with _hash_lock:
+                    _hash_stats["in_flight"] -= 1
+                hashed[position] = future.result()
+                hashed_count += len(hashed[position])
+            if progress:
+                progress(hashed_count)
+    finally:
+        for future in pending:
+            future.cancel()
+        with _hash_lock:
+            _hash_stats["in_flight"] -= len(pending)
+    return [password_hash for chunk in hashed for password_hash in chunk]
+
+def get_hash_pool_stats() -> dict:
+    with _hash_lock:
+        in_flight = _hash_stats["in_flight"]
+        completed = _hash_stats["completed"]
+        return {
+            "workers": HASH_POOL_WORKERS,
+            "max_queue": HASH_POOL_MAX_QUEUE,
+            "in_flight": in_flight,
+            "queue_depth": max(0, in_flight - HASH_POOL_WORKERS),
+            "completed": completed,
+            "rejected": _hash_stats["rejected"],
+            "avg_wait_ms": round(_hash_stats["total_wait_ms"] / completed, 2) if completed else 0.0,
+            "max_wait_ms": round(_hash_stats["max_wait_ms"], 2),
+        }
+
+def shutdown_hash_pool():
+    global _hash_pool
+    with _hash_lock:
+        if _hash_pool is not None:
+            _hash_pool.shutdown(wait=False, cancel_futures=True)
+            _hash_pool = None
+
 def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
     to_encode = data.copy()
+    now = datetime.utcnow()
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = now + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=60)
-    
-    to_encode.update({"exp": expire})
+        expire = now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+
+    to_encode.update({"exp": expire, "iat": now, "type": "access"})
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+def password_fingerprint(password_hash: str) -> str:
+    # Changes whenever the password does, without putting the hash in the token
+    return hashlib.sha256(password_hash.encode()).hexdigest()[:16]
+
+def create_refresh_token(user_id: str, password_hash: str) -> str:
+    now = datetime.utcnow()
+    to_encode = {
+        "sub": user_id,
+        "pwd": password_fingerprint(password_hash),
+        "iat": now,
+        "exp": now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+        "type": "refresh",
+    }
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 def decode_token(token: str) -> dict:
     try:
         return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except JWTError:
-        return None
\ No newline at end of file
+        return None
@@ -1,4 +1,5 @@
 from sqlmodel import create_engine, Session, SQLModel
+from sqlalchemy.dialects import postgresql, sqlite
 from config import DB_URL
 
 # echo=False for production to reduce log noise
@@ -9,4 +10,13 @@ def init_db():
 
 def get_db():
     with Session(engine) as session:
-        yield session
\ No newline at end of file
+        yield session
+
+def upsert_insert(db: Session, model):
+    """INSERT construct that supports .on_conflict_do_update() on Postgres and SQLite."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model)
+    if dialect == "sqlite":
+        return sqlite.insert(model)
+    raise NotImplementedError(f"Upserts are not supported on {dialect}")
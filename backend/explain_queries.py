@@ -0,0 +1,112 @@
+"""
+Prints the query plan for the hot queries behind the main endpoints, so new
+indexes can be checked against the real database:
+
+    python explain_queries.py            # plans as the planner would pick them
+    python explain_queries.py --no-seq   # Postgres: disable seq scans, to prove
+                                         # an index *can* serve each query
+
+Small tables are often seq-scanned on purpose; run it against a database with
+realistic data before drawing conclusions.
+"""
+import sys
+import uuid
+from datetime import date
+from sqlalchemy import text, desc, update
+from sqlmodel import select
+from database import engine
+from attendance.models import AttendanceRecord, AttendanceSession, AttendanceSummary, AttendanceStatus
+from medical.models import MedicalRequest, MedicalStatus
+from announcements.models import Announcement, AnnounceMember, Reaction, PollVote
+from students.models import Student
+
+SAMPLE_USER = uuid.UUID(int=1)
+SAMPLE_SESSION = uuid.UUID(int=2)
+SEMESTER = (date(2026, 1, 1), date(2026, 6, 30))
+
+QUERIES = {
+    "student stats: records of one student with their sessions": (
+        select(AttendanceRecord, AttendanceSession)
+        .join(AttendanceSession, AttendanceRecord.session_id == AttendanceSession.id)
+        .where(AttendanceRecord.student_roll_no == "2301105217")
+    ),
+    "medical leave: sessions of a subject in a date range": (
+        select(AttendanceSession.id)
+        .where(AttendanceSession.subject_id == "CS601")
+        .where(AttendanceSession.session_date.between(*SEMESTER))
+    ),
+    "sync: records of the sessions being resubmitted": (
+        select(AttendanceRecord.id, AttendanceRecord.student_roll_no, AttendanceRecord.status)
+        .where(AttendanceRecord.session_id.in_([SAMPLE_SESSION]))
+    ),
+    "register / export: records of a subject's sessions in a date range": (
+        select(AttendanceRecord.session_id, AttendanceRecord.student_roll_no, AttendanceRecord.status)
+        .join(AttendanceSession, AttendanceSession.id == AttendanceRecord.session_id)
+        .where(AttendanceSession.subject_id == "CS601")
+        .where(AttendanceSession.session_date.between(*SEMESTER))
+    ),
+    "medical leave: UPDATE ... FROM of one student's absences": (
+        update(AttendanceRecord)
+        .where(AttendanceRecord.session_id == AttendanceSession.id)
+        .where(AttendanceRecord.status == AttendanceStatus.ABSENT)
+        .where(AttendanceRecord.student_roll_no == "2301105217")
+        .where(AttendanceSession.session_date.between(*SEMESTER))
+        .values(status=AttendanceStatus.MEDICAL_LEAVE)
+    ),
+    "summary: per-subject counters of one student": (
+        select(AttendanceSummary).where(AttendanceSummary.student_roll_no == "2301105217")
+    ),
+    "department analytics: students of a department": (
+        select(Student.id).where(Student.department_id == "CSE")
+    ),
+    "HOD pending medical requests": (
+        select(MedicalRequest)
+        .where(MedicalRequest.department_id == "CSE")
+        .where(MedicalRequest.status == MedicalStatus.PENDING)
+        .order_by(desc(MedicalRequest.created_at))
+    ),
+    "announcement feed of a group": (
+        select(Announcement)
+        .where(Announcement.group_id == 1)
+        .where(Announcement.is_deleted == False)
+        .order_by(Announcement.created_at)
+    ),
+    "my announcement groups": (
+        select(AnnounceMember.group_id).where(AnnounceMember.user_id == SAMPLE_USER)
+    ),
+    "reactions of an announcement": (
+        select(Reaction).where(Reaction.announcement_id == 1)
+    ),
+    "votes of a poll option": (
+        select(PollVote).where(PollVote.option_id == 1)
+    ),
+}
+
+def explain(conn, statement) -> list:
+    sql = str(statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+    prefix = "EXPLAIN QUERY PLAN" if engine.dialect.name == "sqlite" else "EXPLAIN"
+    rows = conn.execute(text(f"{prefix} {sql}")).all()
+    # SQLite returns (id, parent, notused, detail); Postgres one text column
+    return [row[-1] for row in rows]
+
+def is_full_scan(line: str) -> bool:
+    if engine.dialect.name == "sqlite":
+        return line.startswith("SCAN ") and " USING " not in line
+    return "Seq Scan" in line
+
+def main():
+    no_seq = "--no-seq" in sys.argv
+    full_scans = 0
+    with engine.connect() as conn:
+        if no_seq and engine.dialect.name == "postgresql":
+            conn.execute(text("SET enable_seqscan = off"))
+        for name, statement in QUERIES.items():
+            print(f"\n=== {name}")
+            for line in explain(conn, statement):
+                flag = "⚠️ " if is_full_scan(line) else "   "
+                full_scans += flag != "   "
+                print(f"{flag}{line}")
+    print(f"\n{'✅ No full table scans' if not full_scans else f'⚠️ {full_scans} full table scan(s)'}")
+
+if __name__ == "__main__":
+    main()
@@ -60,15 +60,18 @@
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from sqlmodel import SQLModel
+from sqlmodel import SQLModel, Session
 from database import engine
 from config import UPLOAD_DIR
+from core.security import shutdown_hash_pool
+from attendance.timetable import rebuild_timetable
+from attendance.summary import ensure_summary
 import os
 
 # --- IMPORTANT: Import ALL Models here so SQLModel finds them ---
 from auth.models import User
-from attendance.models import AttendanceSession, AttendanceRecord, AttendanceAuditLog
-from medical.models import MedicalRequest, MedicalProcessingJob
+from attendance.models import AttendanceSession, AttendanceRecord, AttendanceAuditLog, AttendanceSummary, ShortageSnapshot, AttendanceRoster, AttendanceBitmap, AttendanceBitmapException
+from medical.models import MedicalRequest, MedicalProcessingJob, OcrCacheEntry
 from students.models import Student
 from subjects.models import Subject
 from announcements.models import (        
@@ -120,7 +123,17 @@ app.include_router(classroom_router, prefix="/api/classroom", tags=["Classroom"]
 
 @app.on_event("startup")
 def on_startup():
-    # This creates the tables in the database
+    # Creates missing tables (fresh dev databases). Deployments migrate first;
+    # see the deploy order in alembic revision 765e42bb4aa9
     SQLModel.metadata.create_all(engine)
     os.makedirs(UPLOAD_DIR, exist_ok=True)
-    os.makedirs(os.path.join(UPLOAD_DIR, "classroom"), exist_ok=True)
\ No newline at end of file
+    os.makedirs(os.path.join(UPLOAD_DIR, "classroom"), exist_ok=True)
+    rebuild_timetable()
+    # Empty summary next to existing attendance (tables made by create_all
+    # before the migration could backfill): rebuild it, or every student sees 0%
+    with Session(engine) as db:
+        ensure_summary(db)
+
+@app.on_event("shutdown")
+def on_shutdown():
+    shutdown_hash_pool()
@@ -26,4 +26,35 @@ def get_pending_requests_for_hod(db: Session, department_id: str):
         MedicalRequest.department_id == department_id,
         MedicalRequest.status == MedicalStatus.PENDING
     )
-    return db.exec(statement).all()
\ No newline at end of file
+    return db.exec(statement).all()
+
+
+def find_duplicates(db: Session, requests: list) -> dict:
+    """
+    {request_id: earlier request with the identical document} for the given
+    requests, by document_sha256, in one query. The earliest submission wins.
+    """
+    hashes = {r.document_sha256 for r in requests if r.document_sha256}
+    if not hashes:
+        return {}
+    by_hash = {}
+    for other in db.exec(
+        select(MedicalRequest)
+        .where(MedicalRequest.document_sha256.in_(hashes))
+        .order_by(MedicalRequest.created_at)
+    ).all():
+        by_hash.setdefault(other.document_sha256, []).append(other)
+
+    duplicates = {}
+    for r in requests:
+        for other in by_hash.get(r.document_sha256, []):
+            if other.created_at >= r.created_at:
+                break
+            duplicates[r.id] = {
+                "request_id": str(other.id),
+                "student_roll_no": other.student_roll_no,
+                "status": other.status,
+                "created_at": other.created_at,
+            }
+            break
+    return duplicates
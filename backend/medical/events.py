@@ -1,27 +1,56 @@
 import logging
-from sqlmodel import Session, select
+from sqlmodel import Session
 from medical.models import MedicalRequest, MedicalProcessingJob, ProcessingStatus, MedicalStatus
 from medical.processing import ocr_pdf, extract_dates, validate_dates
+from medical import jobs, ocr_cache
 from attendance.service import apply_medical_leave
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def process_medical_request(db: Session, request_id):
+def run_ocr(document_path: str):
+    """
+    The CPU-heavy part, on its own so medical.worker can run it in a pool
+    process: no database access, returns a processing.OcrResult. Raises on
+    failure so the job is retried.
+    """
+    return ocr_pdf(document_path)
+
+def process_medical_request(db: Session, job_id, ocr_result=None, worker_id: str = None):
+    """
+    Completes one OCR job: stores the text, extracted dates and confidence on
+    the job and, when the request is already APPROVED and the dates match,
+    applies the medical leave. ocr_result is run_ocr()'s output; without it
+    the document's entry in ocr_cache is used, and OCR runs inline only when
+    there is none. Fresh results are added to the cache. With worker_id,
+    nothing is written unless that worker still holds the job's lease.
+    Commits; errors roll back and propagate.
+    """
     try:
-        # 1. Fetch Request
-        medical_req = db.get(MedicalRequest, request_id)
-        if not medical_req or medical_req.status != MedicalStatus.APPROVED:
-            return
+        # 1. Fetch Job + Request
+        job = db.get(MedicalProcessingJob, job_id)
+        if job is None:
+            return None
+        if worker_id is not None and not jobs.holds_lease(job, worker_id):
+            logger.warning(f"Lease lost for OCR job {job_id}, result discarded")
+            return None
+        medical_req = db.get(MedicalRequest, job.medical_request_id)
 
         # 2. OCR Processing
-        ocr_text, confidence = ocr_pdf(medical_req.document_path)
-        
-        # 3. Intelligent Date Extraction
-        extracted_from, extracted_to = extract_dates(ocr_text)
+        cached = None
+        if ocr_result is None:
+            cached = ocr_cache.lookup(db, medical_req.document_sha256)
+            ocr_result = ocr_cache.as_result(cached) if cached else run_ocr(medical_req.document_path)
+
+        # 3. Intelligent Date Extraction (cached dates outlive the cached text)
+        if cached:
+            extracted_from, extracted_to = cached.extracted_from_date, cached.extracted_to_date
+        else:
+            extracted_from, extracted_to = extract_dates(ocr_result.text)
+            ocr_cache.store(db, medical_req.document_sha256, ocr_result, extracted_from, extracted_to)
 
         # 4. Validation
-        semester_start = medical_req.from_date.replace(month=1, day=1) 
+        semester_start = medical_req.from_date.replace(month=1, day=1)
         semester_end = medical_req.from_date.replace(month=6, day=30)
 
         is_valid = validate_dates(
@@ -34,30 +63,34 @@ def process_medical_request(db: Session, request_id):
         )
 
         # 5. Record Job
-        job = MedicalProcessingJob(
-            medical_request_id=request_id,
-            ocr_text=ocr_text,
-            extracted_from_date=extracted_from,
-            extracted_to_date=extracted_to,
-            confidence_score=confidence,
-            processing_status=ProcessingStatus.COMPLETED if is_valid else ProcessingStatus.FAILED
-        )
+        job.ocr_text = ocr_result.text if not cached else cached.ocr_text
+        job.ocr_pages = ocr_result.pages
+        job.extraction_method = ocr_result.method
+        job.from_cache = cached is not None
+        job.extracted_from_date = extracted_from
+        job.extracted_to_date = extracted_to
+        job.confidence_score = ocr_result.confidence
+        job.dates_match = is_valid
+        job.last_error = None
+        jobs.release(job, ProcessingStatus.COMPLETED)
         db.add(job)
-        
-        # 6. Apply Attendance
-        if is_valid:
+
+        # 6. Apply Attendance (commits the job with it)
+        if is_valid and medical_req.status == MedicalStatus.APPROVED:
             apply_medical_leave(
-                db, 
-                medical_req.student_roll_no, 
-                medical_req.from_date, 
+                db,
+                medical_req.student_roll_no,
+                medical_req.from_date,
                 medical_req.to_date
             )
-            logger.info(f"Auto-updated attendance for request {request_id}")
-        else:
-            logger.warning(f"OCR mismatch for request {request_id}")
+            logger.info(f"Auto-updated attendance for request {medical_req.id}")
+        elif not is_valid:
+            logger.warning(f"OCR mismatch for request {medical_req.id}")
 
         db.commit()
+        return job
 
     except Exception as e:
         db.rollback()
-        logger.error(f"Error in background processing: {str(e)}")
\ No newline at end of file
+        logger.error(f"Error processing OCR job {job_id}: {str(e)}")
+        raise
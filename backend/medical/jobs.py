@@ -0,0 +1,118 @@
+"""
+Durable OCR job queue on medical_processing_jobs.
+
+  enqueue     API side: one PENDING job per submitted certificate
+  claim_jobs  worker side: lease up to N runnable jobs (PENDING whose backoff
+              has passed, or PROCESSING whose lease ran out)
+  heartbeat   renew the leases of the jobs a worker still holds
+  fail_job    record the error; retry with backoff, FAILED after OCR_MAX_ATTEMPTS
+
+Results are written by medical.events.process_medical_request. Claims use
+FOR UPDATE SKIP LOCKED on Postgres and a guarded UPDATE ... RETURNING
+everywhere, so several workers can poll the table without sharing a job.
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import and_, or_, update
+from sqlmodel import Session, select
+from medical.models import MedicalProcessingJob, MedicalRequest, ProcessingStatus
+from config import OCR_LEASE_SECONDS, OCR_MAX_ATTEMPTS, OCR_RETRY_BACKOFF_SECONDS
+
+def enqueue(db: Session, request_id) -> MedicalProcessingJob:
+    """Adds a PENDING job to the caller's transaction (does not commit)."""
+    job = MedicalProcessingJob(medical_request_id=request_id, processing_status=ProcessingStatus.PENDING)
+    db.add(job)
+    return job
+
+def _runnable(now: datetime):
+    return or_(
+        and_(
+            MedicalProcessingJob.processing_status == ProcessingStatus.PENDING,
+            or_(MedicalProcessingJob.run_after.is_(None), MedicalProcessingJob.run_after <= now),
+        ),
+        and_(
+            MedicalProcessingJob.processing_status == ProcessingStatus.PROCESSING,
+            MedicalProcessingJob.lease_expires_at < now,
+        ),
+    )
+
+def claim_jobs(db: Session, worker_id: str, limit: int) -> list:
+    """Leases up to `limit` jobs to worker_id and commits. Returns [(job_id, document_path, document_sha256)]."""
+    if limit <= 0:
+        return []
+    now = datetime.utcnow()
+    candidates = db.exec(
+        select(MedicalProcessingJob.id)
+        .where(_runnable(now))
+        .order_by(MedicalProcessingJob.created_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not candidates:
+        db.rollback()
+        return []
+
+    # Re-checked in the UPDATE itself, for databases without SKIP LOCKED
+    claimed = db.execute(
+        update(MedicalProcessingJob)
+        .where(MedicalProcessingJob.id.in_(candidates))
+        .where(_runnable(now))
+        .values(
+            processing_status=ProcessingStatus.PROCESSING,
+            worker_id=worker_id,
+            attempts=MedicalProcessingJob.attempts + 1,
+            lease_expires_at=now + timedelta(seconds=OCR_LEASE_SECONDS),
+            heartbeat_at=now,
+            processed_at=now,
+        )
+        .returning(MedicalProcessingJob.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    documents = {
+        job_id: (path, sha256)
+        for job_id, path, sha256 in db.exec(
+            select(MedicalProcessingJob.id, MedicalRequest.document_path, MedicalRequest.document_sha256)
+            .join(MedicalRequest, MedicalRequest.id == MedicalProcessingJob.medical_request_id)
+            .where(MedicalProcessingJob.id.in_(claimed))
+        ).all()
+    } if claimed else {}
+    db.commit()
+    return [(job_id, *documents[job_id]) for job_id in claimed]
+
+def heartbeat(db: Session, worker_id: str, job_ids: list) -> int:
+    """Extends the leases worker_id still holds; returns how many it still holds."""
+    if not job_ids:
+        return 0
+    now = datetime.utcnow()
+    result = db.execute(
+        update(MedicalProcessingJob)
+        .where(MedicalProcessingJob.id.in_(job_ids))
+        .where(MedicalProcessingJob.worker_id == worker_id)
+        .where(MedicalProcessingJob.processing_status == ProcessingStatus.PROCESSING)
+        .values(heartbeat_at=now, lease_expires_at=now + timedelta(seconds=OCR_LEASE_SECONDS))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+def holds_lease(job: MedicalProcessingJob, worker_id: str) -> bool:
+    return job.processing_status == ProcessingStatus.PROCESSING and job.worker_id == worker_id
+
+def release(job: MedicalProcessingJob, status: ProcessingStatus):
+    job.processing_status = status
+    job.processed_at = datetime.utcnow()
+    job.worker_id = None
+    job.lease_expires_at = None
+
+def fail_job(db: Session, job_id, worker_id: str, error: str):
+    """Back to PENDING with exponential backoff, or FAILED once attempts run out. Commits."""
+    job = db.get(MedicalProcessingJob, job_id)
+    if job is None or not holds_lease(job, worker_id):
+        return  # Lease lost: another worker owns the job now
+    job.last_error = error[:2000]
+    if job.attempts >= OCR_MAX_ATTEMPTS:
+        release(job, ProcessingStatus.FAILED)
+    else:
+        release(job, ProcessingStatus.PENDING)
+        job.run_after = datetime.utcnow() + timedelta(seconds=OCR_RETRY_BACKOFF_SECONDS * 2 ** (job.attempts - 1))
+    db.add(job)
+    db.commit()
@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import JSON, Column, Index
 from typing import Optional, List
 from datetime import date, datetime
 import uuid as uuid_pkg
@@ -19,6 +20,8 @@ class MedicalStatus(str, Enum):  # Fixed: removed enum. prefix
 # 2. Main Medical Request Model
 class MedicalRequest(SQLModel, table=True):
     __tablename__ = "medical_requests"
+    # HOD pending/reviewed lists filter on department + status, newest first
+    __table_args__ = (Index("ix_medical_requests_dept_status_created", "department_id", "status", "created_at"),)
 
     id: uuid_pkg.UUID = Field(default_factory=uuid_pkg.uuid4, primary_key=True)
     student_roll_no: str = Field(index=True)
@@ -27,6 +30,7 @@ class MedicalRequest(SQLModel, table=True):
     to_date: date
     reason: str
     document_path: str
+    document_sha256: Optional[str] = Field(default=None, index=True) # Identical re-uploads share it
     status: MedicalStatus = Field(default=MedicalStatus.PENDING)
     hod_remark: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -34,19 +38,58 @@ class MedicalRequest(SQLModel, table=True):
     # Relationship to the OCR processing history
     jobs: List["MedicalProcessingJob"] = Relationship(back_populates="request")
 
-# 3. OCR / Background Task Tracking Model
+# 3. OCR Job Queue Model
+# Durable queue consumed by medical.worker: PENDING -> PROCESSING (leased to
+# one worker, kept alive by heartbeats) -> COMPLETED, or back to PENDING for a
+# retry until OCR_MAX_ATTEMPTS, then FAILED. See medical.jobs.
 class MedicalProcessingJob(SQLModel, table=True):
     __tablename__ = "medical_processing_jobs"
+    # Workers claim the oldest runnable job of a status
+    __table_args__ = (Index("ix_medical_processing_jobs_queue", "processing_status", "created_at"),)
 
     id: uuid_pkg.UUID = Field(default_factory=uuid_pkg.uuid4, primary_key=True)
-    medical_request_id: uuid_pkg.UUID = Field(foreign_key="medical_requests.id")
+    medical_request_id: uuid_pkg.UUID = Field(foreign_key="medical_requests.id", index=True)
     ocr_text: Optional[str] = None
+    ocr_pages: Optional[List[dict]] = Field(default=None, sa_column=Column(JSON)) # [{"page", "text", "confidence", "words", "method"}]
+    extraction_method: Optional[str] = None # "text" (embedded text layer), "ocr" or "mixed"
+    from_cache: bool = False # Result reused from ocr_cache; no OCR ran
     extracted_from_date: Optional[date] = None
     extracted_to_date: Optional[date] = None
     confidence_score: float = 0.0
+    dates_match: Optional[bool] = None # Extracted dates agree with the declared ones
     
     # Using the ProcessingStatus enum for consistency
     processing_status: ProcessingStatus = Field(default=ProcessingStatus.PENDING)
-    processed_at: datetime = Field(default_factory=datetime.utcnow)
+    processed_at: datetime = Field(default_factory=datetime.utcnow) # Last state change
 
-    request: MedicalRequest = Relationship(back_populates="jobs")
\ No newline at end of file
+    # Queue bookkeeping
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    attempts: int = 0
+    run_after: Optional[datetime] = None # Retry backoff: not claimable before this
+    worker_id: Optional[str] = None
+    lease_expires_at: Optional[datetime] = None # A PROCESSING job past its lease is reclaimed
+    heartbeat_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+
+    request: MedicalRequest = Relationship(back_populates="jobs")
+
+# 4. OCR Result Cache
+# One row per distinct document (content hash) and OCR pipeline version, so a
+# re-uploaded certificate skips OCR. Extracted dates and scores are kept for
+# good; the raw text is evicted, least recently used first, past
+# OCR_CACHE_MAX_TEXT_BYTES. See medical.ocr_cache.
+class OcrCacheEntry(SQLModel, table=True):
+    __tablename__ = "ocr_cache"
+
+    content_sha256: str = Field(primary_key=True)
+    engine_version: str = Field(primary_key=True)
+    extraction_method: Optional[str] = None
+    confidence_score: float = 0.0
+    extracted_from_date: Optional[date] = None
+    extracted_to_date: Optional[date] = None
+    ocr_text: Optional[str] = None # None once evicted
+    ocr_pages: Optional[List[dict]] = Field(default=None, sa_column=Column(JSON))
+    text_bytes: int = 0 # Size of ocr_text + ocr_pages, 0 once evicted
+    hits: int = 0
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    last_used_at: datetime = Field(default_factory=datetime.utcnow, index=True)
@@ -0,0 +1,129 @@
+"""
+OCR results keyed by document content (sha256 of the upload) and pipeline
+version (processing.engine_version), persisted in ocr_cache.
+
+Students often re-upload the same certificate after a rejection; the worker
+finds the earlier result here and skips OCR. Extracted dates and confidence
+never expire, so a hit stays useful after its raw text has been evicted to
+keep the table under OCR_CACHE_MAX_TEXT_BYTES. None of these commit; they
+ride on the job's transaction.
+
+The table's size is tracked as a running estimate per process, so a store
+does not sum the whole table. The real total is re-read when the estimate
+crosses the bound or is RESYNC_SECONDS old (other workers store too).
+"""
+import json
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import null, update
+from sqlmodel import Session, select, func
+from medical.models import OcrCacheEntry
+from medical.processing import OcrResult, engine_version
+from database import upsert_insert
+from config import OCR_CACHE_MAX_TEXT_BYTES
+
+# Evict down to this share of the bound, so eviction doesn't run on every store
+EVICT_TO = 0.9
+RESYNC_SECONDS = 300
+
+_size = {"bytes": None, "read_at": 0.0}
+_size_lock = threading.Lock()
+
+def _within_bound(added: int, max_bytes: int) -> bool:
+    """Adds a store to the running estimate; False when the real total must be checked."""
+    with _size_lock:
+        if _size["bytes"] is None or time.monotonic() - _size["read_at"] >= RESYNC_SECONDS:
+            return False
+        _size["bytes"] += added
+        return _size["bytes"] <= max_bytes
+
+def lookup(db: Session, content_sha256: Optional[str]) -> Optional[OcrCacheEntry]:
+    if not content_sha256:
+        return None
+    entry = db.get(OcrCacheEntry, (content_sha256, engine_version()))
+    if entry is not None:
+        entry.hits += 1
+        entry.last_used_at = datetime.utcnow()
+        db.add(entry)
+    return entry
+
+def contains(db: Session, content_sha256: Optional[str]) -> bool:
+    if not content_sha256:
+        return False
+    return db.exec(
+        select(OcrCacheEntry.content_sha256)
+        .where(OcrCacheEntry.content_sha256 == content_sha256)
+        .where(OcrCacheEntry.engine_version == engine_version())
+    ).first() is not None
+
+def as_result(entry: OcrCacheEntry) -> OcrResult:
+    return OcrResult(
+        text=entry.ocr_text or "",
+        confidence=entry.confidence_score,
+        pages=entry.ocr_pages or [],
+        method=entry.extraction_method,
+    )
+
+def store(db: Session, content_sha256: Optional[str], result: OcrResult, extracted_from, extracted_to):
+    if not content_sha256:
+        return
+    now = datetime.utcnow()
+    text_bytes = len(result.text.encode("utf-8")) + len(json.dumps(result.pages).encode("utf-8"))
+    # A concurrent worker may have stored the same document; first one wins
+    statement = upsert_insert(db, OcrCacheEntry.__table__).on_conflict_do_nothing(
+        index_elements=["content_sha256", "engine_version"]
+    )
+    inserted = db.execute(statement, {
+        "content_sha256": content_sha256,
+        "engine_version": engine_version(),
+        "extraction_method": result.method,
+        "confidence_score": result.confidence,
+        "extracted_from_date": extracted_from,
+        "extracted_to_date": extracted_to,
+        "ocr_text": result.text,
+        "ocr_pages": result.pages,
+        "text_bytes": text_bytes,
+        "hits": 0,
+        "created_at": now,
+        "last_used_at": now,
+    }).rowcount
+    if not _within_bound(text_bytes if inserted else 0, OCR_CACHE_MAX_TEXT_BYTES):
+        evict(db, OCR_CACHE_MAX_TEXT_BYTES)
+
+def evict(db: Session, max_bytes: int = OCR_CACHE_MAX_TEXT_BYTES) -> int:
+    """
+    Drops the raw text of least recently used entries until under max_bytes;
+    returns how many. Sums the whole table, and resets the running estimate.
+    """
+    total = db.exec(select(func.coalesce(func.sum(OcrCacheEntry.text_bytes), 0))).one()
+    if total <= max_bytes:
+        _resync(total)
+        return 0
+
+    victims, freed = [], 0
+    for sha, version, size in db.exec(
+        select(OcrCacheEntry.content_sha256, OcrCacheEntry.engine_version, OcrCacheEntry.text_bytes)
+        .where(OcrCacheEntry.text_bytes > 0)
+        .order_by(OcrCacheEntry.last_used_at)
+    ):
+        victims.append({"content_sha256": sha, "engine_version": version})
+        freed += size
+        if total - freed <= max_bytes * EVICT_TO:
+            break
+    for key in victims:
+        db.execute(
+            update(OcrCacheEntry)
+            .where(OcrCacheEntry.content_sha256 == key["content_sha256"])
+            .where(OcrCacheEntry.engine_version == key["engine_version"])
+            .values(ocr_text=None, ocr_pages=null(), text_bytes=0)
+            .execution_options(synchronize_session=False)
+        )
+    _resync(total - freed)
+    return len(victims)
+
+def _resync(total: int):
+    with _size_lock:
+        _size["bytes"] = total
+        _size["read_at"] = time.monotonic()
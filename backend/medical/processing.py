@@ -1,18 +1,129 @@
+import os
+import functools
 import pytesseract
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
 import re
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Tuple, Optional, Any
+from typing import Tuple, Optional, Any, List
+from config import OCR_PAGE_THREADS, OCR_DPI, OCR_MIN_TEXT_CHARS
 
-def ocr_pdf(pdf_path: str) -> Tuple[str, float]:
+# How each page's text was obtained, per page and for the document ("mixed")
+METHOD_TEXT = "text"
+METHOD_OCR = "ocr"
+METHOD_MIXED = "mixed"
+
+# Bump when extraction changes in a way that makes cached results stale
+PIPELINE_VERSION = 2
+
+@dataclass
+class OcrResult:
+    text: str
+    confidence: float # 0..1, mean word confidence over the document (1.0 for embedded text)
+    pages: List[dict] = field(default_factory=list) # [{"page", "text", "confidence", "words", "method"}]
+    method: str = METHOD_OCR
+
+def _text_and_confidences(data: dict) -> Tuple[str, List[float]]:
+    # image_to_data rows come in reading order; words are regrouped into
+    # lines, and blocks are separated by a blank line like image_to_string
+    blocks, confidences = {}, []
+    for i, word in enumerate(data["text"]):
+        if not word or not word.strip():
+            continue
+        line = (data["par_num"][i], data["line_num"][i])
+        blocks.setdefault(data["block_num"][i], {}).setdefault(line, []).append(word)
+        conf = float(data["conf"][i])
+        if conf >= 0:
+            confidences.append(conf)
+    text = "\n\n".join(
+        "\n".join(" ".join(words) for words in lines.values()) for lines in blocks.values()
+    )
+    return text, confidences
+
+def _ocr_page(pdf_path: str, page: int, workdir: str) -> dict:
+    # One page is rasterised to disk, OCR'd and deleted, so peak memory is
+    # OCR_PAGE_THREADS pages whatever the document length
+    path = convert_from_path(
+        pdf_path, dpi=OCR_DPI, first_page=page, last_page=page, output_folder=workdir,
+        fmt="png", single_file=True, output_file=f"page-{page}", paths_only=True,
+    )[0]
+    try:
+        data = pytesseract.image_to_data(path, output_type=pytesseract.Output.DICT)
+    finally:
+        os.remove(path)
+    text, confidences = _text_and_confidences(data)
+    return {
+        "page": page,
+        "text": text,
+        "confidence": round(sum(confidences) / len(confidences) / 100, 4) if confidences else 0.0,
+        "words": len(confidences),
+        "method": METHOD_OCR,
+    }
+
+def _embedded_text(pdf_path: str, page_count: int) -> List[str]:
+    """
+    Text layer of every page from poppler's pdftotext (already installed for
+    pdf2image), in one call: pages come back separated by form feeds. Empty
+    strings when the tool is missing or fails; OCR covers those pages.
+    """
+    try:
+        output = subprocess.run(
+            ["pdftotext", "-layout", "-enc", "UTF-8", pdf_path, "-"],
+            capture_output=True, check=True, timeout=60,
+        ).stdout.decode("utf-8", "replace")
+    except (OSError, subprocess.SubprocessError):
+        return [""] * page_count
+    return (output.split("\f") + [""] * page_count)[:page_count]
+
+def has_usable_text(text: str) -> bool:
+    # Scans often carry a few stray glyphs (a header, a stamp); count letters and digits
+    return sum(ch.isalnum() for ch in text) >= OCR_MIN_TEXT_CHARS
+
+def ocr_pdf(pdf_path: str) -> OcrResult:
+    """
+    Text of a certificate, cheapest path first: pages with a usable embedded
+    text layer (digitally generated PDFs) are read directly in milliseconds;
+    only the rest are rasterised and OCR'd, page-parallel. pdftoppm and
+    tesseract are subprocesses, so threads overlap them; tesseract's own
+    OpenMP threading is turned off so pages don't oversubscribe the cores.
+    Errors propagate: the OCR queue (medical.jobs) retries failed jobs.
+    """
+    page_count = int(pdfinfo_from_path(pdf_path)["Pages"])
+    pages = {}
+    for page, text in enumerate(_embedded_text(pdf_path, page_count), start=1):
+        if has_usable_text(text):
+            text = text.strip()
+            pages[page] = {"page": page, "text": text, "confidence": 1.0, "words": len(text.split()), "method": METHOD_TEXT}
+
+    scanned = [page for page in range(1, page_count + 1) if page not in pages]
+    if scanned:
+        os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+        with tempfile.TemporaryDirectory(prefix="ocr-") as workdir:
+            with ThreadPoolExecutor(max_workers=max(1, min(OCR_PAGE_THREADS, len(scanned)))) as pool:
+                for result in pool.map(lambda page: _ocr_page(pdf_path, page, workdir), scanned):
+                    pages[result["page"]] = result
+    pages = [pages[page] for page in range(1, page_count + 1)]
+
+    words = sum(p["words"] for p in pages)
+    confidence = sum(p["confidence"] * p["words"] for p in pages) / words if words else 0.0
+    return OcrResult(
+        text="\n\f".join(p["text"] for p in pages), # Form feed between pages, as image_to_string ends them
+        confidence=round(confidence, 4),
+        pages=pages,
+        method=METHOD_OCR if len(scanned) == page_count else METHOD_TEXT if not scanned else METHOD_MIXED,
+    )
+
+@functools.lru_cache(maxsize=1)
+def engine_version() -> str:
+    """Cache key part for medical.ocr_cache: pipeline, tesseract and settings that change the text."""
     try:
-        images = convert_from_path(pdf_path)
-        full_text = ""
-        for img in images:
-            full_text += pytesseract.image_to_string(img)
-        return full_text, 0.8
+        tesseract = str(pytesseract.get_tesseract_version())
     except Exception:
-        return "", 0.0
+        tesseract = "unknown"
+    return f"v{PIPELINE_VERSION}/tesseract-{tesseract}/dpi-{OCR_DPI}/min-text-{OCR_MIN_TEXT_CHARS}"
 
 def extract_dates(text: str) -> Tuple[Optional[Any], Optional[Any]]:
     # Broad pattern for DD/MM/YYYY or DD-MM-YYYY
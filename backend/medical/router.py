@@ -1,36 +1,93 @@
+import contextlib
 import os
 import uuid
-import pytesseract
-from pdf2image import convert_from_path
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, BackgroundTasks
+import hashlib
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Request
+from fastapi.routing import APIRoute
 from sqlmodel import Session, select
 from datetime import date
 from typing import List, Optional
 
 from database import get_db
-from config import UPLOAD_DIR
+from config import UPLOAD_DIR, MEDICAL_UPLOAD_MAX_BYTES
+from core.dependencies import require_role
+from attendance.service import apply_medical_leaves
 
 # IMPORTANT: Import the model from models.py, do NOT redefine it here
-from medical.models import MedicalRequest, MedicalStatus 
+from medical.models import MedicalRequest, MedicalStatus, MedicalProcessingJob
+from medical import jobs, crud
 
-# --- Helpers ---
-def process_ocr_background(file_path: str, request_id: str):
-    try:
-        images = convert_from_path(file_path)
-        text = ""
-        for img in images:
-            text += pytesseract.image_to_string(img)
-        print(f"OCR Processed for {request_id}. Text length: {len(text)}")
-        # In a real app, you would save this text to the DB here
-    except Exception as e:
-        print(f"OCR Failed: {e}")
+# Upload read/write size
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Accepted certificate formats by leading bytes -> stored extension. The OCR
+# pipeline reads PDFs only; readers accept the header anywhere in the first KB.
+UPLOAD_SIGNATURES = {b"%PDF-": ".pdf"}
+SNIFF_BYTES = 1024
+# Room for the multipart boundaries and form fields around the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(413, f"Certificate exceeds {max_bytes // (1024 * 1024)} MB")
+
+class UploadLimitRoute(APIRoute):
+    """
+    Rejects bodies whose Content-Length is over the upload limit before
+    FastAPI parses (and spools) them. Chunked requests have no length and are
+    caught by the per-chunk check in _save_upload instead.
+    """
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def limited_handler(request: Request):
+            length = request.headers.get("content-length", "")
+            if length.isdigit() and int(length) > MEDICAL_UPLOAD_MAX_BYTES + MULTIPART_OVERHEAD_BYTES:
+                raise _too_large(MEDICAL_UPLOAD_MAX_BYTES)
+            return await handler(request)
+
+        return limited_handler
 
 # --- Router ---
-router = APIRouter(tags=["Medical"])
+router = APIRouter(tags=["Medical"], route_class=UploadLimitRoute)
+
+def _sniff_extension(head: bytes) -> Optional[str]:
+    for signature, extension in UPLOAD_SIGNATURES.items():
+        if signature in head[:SNIFF_BYTES]:
+            return extension
+    return None
+
+def _save_upload(source) -> tuple:
+    """
+    Copies an upload into UPLOAD_DIR chunk by chunk, hashing it on the way,
+    and returns (path, sha256 hex). The stored name's extension comes from
+    the content, not the client. Blocking: call it from a sync endpoint.
+    """
+    head = source.read(UPLOAD_CHUNK_SIZE)
+    extension = _sniff_extension(head)
+    if extension is None:
+        raise HTTPException(415, "Certificate must be a PDF document")
+
+    file_path = os.path.join(UPLOAD_DIR, f"{uuid.uuid4()}{extension}")
+    sha256, size = hashlib.sha256(), 0
+    try:
+        with open(file_path, "wb") as f:
+            chunk = head
+            while chunk:
+                size += len(chunk)
+                if size > MEDICAL_UPLOAD_MAX_BYTES:
+                    raise _too_large(MEDICAL_UPLOAD_MAX_BYTES)
+                sha256.update(chunk)
+                f.write(chunk)
+                chunk = source.read(UPLOAD_CHUNK_SIZE)
+    except BaseException:
+        # No half-written uploads left behind (nothing to remove if open() failed)
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(file_path)
+        raise
+    return file_path, sha256.hexdigest()
 
 @router.post("/submit")
-async def submit_medical(
-    background_tasks: BackgroundTasks,
+def submit_medical(
     file: UploadFile = File(...),
     from_date: date = Form(...),
     to_date: date = Form(...),
@@ -39,13 +96,9 @@ async def submit_medical(
     department_id: str = Form(...),
     db: Session = Depends(get_db)
 ):
-    # 1. Save File
-    filename = f"{uuid.uuid4()}.pdf"
-    file_path = os.path.join(UPLOAD_DIR, filename)
-
-    with open(file_path, "wb") as f:
-        content = await file.read()
-        f.write(content)
+    # 1. Save File (sync endpoint: the copy runs in FastAPI's threadpool, off the event loop;
+    #    the hash lets identical re-uploads reuse OCR results)
+    file_path, document_sha256 = _save_upload(file.file)
 
     # 2. Create Database Entry using the imported MedicalRequest model
     req = MedicalRequest(
@@ -55,16 +108,44 @@ async def submit_medical(
         to_date=to_date,
         reason=reason,
         document_path=file_path,
+        document_sha256=document_sha256,
         status=MedicalStatus.PENDING # Use the imported Enum
     )
     db.add(req)
+
+    # 3. Queue OCR in the same transaction; medical.worker picks it up
+    job = jobs.enqueue(db, req.id)
     db.commit()
     db.refresh(req)
 
-    # 3. Trigger Background OCR
-    background_tasks.add_task(process_ocr_background, file_path, str(req.id))
+    return {"success": True, "request_id": str(req.id), "status": "PENDING", "ocr_job_id": str(job.id)}
 
-    return {"success": True, "request_id": str(req.id), "status": "PENDING"}
+@router.get("/ocr/{request_id}")
+def get_ocr_status(request_id: uuid.UUID, db: Session = Depends(get_db)):
+    """Latest OCR job of a request, as written by medical.worker."""
+    job = db.exec(
+        select(MedicalProcessingJob)
+        .where(MedicalProcessingJob.medical_request_id == request_id)
+        .order_by(MedicalProcessingJob.created_at.desc())
+    ).first()
+    if not job:
+        raise HTTPException(404, "No OCR job for this request")
+    return {
+        "job_id": str(job.id),
+        "status": job.processing_status,
+        "attempts": job.attempts,
+        "last_error": job.last_error,
+        "extracted_from_date": job.extracted_from_date,
+        "extracted_to_date": job.extracted_to_date,
+        "confidence_score": job.confidence_score,
+        "dates_match": job.dates_match,
+        "extraction_method": job.extraction_method,
+        "pages": [
+            {"page": p["page"], "confidence": p["confidence"], "words": p["words"], "method": p.get("method")}
+            for p in job.ocr_pages or []
+        ],
+        "processed_at": job.processed_at,
+    }
 
 @router.get("/hod/pending")
 def get_pending(department_id: str, db: Session = Depends(get_db)):
@@ -74,6 +155,7 @@ def get_pending(department_id: str, db: Session = Depends(get_db)):
         .where(MedicalRequest.department_id == department_id)
         .where(MedicalRequest.status == MedicalStatus.PENDING)
     ).all()
+    duplicates = crud.find_duplicates(db, reqs)
     
     # Map to JSON response
     return [
@@ -83,7 +165,9 @@ def get_pending(department_id: str, db: Session = Depends(get_db)):
             "from_date": r.from_date,
             "to_date": r.to_date,
             "status": r.status,
-            "hod_remark": r.hod_remark
+            "hod_remark": r.hod_remark,
+            # "Identical document previously submitted by ..."
+            "duplicate_of": duplicates.get(r.id)
         }
         for r in reqs
     ]
@@ -118,6 +202,7 @@ def get_reviewed(department_id: str, db: Session = Depends(get_db)):
         .where(MedicalRequest.department_id == department_id)
         .where(MedicalRequest.status != MedicalStatus.PENDING)
     ).all()
+    duplicates = crud.find_duplicates(db, reqs)
     
     return [
         {
@@ -128,7 +213,35 @@ def get_reviewed(department_id: str, db: Session = Depends(get_db)):
             "status": r.status,
             "hod_remark": r.hod_remark,
             "reason": r.reason,
-            "document_path": r.document_path
+            "document_path": r.document_path,
+            "duplicate_of": duplicates.get(r.id)
         }
         for r in reqs
-    ]
\ No newline at end of file
+    ]
+
+@router.post("/hod/apply-approved")
+def apply_approved(
+    department_id: Optional[str] = None,
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None,
+    db: Session = Depends(get_db),
+    user=Depends(require_role(["HOD", "ADMIN"])),
+):
+    """
+    Semester close: marks every ABSENT record covered by an APPROVED request as
+    MEDICAL_LEAVE in one pass. Optional filters restrict it to a department
+    and/or requests overlapping [from_date, to_date].
+    """
+    statement = select(
+        MedicalRequest.student_roll_no, MedicalRequest.from_date, MedicalRequest.to_date
+    ).where(MedicalRequest.status == MedicalStatus.APPROVED)
+    if department_id:
+        statement = statement.where(MedicalRequest.department_id == department_id)
+    if from_date:
+        statement = statement.where(MedicalRequest.to_date >= from_date)
+    if to_date:
+        statement = statement.where(MedicalRequest.from_date <= to_date)
+
+    ranges = [tuple(row) for row in db.exec(statement).all()]
+    updated = apply_medical_leaves(db, ranges)
+    return {"success": True, "requests": len(ranges), "records_updated": updated}
@@ -0,0 +1,119 @@
+"""
+OCR worker for medical certificates; runs next to the API, not inside it:
+
+    python -m medical.worker                    # OCR_WORKER_CONCURRENCY processes
+    python -m medical.worker --concurrency 4
+    python -m medical.worker --once             # drain the queue, then exit
+
+The main process owns the database: it claims jobs (medical.jobs), keeps
+their leases alive and persists each result through
+medical.events.process_medical_request. Pool processes only run OCR on a
+file path; documents already in medical.ocr_cache never reach the pool.
+SIGINT/SIGTERM stop new claims; jobs in flight are finished first.
+"""
+import argparse
+import logging
+import os
+import signal
+import socket
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from sqlmodel import Session
+from database import engine
+from medical import events, jobs, ocr_cache
+from config import OCR_WORKER_CONCURRENCY, OCR_HEARTBEAT_SECONDS, OCR_POLL_SECONDS
+
+logger = logging.getLogger("medical.worker")
+
+def _ignore_interrupts():
+    # Ctrl+C reaches the whole process group; only the main process handles it
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+def _new_pool(concurrency: int) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(max_workers=concurrency, initializer=_ignore_interrupts)
+
+def _finish(worker_id: str, job_id, future=None) -> bool:
+    """
+    Persists one finished job (future=None: a cached document, completed from
+    ocr_cache in this process); returns False when the pool process died.
+    """
+    with Session(engine) as db:
+        try:
+            result = future.result() if future is not None else None
+            events.process_medical_request(db, job_id, result, worker_id=worker_id)
+            logger.info(f"✅ OCR job {job_id} completed")
+            return True
+        except Exception as e:
+            db.rollback()
+            logger.error(f"❌ OCR job {job_id} failed: {type(e).__name__}: {e}")
+            jobs.fail_job(db, job_id, worker_id, f"{type(e).__name__}: {e}")
+            return not isinstance(e, BrokenProcessPool)
+
+def run(concurrency: int = OCR_WORKER_CONCURRENCY, once: bool = False):
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        logger.info("🛑 Stopping: finishing jobs in flight")
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    pool = _new_pool(concurrency)
+    in_flight = {}  # future -> job_id
+    last_heartbeat = time.monotonic()
+    logger.info(f"🚀 OCR worker {worker_id} started with {concurrency} processes")
+    try:
+        while True:
+            # 1. Top up the pool
+            claimed = []
+            if not stopping and len(in_flight) < concurrency:
+                with Session(engine) as db:
+                    claimed = jobs.claim_jobs(db, worker_id, concurrency - len(in_flight))
+                    cached = {job_id for job_id, _, sha256 in claimed if ocr_cache.contains(db, sha256)}
+                for job_id, document_path, _ in claimed:
+                    if job_id in cached:
+                        _finish(worker_id, job_id)
+                    else:
+                        in_flight[pool.submit(events.run_ocr, document_path)] = job_id
+
+            if not in_flight:
+                if claimed:
+                    continue  # All cache hits; claim more straight away
+                if stopping or once:
+                    break
+                time.sleep(OCR_POLL_SECONDS)
+                continue
+
+            # 2. Persist whatever finished
+            done, _ = wait(in_flight, timeout=OCR_POLL_SECONDS, return_when=FIRST_COMPLETED)
+            pool_ok = True
+            for future in done:
+                pool_ok &= _finish(worker_id, in_flight.pop(future), future)
+            if not pool_ok:
+                # A pool process died (e.g. OOM on a huge scan); every job
+                # still in it has failed too and will be retried
+                pool.shutdown(wait=False, cancel_futures=True)
+                for future, job_id in list(in_flight.items()):
+                    _finish(worker_id, job_id, future)
+                in_flight.clear()
+                pool = _new_pool(concurrency)
+
+            # 3. Keep the leases of long OCR runs alive
+            if in_flight and time.monotonic() - last_heartbeat >= OCR_HEARTBEAT_SECONDS:
+                with Session(engine) as db:
+                    jobs.heartbeat(db, worker_id, list(in_flight.values()))
+                last_heartbeat = time.monotonic()
+    finally:
+        pool.shutdown(wait=True)
+    logger.info("👋 OCR worker stopped")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Medical certificate OCR worker")
+    parser.add_argument("--concurrency", type=int, default=OCR_WORKER_CONCURRENCY)
+    parser.add_argument("--once", action="store_true", help="exit when the queue is empty")
+    args = parser.parse_args()
+    run(args.concurrency, args.once)
@@ -4,8 +4,8 @@ from database import engine
 from auth.models import User
 from students.models import Student
 from subjects.models import Subject
-from attendance.models import AttendanceSession, AttendanceRecord, AttendanceAuditLog
-from medical.models import MedicalRequest, MedicalProcessingJob
+from attendance.models import AttendanceSession, AttendanceRecord, AttendanceAuditLog, AttendanceSummary, ShortageSnapshot, AttendanceRoster, AttendanceBitmap, AttendanceBitmapException
+from medical.models import MedicalRequest, MedicalProcessingJob, OcrCacheEntry
 
 def reset_database():
     print("⚠️  Warning: This will delete all data in the database.")
@@ -87,7 +87,7 @@
 #                 start_hour = random.randint(9, 15)
 #                 sched = ClassSchedule(
 #                     subject_id=subj.id, faculty_id=faculty.id, day_of_week=day,
-#                     start_time=f"{start_hour:02d}:00", end_time=f"{start_hour+1:02d}:00",
+#                     start_time=time(start_hour, 0), end_time=time(start_hour + 1, 0),
 #                     room_number=f"LH-{random.randint(101, 105)}"
 #                 )
 #                 session.add(sched)
@@ -129,6 +129,7 @@
 # scriptedspython/demoos/demoos-88c5b0a7b388c582eab72b7e23a82eab7e4cb7c4/backend/seed_data.py
 
 import random
+from datetime import time
 from sqlmodel import Session, text, select
 from database import engine
 from auth.models import User
@@ -223,7 +224,7 @@ def seed_data():
                 start_hour = random.randint(9, 15)
                 sched = ClassSchedule(
                     subject_id=subj.id, faculty_id=faculty.id, day_of_week=day,
-                    start_time=f"{start_hour:02d}:00", end_time=f"{start_hour+1:02d}:00",
+                    start_time=time(start_hour, 0), end_time=time(start_hour + 1, 0),
                     room_number=f"LH-{random.randint(101, 105)}"
                 )
                 session.add(sched)
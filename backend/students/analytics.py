@@ -0,0 +1,105 @@
+from typing import Optional
+from sqlalchemy import Float, and_, case, cast, or_
+from sqlmodel import Session, select, func
+from students.models import Student
+from attendance.models import AttendanceSummary
+from subjects.models import Subject
+
+PAGE_MAX = 500
+
+def _encode_cursor(pct: float, roll_no: str) -> str:
+    return f"{pct!r}:{roll_no}"
+
+def decode_cursor(cursor: str):
+    pct, _, roll_no = cursor.partition(":")
+    return float(pct), roll_no
+
+def resolve_department(db: Session, department_id: str) -> Optional[str]:
+    # Demo fallback kept from the original endpoint: an unknown department
+    # (e.g. a slightly different name from the app) shows every student.
+    exists = db.exec(select(Student.id).where(Student.department_id == department_id).limit(1)).first()
+    return department_id if exists is not None else None
+
+def department_analytics_page(
+    db: Session,
+    department_id: Optional[str],
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    descending: bool = False,
+):
+    """
+    One grouped query over students LEFT JOIN attendance_summary sorts the whole
+    department by overall attendance in the database; a second query fetches the
+    subject breakdown for just the students on this page. Pagination is keyset
+    on (percentage, roll_no), so deep pages cost the same as the first.
+    Returns (items, next_cursor).
+    """
+    present = func.coalesce(func.sum(AttendanceSummary.present), 0)
+    total = func.coalesce(func.sum(AttendanceSummary.total), 0)
+    pct = case((total > 0, cast(present, Float) * 100 / total), else_=0.0)
+
+    statement = (
+        select(Student, pct.label("pct"))
+        .outerjoin(AttendanceSummary, AttendanceSummary.student_roll_no == Student.roll_no)
+        .group_by(Student.id)
+    )
+    if department_id is not None:
+        statement = statement.where(Student.department_id == department_id)
+
+    if cursor:
+        c_pct, c_roll = decode_cursor(cursor)
+        if descending:
+            statement = statement.having(or_(pct < c_pct, and_(pct == c_pct, Student.roll_no > c_roll)))
+        else:
+            statement = statement.having(or_(pct > c_pct, and_(pct == c_pct, Student.roll_no > c_roll)))
+
+    statement = statement.order_by(pct.desc() if descending else pct.asc(), Student.roll_no)
+    if limit:
+        statement = statement.limit(limit + 1)
+
+    rows = db.exec(statement).all()
+    next_cursor = None
+    if limit and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1][1], rows[-1][0].roll_no)
+
+    breakdown = {}
+    roll_numbers = [student.roll_no for student, _ in rows]
+    if roll_numbers:
+        subject_rows = db.exec(
+            select(
+                AttendanceSummary.student_roll_no,
+                Subject.code,
+                Subject.name,
+                AttendanceSummary.present,
+                AttendanceSummary.total,
+            )
+            .join(Subject, Subject.code == AttendanceSummary.subject_id)
+            .where(AttendanceSummary.student_roll_no.in_(roll_numbers))
+            .where(AttendanceSummary.total > 0)
+            .order_by(AttendanceSummary.student_roll_no, Subject.code)
+        ).all()
+        for roll_no, code, name, subj_present, subj_total in subject_rows:
+            breakdown.setdefault(roll_no, []).append({
+                "subject_code": code,
+                "subject_name": name,
+                "percentage": round((subj_present / subj_total * 100), 1)
+            })
+
+    items = [
+        {
+            "id": str(student.id),
+            "name": student.name,
+            "roll_no": student.roll_no,
+            "regd_no": student.regd_no,
+            "semester": student.semester,
+            "contact_no": student.contact_no,
+            "email": student.email,
+            "guardian_name": student.guardian_name,
+            "guardian_contact_no": student.guardian_contact_no,
+            "overall_attendance": round(overall_pct, 1),
+            "subject_breakdown": breakdown.get(student.roll_no, [])
+        }
+        for student, overall_pct in rows
+    ]
+    return items, next_cursor
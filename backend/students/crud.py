@@ -1,4 +1,4 @@
-from sqlmodel import Session, select
+from sqlmodel import Session, select, func
 from sqlalchemy.exc import IntegrityError
 from .models import Student
 
@@ -23,4 +23,19 @@ def delete_student(db: Session, student_id: str):
         return None
     db.delete(student)
     db.commit()
-    return student
\ No newline at end of file
+    return student
+
+def count_students_by_department(db: Session) -> list:
+    statement = (
+        select(Student.department_id, Student.semester, func.count(Student.id))
+        .group_by(Student.department_id, Student.semester)
+        .order_by(Student.department_id, Student.semester)
+    )
+    departments = {}
+    for department_id, semester, count in db.exec(statement).all():
+        dept = departments.setdefault(
+            department_id, {"department_id": department_id, "students": 0, "semesters": {}}
+        )
+        dept["students"] += count
+        dept["semesters"][str(semester)] = count
+    return list(departments.values())
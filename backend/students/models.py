@@ -26,10 +26,13 @@
 
 import uuid
 from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
 from typing import Optional
 
 class Student(SQLModel, table=True):
     __tablename__ = "students"
+    # Roll lists and department analytics filter by department (+ semester)
+    __table_args__ = (Index("ix_students_department_semester", "department_id", "semester"),)
     
     id: Optional[int] = Field(default=None, primary_key=True)
     # 🔴 CHANGED: Type is now uuid.UUID to match the User table's ID format
@@ -106,75 +106,67 @@
 #         raise HTTPException(status_code=404, detail="Student not found")
 #     return {"success": True}
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select, func
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session
+from typing import Literal, Optional
+import json
 import uuid
 
-from database import get_db
-from core.dependencies import require_role
-from students.models import Student
-from attendance.models import AttendanceRecord, AttendanceSession, AttendanceStatus
-from subjects.models import Subject
-from . import schemas, crud
+from database import get_db, engine
+from core.dependencies import require_role, require_token_role
+from . import schemas, crud, analytics
 
 router = APIRouter(tags=["Admin - Students"])
 
 @router.get("/department/{department_id}/analytics")
-def get_department_student_analytics(department_id: str, db: Session = Depends(get_db)):
-    """Fetches all students in a department with their attendance analytics."""
-    
-    students = db.exec(select(Student).where(Student.department_id == department_id)).all()
-    if not students:
-        students = db.exec(select(Student)).all()
-    
-    result = []
-    for student in students:
-        records = db.exec(
-            select(AttendanceRecord, AttendanceSession, Subject)
-            .join(AttendanceSession, AttendanceRecord.session_id == AttendanceSession.id)
-            .join(Subject, AttendanceSession.subject_id == Subject.code)
-            .where(AttendanceRecord.student_roll_no == student.roll_no)
-        ).all()
-
-        total_classes = len(records)
-        total_present = sum(1 for r, s, sub in records if r.status == AttendanceStatus.PRESENT)
-        overall_pct = round((total_present / total_classes * 100), 1) if total_classes > 0 else 0.0
-
-        subject_stats = {}
-        for r, session, subject in records:
-            if subject.code not in subject_stats:
-                subject_stats[subject.code] = {"name": subject.name, "total": 0, "present": 0}
-            
-            subject_stats[subject.code]["total"] += 1
-            if r.status == AttendanceStatus.PRESENT:
-                subject_stats[subject.code]["present"] += 1
-
-        subject_breakdown = []
-        for code, stats in subject_stats.items():
-            pct = round((stats["present"] / stats["total"] * 100), 1) if stats["total"] > 0 else 0.0
-            subject_breakdown.append({
-                "subject_code": code,
-                "subject_name": stats["name"],
-                "percentage": pct
-            })
-
-        result.append({
-            "id": str(student.id),
-            "name": student.name,
-            "roll_no": student.roll_no,
-            "regd_no": student.regd_no,
-            "semester": student.semester,
-            "contact_no": student.contact_no,
-            "email": student.email,
-            "guardian_name": student.guardian_name,
-            "guardian_contact_no": student.guardian_contact_no,
-            "overall_attendance": overall_pct,
-            "subject_breakdown": subject_breakdown
-        })
-
-    result.sort(key=lambda x: x["overall_attendance"])
-    return result
+def get_department_student_analytics(
+    department_id: str,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=analytics.PAGE_MAX),
+    after: Optional[str] = None,
+    order: Literal["asc", "desc"] = "asc",
+    format: Literal["json", "jsonl"] = "json",
+    db: Session = Depends(get_db),
+):
+    """
+    Fetches students in a department with their attendance analytics, sorted by
+    overall attendance (lowest first by default). Pass `limit` to page through
+    large departments: the next page's `after` cursor is in X-Next-Cursor.
+    format=jsonl streams the whole department as one JSON object per line.
+    """
+    dept = analytics.resolve_department(db, department_id)
+    descending = order == "desc"
+
+    if after:
+        try:
+            analytics.decode_cursor(after)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if format == "jsonl":
+        return StreamingResponse(
+            _stream_department_analytics(dept, after, descending),
+            media_type="application/x-ndjson",
+        )
+
+    items, next_cursor = analytics.department_analytics_page(db, dept, limit, after, descending)
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
+
+def _stream_department_analytics(department_id, cursor, descending):
+    # Own session: the request-scoped one may be closed before streaming ends
+    with Session(engine) as db:
+        while True:
+            items, cursor = analytics.department_analytics_page(
+                db, department_id, analytics.PAGE_MAX, cursor, descending
+            )
+            for item in items:
+                yield json.dumps(item) + "\n"
+            if not cursor:
+                break
 
 @router.post("/", response_model=schemas.StudentResponse)
 def create_student(payload: schemas.StudentCreate, db: Session = Depends(get_db), user=Depends(require_role(["ADMIN"]))):
@@ -184,7 +176,7 @@ def create_student(payload: schemas.StudentCreate, db: Session = Depends(get_db)
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/", response_model=list[schemas.StudentResponse])
-def list_students(skip: int = 0, limit: int = 20, db: Session = Depends(get_db), user=Depends(require_role(["ADMIN"]))):
+def list_students(skip: int = 0, limit: int = 20, db: Session = Depends(get_db), user=Depends(require_token_role(["ADMIN"]))):
     return crud.get_students(db, skip, limit)
 
 @router.delete("/{student_id}")
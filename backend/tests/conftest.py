@@ -0,0 +1,56 @@
+"""
+Shared fixtures. Tests run against a throwaway SQLite database: DATABASE_URL
+is set here, before any app module reads config, and every test starts from
+freshly created tables.
+"""
+import os
+import tempfile
+
+_scratch = tempfile.mkdtemp(prefix="demoos-tests-")
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(_scratch, "test.db")
+os.environ["OTP_STORE_PATH"] = os.path.join(_scratch, "otp_store.sqlite3")
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel
+
+import main  # Registers every table on SQLModel.metadata
+from database import engine
+from auth.models import User
+from students.models import Student
+from subjects.models import Subject
+
+ROLL_NUMBERS = ["R0", "R1", "R2"]
+
+@pytest.fixture
+def db():
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+@pytest.fixture
+def client(db):
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+@pytest.fixture
+def teacher(db) -> User:
+    user = User(username="teacher", full_name="Teacher", password_hash="-", role="TEACHER")
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+@pytest.fixture
+def subject(db, teacher) -> Subject:
+    """CS601 (CSE, semester 6) taught by `teacher`, with students R0-R2."""
+    subject = Subject(code="CS601", name="Machine Learning", department_id="CSE", semester=6, faculty_id=teacher.id)
+    db.add(subject)
+    for roll_no in ROLL_NUMBERS:
+        user = User(username=roll_no.lower(), full_name=f"Student {roll_no}", password_hash="-")
+        db.add(user)
+        db.add(Student(user_id=user.id, roll_no=roll_no, name=f"Student {roll_no}", department_id="CSE", semester=6))
+    db.commit()
+    db.refresh(subject)
+    return subject
@@ -0,0 +1,13 @@
+"""HTTP helpers shared by the API tests."""
+
+def register(client, username, role):
+    response = client.post("/api/auth/register", json={
+        "username": username, "password": "secret-pw", "full_name": username.title(), "role": role,
+    })
+    assert response.status_code == 201
+
+def login(client, username, password="secret-pw"):
+    return client.post("/api/auth/login", data={"username": username, "password": password})
+
+def bearer(client, username) -> dict:
+    return {"Authorization": f"Bearer {login(client, username).json()['access_token']}"}
@@ -0,0 +1,90 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+from sqlmodel import select
+
+import main
+from auth import router as auth_router
+from auth.models import User
+from core import dependencies, security
+from tests.helpers import bearer, login, register
+
+def test_register_login_and_change_password(client):
+    register(client, "teacher", "TEACHER")
+    assert login(client, "teacher", "wrong").status_code == 401
+
+    response = client.post("/api/auth/change-password", headers=bearer(client, "teacher"),
+                           json={"current_password": "secret-pw", "new_password": "new-secret"})
+    assert response.status_code == 200
+    assert login(client, "teacher", "new-secret").status_code == 200
+
+def test_pool_and_cache_stats_are_admin_only(client):
+    register(client, "teacher", "TEACHER")
+    register(client, "admin", "ADMIN")
+    for path in ("/api/auth/hash-pool/stats", "/api/auth/principal-cache/stats"):
+        assert client.get(path).status_code == 401
+        assert client.get(path, headers=bearer(client, "teacher")).status_code == 403
+        assert client.get(path, headers=bearer(client, "admin")).status_code == 200
+
+def test_stale_token_claims_are_checked_against_the_user(client, db, monkeypatch):
+    register(client, "admin", "ADMIN")
+    admin = bearer(client, "admin")
+    user = db.exec(select(User).where(User.username == "admin")).one()
+    user.is_active = False
+    db.add(user)
+    db.commit()
+
+    # A fresh token is trusted on its claims alone...
+    assert client.get("/api/students/", headers=admin).status_code == 200
+    # ...an older one is looked up, and the deactivation is seen
+    monkeypatch.setattr(dependencies, "TOKEN_CLAIMS_MAX_AGE_MINUTES", -1)
+    assert client.get("/api/students/", headers=admin).status_code == 401
+
+def test_reset_password_otp_is_single_use(client):
+    register(client, "teacher", "TEACHER")
+    auth_router.otp_store.set("otp:teacher", "4321")
+
+    reset = {"username": "teacher", "otp": "4321", "new_password": "after-reset"}
+    assert client.post("/api/auth/reset-password", json=reset).status_code == 200
+    assert client.post("/api/auth/reset-password", json={**reset, "new_password": "again"}).status_code == 400
+    assert login(client, "teacher", "after-reset").status_code == 200
+
+def test_queued_hashes_do_not_starve_other_endpoints(client, monkeypatch):
+    # More hashes waiting than Starlette has threadpool threads (40)
+    waiting = 50
+    register(client, "admin", "ADMIN")
+    admin = bearer(client, "admin")
+
+    release = threading.Event()
+    def blocked_hash(password):
+        release.wait(10)
+        return "not-a-real-hash"
+
+    pool = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(security, "_get_hash_pool", lambda: pool)
+    monkeypatch.setattr(security, "get_password_hash", blocked_hash)
+    monkeypatch.setattr(security, "HASH_POOL_MAX_QUEUE", waiting)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            registrations = [asyncio.create_task(ac.post("/api/auth/register", json={
+                "username": f"user{i}", "password": "secret-pw", "full_name": "User", "role": "STUDENT",
+            })) for i in range(waiting)]
+            try:
+                while security.get_hash_pool_stats()["in_flight"] < waiting:
+                    await asyncio.sleep(0.01)
+                response = await asyncio.wait_for(ac.get("/api/students/", headers=admin), timeout=5)
+                assert response.status_code == 200, response.text
+            finally:
+                release.set()
+            return await asyncio.gather(*registrations)
+
+    try:
+        responses = asyncio.run(asyncio.wait_for(scenario(), timeout=30))
+    finally:
+        release.set()
+        pool.shutdown()
+    assert [r.status_code for r in responses] == [201] * waiting
@@ -0,0 +1,23 @@
+import pytest
+from core.ephemeral import EphemeralStore, MemoryEphemeralStore, SQLiteEphemeralStore
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemoryEphemeralStore(max_entries=10, default_ttl=60)
+    return SQLiteEphemeralStore(str(tmp_path / "otp.sqlite3"), max_entries=10, default_ttl=60)
+
+def test_pop_consumes_once(store):
+    store.set("otp:alice", "1234")
+    assert store.get("otp:alice") == "1234"
+    assert store.pop("otp:alice") == "1234"
+    assert store.pop("otp:alice") is None
+
+def test_expired_values_are_never_returned(store):
+    store.set("otp:alice", "1234", ttl=-1)
+    assert store.get("otp:alice") is None
+    assert store.pop("otp:alice") is None
+
+def test_store_interface_is_abstract():
+    with pytest.raises(TypeError):
+        EphemeralStore()
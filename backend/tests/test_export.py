@@ -0,0 +1,42 @@
+import csv
+import io
+from datetime import date
+import pyarrow.parquet as pq
+import pytest
+from attendance import sync
+from attendance.router import SyncSessionItem
+from tests.helpers import bearer, register
+
+def test_parquet_export(client, db, subject):
+    sync.sync_sessions(db, [SyncSessionItem(
+        client_session_id="c1", subject_id="CS601", date=date(2026, 3, 2),
+        records=[{"roll_no": "R0", "status": "PRESENT"}, {"roll_no": "R1", "status": "ABSENT"}],
+    )])
+    register(client, "hod", "HOD")
+
+    response = client.get("/api/attendance/export", headers=bearer(client, "hod"), params={
+        "department_id": "CSE", "semester": 6, "from_date": "2026-03-01", "to_date": "2026-03-31", "format": "parquet",
+    })
+
+    assert response.status_code == 200
+    table = pq.read_table(io.BytesIO(response.content))
+    assert sorted(zip(table.column("roll_no").to_pylist(), table.column("status").to_pylist())) == [
+        ("R0", "PRESENT"), ("R1", "ABSENT"),
+    ]
+
+@pytest.mark.parametrize("storage", ["rows", "bitmap"])
+def test_long_export_tells_sessions_apart_by_slot(client, db, subject, monkeypatch, storage):
+    monkeypatch.setattr(sync, "ATTENDANCE_STORAGE", storage)
+    sync.sync_sessions(db, [SyncSessionItem(
+        client_session_id=f"c{n}", subject_id="CS601", date=date(2026, 3, 2),
+        records=[{"roll_no": "R0", "status": status}],
+    ) for n, status in enumerate(["PRESENT", "ABSENT"])])
+    register(client, "hod", "HOD")
+
+    response = client.get("/api/attendance/export", headers=bearer(client, "hod"), params={
+        "department_id": "CSE", "semester": 6, "from_date": "2026-03-01", "to_date": "2026-03-31",
+    })
+
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0][:3] == ["session_date", "subject_code", "slot"]
+    assert [(row[2], row[3], row[5]) for row in rows[1:]] == [("1", "R0", "PRESENT"), ("2", "R0", "ABSENT")]
@@ -0,0 +1,48 @@
+from datetime import date
+import pytest
+from sqlmodel import select
+from attendance import bitmap, service, summary, sync
+from attendance.models import AttendanceAuditLog, AttendanceRecord
+from attendance.router import SyncSessionItem
+
+def capture(client_session_id, day, **statuses):
+    return SyncSessionItem(
+        client_session_id=client_session_id, subject_id="CS601", date=day,
+        records=[{"roll_no": roll_no, "status": status} for roll_no, status in statuses.items()],
+    )
+
+def marks(db) -> dict:
+    """{(roll_no, date): status} across row and bitmap sessions."""
+    db.expire_all()
+    found = {}
+    for record in db.exec(select(AttendanceRecord)).all():
+        found[(record.student_roll_no, record.session.session_date)] = record.status
+    for decoded in bitmap.iter_sessions(db):
+        for roll_no, status in decoded.marks():
+            found[(roll_no, decoded.session_date)] = status
+    return found
+
+@pytest.mark.parametrize("storage", ["rows", "bitmap"])
+def test_leave_flips_only_absences_in_range_and_keeps_summary_consistent(db, subject, monkeypatch, storage):
+    monkeypatch.setattr(sync, "ATTENDANCE_STORAGE", storage)
+    sync.sync_sessions(db, [
+        capture("c1", date(2026, 3, 2), R0="ABSENT", R1="ABSENT", R2="PRESENT"),
+        capture("c2", date(2026, 3, 3), R0="PRESENT", R1="ABSENT"),
+        capture("c3", date(2026, 3, 9), R0="ABSENT", R1="ABSENT"),
+    ])
+    assert bool(db.exec(select(AttendanceRecord)).all()) == (storage == "rows")
+
+    ranges = [("R0", date(2026, 3, 1), date(2026, 3, 5)), ("R1", date(2026, 3, 3), date(2026, 3, 9))]
+    assert service.apply_medical_leaves(db, ranges) == 3
+
+    assert marks(db) == {
+        ("R0", date(2026, 3, 2)): "MEDICAL_LEAVE", ("R1", date(2026, 3, 2)): "ABSENT", ("R2", date(2026, 3, 2)): "PRESENT",
+        ("R0", date(2026, 3, 3)): "PRESENT", ("R1", date(2026, 3, 3)): "MEDICAL_LEAVE",
+        ("R0", date(2026, 3, 9)): "ABSENT", ("R1", date(2026, 3, 9)): "MEDICAL_LEAVE",
+    }
+    assert summary.check_summary(db) == []
+    assert len(db.exec(select(AttendanceAuditLog).where(AttendanceAuditLog.source == "MEDICAL_APPROVAL")).all()) == 3
+
+    # Re-running the batch changes nothing
+    assert service.apply_medical_leaves(db, ranges) == 0
+    assert summary.check_summary(db) == []
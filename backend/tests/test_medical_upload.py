@@ -0,0 +1,48 @@
+import io
+import os
+import pytest
+from medical import router as medical_router
+
+FORM = {"from_date": "2026-03-01", "to_date": "2026-03-03", "reason": "flu", "student_roll_no": "R0", "department_id": "CSE"}
+
+@pytest.fixture
+def uploads(tmp_path, monkeypatch):
+    monkeypatch.setattr(medical_router, "UPLOAD_DIR", str(tmp_path))
+    return tmp_path
+
+def submit(client, body: bytes, name="certificate.pdf", **kwargs):
+    return client.post("/api/medical/submit", files={"file": (name, io.BytesIO(body), "application/pdf")}, data=FORM, **kwargs)
+
+def test_pdf_is_stored_under_its_sniffed_type(client, uploads):
+    response = submit(client, b"%PDF-1.4\n" + b"x" * 1000, name="scan.exe")
+    assert response.status_code == 200
+    assert [p.suffix for p in uploads.iterdir()] == [".pdf"]
+
+def test_non_pdf_is_rejected(client, uploads):
+    assert submit(client, b"\x89PNG\r\n\x1a\n" + b"x" * 100).status_code == 415
+    assert not list(uploads.iterdir())
+
+def test_oversized_upload_is_rejected_from_its_content_length(client, uploads, monkeypatch):
+    monkeypatch.setattr(medical_router, "MEDICAL_UPLOAD_MAX_BYTES", 1024)
+    monkeypatch.setattr(medical_router, "MULTIPART_OVERHEAD_BYTES", 0)
+    parsed = []
+    monkeypatch.setattr(medical_router, "_save_upload", lambda *args: parsed.append(args))
+
+    response = submit(client, b"%PDF-1.4\n" + b"x" * 4096)
+
+    assert response.status_code == 413
+    assert parsed == []  # Rejected before the body reached the endpoint
+
+def test_chunked_check_is_the_backstop(client, uploads, monkeypatch):
+    # Under the Content-Length allowance (limit + multipart overhead), over the limit
+    monkeypatch.setattr(medical_router, "MEDICAL_UPLOAD_MAX_BYTES", 1024)
+    assert submit(client, b"%PDF-1.4\n" + b"x" * 4096).status_code == 413
+    assert not list(uploads.iterdir())
+
+def test_failed_open_keeps_the_original_error(uploads, monkeypatch):
+    def unwritable(*args, **kwargs):
+        raise PermissionError("read-only upload dir")
+
+    monkeypatch.setattr(medical_router, "open", unwritable, raising=False)
+    with pytest.raises(PermissionError):
+        medical_router._save_upload(io.BytesIO(b"%PDF-1.4\n"))
@@ -0,0 +1,27 @@
+from datetime import date
+from sqlmodel import select
+from medical import ocr_cache
+from medical.models import OcrCacheEntry
+from medical.processing import OcrResult
+
+def result() -> OcrResult:
+    return OcrResult(text="x" * 98, confidence=0.9, pages=[], method="ocr")  # 100 bytes with "[]"
+
+def test_store_sums_the_table_only_when_the_estimate_crosses_the_bound(db, monkeypatch):
+    monkeypatch.setattr(ocr_cache, "OCR_CACHE_MAX_TEXT_BYTES", 250)
+    monkeypatch.setattr(ocr_cache, "_size", {"bytes": None, "read_at": 0.0})
+    evictions = []
+    real_evict = ocr_cache.evict
+    monkeypatch.setattr(ocr_cache, "evict", lambda db, max_bytes: evictions.append(real_evict(db, max_bytes)))
+
+    for sha in ["a", "b", "b", "c"]:
+        ocr_cache.store(db, sha, result(), date(2026, 3, 1), date(2026, 3, 3))
+    db.commit()
+
+    # First store reads the real size; the duplicate "b" adds nothing; "c" crosses
+    # 250 and the oldest entry goes, leaving 200 (under 90% of the bound)
+    assert evictions == [0, 1]
+    entries = {e.content_sha256: e for e in db.exec(select(OcrCacheEntry)).all()}
+    assert [sha for sha, e in sorted(entries.items()) if e.ocr_text is None] == ["a"]
+    assert all(e.extracted_from_date == date(2026, 3, 1) for e in entries.values())
+    assert ocr_cache._size["bytes"] == 200
@@ -0,0 +1,58 @@
+from datetime import date, datetime, timedelta
+import pytest
+from medical import events, jobs
+from medical.models import MedicalProcessingJob, MedicalRequest, ProcessingStatus
+from medical.processing import OcrResult
+
+RESULT = OcrResult(text="Rest advised from 01/03/2026 to 03/03/2026", confidence=0.9, pages=[], method="text")
+
+@pytest.fixture
+def job_id(db):
+    request = MedicalRequest(student_roll_no="R0", department_id="CSE", from_date=date(2026, 3, 1),
+                             to_date=date(2026, 3, 3), reason="flu", document_path="/nonexistent.pdf")
+    db.add(request)
+    job = jobs.enqueue(db, request.id)
+    db.commit()
+    return job.id
+
+def reload(db, job_id) -> MedicalProcessingJob:
+    db.expire_all()
+    return db.get(MedicalProcessingJob, job_id)
+
+def test_a_leased_job_is_not_claimed_twice(db, job_id):
+    assert [claimed[0] for claimed in jobs.claim_jobs(db, "w1", 5)] == [job_id]
+    assert jobs.claim_jobs(db, "w2", 5) == []
+    assert jobs.heartbeat(db, "w1", [job_id]) == 1
+    assert jobs.heartbeat(db, "w2", [job_id]) == 0
+
+def test_expired_lease_is_reclaimed_and_the_old_worker_result_discarded(db, job_id):
+    jobs.claim_jobs(db, "w1", 5)
+    job = reload(db, job_id)
+    job.lease_expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db.add(job)
+    db.commit()
+
+    assert [claimed[0] for claimed in jobs.claim_jobs(db, "w2", 5)] == [job_id]
+    assert events.process_medical_request(db, job_id, RESULT, worker_id="w1") is None
+    assert reload(db, job_id).processing_status == ProcessingStatus.PROCESSING
+
+    events.process_medical_request(db, job_id, RESULT, worker_id="w2")
+    job = reload(db, job_id)
+    assert (job.processing_status, job.worker_id, job.attempts) == (ProcessingStatus.COMPLETED, None, 2)
+    assert (job.extracted_from_date, job.dates_match) == (date(2026, 3, 1), True)
+
+def test_failures_back_off_then_give_up(db, job_id, monkeypatch):
+    monkeypatch.setattr(jobs, "OCR_MAX_ATTEMPTS", 2)
+    jobs.claim_jobs(db, "w1", 5)
+    jobs.fail_job(db, job_id, "w1", "boom")
+    job = reload(db, job_id)
+    assert (job.processing_status, job.last_error) == (ProcessingStatus.PENDING, "boom")
+    assert job.run_after > datetime.utcnow()
+    assert jobs.claim_jobs(db, "w1", 5) == []  # Still backing off
+
+    job.run_after = datetime.utcnow() - timedelta(seconds=1)
+    db.add(job)
+    db.commit()
+    jobs.claim_jobs(db, "w1", 5)
+    jobs.fail_job(db, job_id, "w1", "boom again")
+    assert reload(db, job_id).processing_status == ProcessingStatus.FAILED
@@ -0,0 +1,53 @@
+import io
+
+import pytest
+from passlib.hash import bcrypt
+from sqlmodel import select
+from auth.models import User
+from students.models import Student
+from core import security
+from tests.helpers import bearer, register
+
+ROSTER = (
+    "username,password,full_name,role,roll_no,department_id,semester\n"
+    "s1,pw-one,Student One,STUDENT,R1,CSE,6\n"
+    "s2,pw-two,Student Two,STUDENT,R2,,\n"
+    "f1,pw-three,Faculty One,TEACHER,,,\n"
+)
+
+def test_bulk_register_hashes_at_policy_cost_and_requires_placement(client, db):
+    register(client, "hod", "HOD")
+    hod = bearer(client, "hod")
+    response = client.post("/api/auth/bulk-register", headers=hod,
+                           files={"file": ("roster.csv", io.BytesIO(ROSTER.encode()), "text/csv")})
+    assert response.status_code == 202
+    assert (response.json()["total"], response.json()["failed"]) == (2, 1)
+
+    # The test client returns once the background import has finished
+    body = client.get(f"/api/auth/bulk-register/{response.json()['job_id']}", headers=hod).json()
+    assert (body["status"], body["hashed"]) == ("COMPLETED", 2)
+
+    assert (body["created"], body["students_created"]) == (2, 1)
+    assert [(e["line"], e["username"]) for e in body["errors"]] == [(3, None)]
+    assert "department_id and semester are required" in body["errors"][0]["error"]
+
+    student = db.exec(select(Student).where(Student.roll_no == "R1")).one()
+    assert (student.department_id, student.semester) == ("CSE", 6)
+    for user in db.exec(select(User).where(User.username.in_(["s1", "f1"]))).all():
+        assert bcrypt.from_string(user.password_hash).rounds >= 12
+    assert client.post("/api/auth/login", data={"username": "s1", "password": "pw-one"}).status_code == 200
+
+def test_unknown_import_is_not_found(client):
+    register(client, "hod", "HOD")
+    assert client.get("/api/auth/bulk-register/nope", headers=bearer(client, "hod")).status_code == 404
+
+def test_failed_bulk_submit_does_not_leak_in_flight(monkeypatch):
+    class BrokenPool:
+        def submit(self, *args):
+            raise RuntimeError("pool is shut down")
+
+    monkeypatch.setattr(security, "_get_hash_pool", lambda: BrokenPool())
+    before = security.get_hash_pool_stats()["in_flight"]
+    with pytest.raises(RuntimeError):
+        security.hash_passwords_bulk(["a", "b"])
+    assert security.get_hash_pool_stats()["in_flight"] == before
@@ -0,0 +1,30 @@
+from datetime import date
+from attendance import register, sync
+from attendance.router import SyncSessionItem
+from students.models import Student
+from auth.models import User
+from subjects.models import Subject
+
+DAY = date(2026, 3, 2)
+
+def test_roster_is_the_subjects_class_plus_marked_students(db, subject):
+    # Another department's student, marked once in this subject
+    outsider = User(username="e1", full_name="E1", password_hash="-")
+    db.add(outsider)
+    db.add(Student(user_id=outsider.id, roll_no="E1", name="E1", department_id="ECE", semester=4))
+    db.add(Student(user_id=outsider.id, roll_no="E2", name="E2", department_id="ECE", semester=4))
+    db.commit()
+    sync.sync_sessions(db, [SyncSessionItem(
+        client_session_id="c1", subject_id="CS601", date=DAY,
+        records=[{"roll_no": "R0", "status": "PRESENT"}, {"roll_no": "E1", "status": "ABSENT"}],
+    )])
+
+    matrix = register.register_matrix(db, "CS601", DAY, DAY)
+
+    assert matrix["roster"] == ["E1", "R0", "R1", "R2"]
+    assert [s["marks"] for s in matrix["sessions"]] == ["AP--"]
+
+def test_subject_without_students_does_not_list_the_college(db, subject, teacher):
+    db.add(Subject(code="ME801", name="Robotics", department_id="MECH", semester=8, faculty_id=teacher.id))
+    db.commit()
+    assert register.register_matrix(db, "ME801", DAY, DAY)["roster"] == []
@@ -0,0 +1,20 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from attendance.shortage import classes_needed
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_classes_needed_at_the_default_threshold():
+    assert classes_needed(present=6, total=10) == 6  # 12 / 16 = 75%
+    assert classes_needed(present=9, total=10) == 0
+
+@pytest.mark.parametrize("threshold", ["0", "100"])
+def test_threshold_outside_1_to_99_is_rejected_at_startup(threshold):
+    result = subprocess.run([sys.executable, "-c", "import config"], cwd=BACKEND_DIR, capture_output=True, text=True,
+                            env={**os.environ, "SHORTAGE_THRESHOLD_PERCENT": threshold})
+    assert result.returncode != 0
+    assert "SHORTAGE_THRESHOLD_PERCENT must be between 1 and 99" in result.stderr
@@ -0,0 +1,46 @@
+from datetime import date
+from sqlalchemy import delete
+from sqlmodel import select
+from attendance import summary, sync
+from attendance.models import AttendanceSummary
+from attendance.router import SyncSessionItem
+
+def capture(client_session_id, day, **statuses):
+    return SyncSessionItem(
+        client_session_id=client_session_id,
+        subject_id="CS601",
+        date=day,
+        records=[{"roll_no": roll_no, "status": status} for roll_no, status in statuses.items()],
+    )
+
+def counters(db) -> dict:
+    db.expire_all()
+    return {
+        row.student_roll_no: (row.present, row.absent, row.medical_leave, row.total)
+        for row in db.exec(select(AttendanceSummary)).all()
+    }
+
+def test_check_is_clean_after_rebuild(db, subject):
+    sync.sync_sessions(db, [
+        capture("c1", date(2026, 3, 2), R0="PRESENT", R1="ABSENT"),
+        capture("c2", date(2026, 3, 3), R0="ABSENT", R1="ABSENT", R2="PRESENT"),
+    ])
+    maintained = counters(db)
+    assert summary.check_summary(db) == []
+
+    db.execute(delete(AttendanceSummary).where(AttendanceSummary.student_roll_no == "R1"))
+    db.commit()
+    assert [m["student_roll_no"] for m in summary.check_summary(db)] == ["R1"]
+
+    assert summary.rebuild_summary(db) == 3
+    assert summary.check_summary(db) == []
+    assert counters(db) == maintained == {"R0": (1, 1, 0, 2), "R1": (0, 2, 0, 2), "R2": (1, 0, 0, 1)}
+
+def test_empty_summary_is_rebuilt_on_startup(db, subject):
+    sync.sync_sessions(db, [capture("c1", date(2026, 3, 2), R0="PRESENT")])
+    db.execute(delete(AttendanceSummary))
+    db.commit()
+
+    assert summary.ensure_summary(db) == 1
+    assert summary.ensure_summary(db) == 0  # Already populated
+    assert counters(db) == {"R0": (1, 0, 0, 1)}
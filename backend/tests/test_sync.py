@@ -0,0 +1,75 @@
+from datetime import date
+from sqlmodel import select
+from attendance import service, sync
+from attendance.models import AttendanceAuditLog, AttendanceRecord, AttendanceSession, AttendanceSummary
+from attendance.router import SyncSessionItem
+
+DAY = date(2026, 3, 2)
+
+def submit(client, statuses: dict):
+    return client.post("/api/attendance/submit", json={
+        "subject_id": "CS601",
+        "date": DAY.isoformat(),
+        "records": [{"roll_no": roll_no, "status": status} for roll_no, status in statuses.items()],
+    })
+
+def statuses(db) -> dict:
+    db.expire_all()
+    return {r.student_roll_no: r.status for r in db.exec(select(AttendanceRecord)).all()}
+
+def test_resubmit_keeps_approved_medical_leave(client, db, subject):
+    assert submit(client, {"R0": "ABSENT", "R1": "PRESENT"}).json()["status"] == "created"
+    assert service.apply_medical_leave(db, "R0", DAY, DAY) == 1
+
+    response = submit(client, {"R0": "ABSENT", "R1": "ABSENT"}).json()
+
+    assert response["status"] == "updated"
+    assert response["changed"] == 1
+    assert [r["roll_no"] for r in response["skipped_records"]] == ["R0"]
+    assert statuses(db) == {"R0": "MEDICAL_LEAVE", "R1": "ABSENT"}
+    summary = db.exec(select(AttendanceSummary).where(AttendanceSummary.student_roll_no == "R0")).one()
+    assert (summary.medical_leave, summary.absent, summary.total) == (1, 0, 1)
+    assert not db.exec(select(AttendanceAuditLog).where(AttendanceAuditLog.new_status == "ABSENT")
+                       .where(AttendanceAuditLog.student_roll_no == "R0")).all()
+
+def item(client_session_id=None, slot=1, **statuses):
+    return SyncSessionItem(
+        client_session_id=client_session_id or "c-default",
+        subject_id="CS601",
+        date=DAY,
+        slot=slot,
+        records=[{"roll_no": roll_no, "status": status} for roll_no, status in statuses.items()],
+    )
+
+def test_sync_sessions_create_unchanged_updated(db, subject):
+    first = sync.sync_sessions(db, [item("c1", R0="PRESENT", R1="ABSENT")])[0]
+    assert first["status"] == "created"
+
+    replay = sync.sync_sessions(db, [item("c1", R0="PRESENT", R1="ABSENT")])[0]
+    assert (replay["status"], replay["session_id"], replay["changed"]) == ("unchanged", first["session_id"], 0)
+
+    edit = sync.sync_sessions(db, [item("c1", R0="PRESENT", R1="PRESENT", R2="ABSENT")])[0]
+    assert (edit["status"], edit["changed"]) == ("updated", 2)
+    assert statuses(db) == {"R0": "PRESENT", "R1": "PRESENT", "R2": "ABSENT"}
+    assert len(db.exec(select(AttendanceSession)).all()) == 1
+
+def test_sync_sessions_later_capture_in_batch_supersedes(db, subject):
+    results = sync.sync_sessions(db, [item("c1", R0="ABSENT"), item("c1", R0="PRESENT")])
+    assert [r["status"] for r in results] == ["superseded", "created"]
+    assert statuses(db) == {"R0": "PRESENT"}
+
+def test_distinct_offline_classes_on_one_day_stay_separate(db, subject):
+    results = sync.sync_sessions(db, [item("c1", R0="PRESENT"), item("c2", R0="ABSENT")])
+    assert [r["status"] for r in results] == ["created", "created"]
+    assert sorted(r["slot"] for r in results) == [1, 2]
+
+    # Replaying either one later matches it by client id, not by slot
+    replay = sync.sync_sessions(db, [item("c2", R0="ABSENT")])[0]
+    assert (replay["status"], replay["session_id"]) == ("unchanged", results[1]["session_id"])
+    assert len(db.exec(select(AttendanceSession)).all()) == 2
+
+def test_sync_audit_records_the_caller(db, subject):
+    sync.sync_sessions(db, [item("c1", R0="PRESENT")], updated_by="caller-id")
+    sync.sync_sessions(db, [item("c1", R0="ABSENT")], updated_by="caller-id")
+    audit = db.exec(select(AttendanceAuditLog)).one()
+    assert (audit.updated_by, audit.old_status, audit.new_status) == ("caller-id", "PRESENT", "ABSENT")
@@ -0,0 +1,38 @@
+import uuid
+from datetime import datetime, time
+from sqlalchemy import insert
+from attendance import timetable
+from attendance.models import ClassSchedule, DayOfWeek
+from database import engine
+
+def slot(start, end, room="LAB-1"):
+    return timetable.Slot(
+        schedule_id=uuid.uuid4(), faculty_id=uuid.uuid4(), subject_code="CS601", subject_name="ML",
+        class_identifier="CSE - 6th Sem", day=DayOfWeek.MONDAY, start=start, end=end, room=room,
+    )
+
+def test_long_slot_is_found_after_a_shorter_one_ends():
+    long_lab, short_talk, later = slot(time(9), time(12)), slot(time(9, 30), time(10)), slot(time(13), time(14))
+    day = timetable.DaySchedule([long_lab, short_talk, later])
+
+    assert day.at(time(9, 45)) == (short_talk, later)
+    assert day.at(time(10, 30)) == (long_lab, later)
+    assert day.at(time(12, 30)) == (None, later)
+    assert day.at(time(8)) == (None, long_lab)
+
+def test_changes_from_elsewhere_show_up_after_the_ttl(db, subject, teacher, monkeypatch):
+    timetable.rebuild_timetable()
+    # A write that bypasses this process's ORM hooks, like another worker's
+    with engine.begin() as connection:
+        connection.execute(insert(ClassSchedule), [{
+            "id": uuid.uuid4(), "subject_id": subject.id, "faculty_id": teacher.id,
+            "day_of_week": DayOfWeek.MONDAY, "start_time": time(9), "end_time": time(10), "room_number": "LAB-2",
+        }])
+    monday = datetime(2026, 3, 2, 9, 30)
+
+    monkeypatch.setattr(timetable, "TIMETABLE_TTL_SECONDS", 3600)
+    assert timetable.get_timetable().room_at("LAB-2", monday) == (None, None)
+
+    monkeypatch.setattr(timetable, "TIMETABLE_TTL_SECONDS", 0)
+    current, _ = timetable.get_timetable().room_at("LAB-2", monday)
+    assert current.subject_code == "CS601"